@@ -10,8 +10,10 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 from django.contrib.messages import constants as messages
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -43,6 +45,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'tutorials.middleware.RequestTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -57,7 +60,8 @@ ROOT_URLCONF = 'code_tutors.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates that also reports render times to RequestTimingMiddleware
+        'BACKEND': 'tutorials.instrumentation.InstrumentedDjangoTemplates',
         'DIRS': [],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -77,11 +81,127 @@ WSGI_APPLICATION = 'code_tutors.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# The database is chosen with DB_ENGINE ('sqlite' by default, or 'postgresql').
+# Connections are kept open for DB_CONN_MAX_AGE seconds and health checked before reuse.
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite')
+DB_CONN_MAX_AGE = int(os.environ.get('DB_CONN_MAX_AGE', 60))
+
+if DB_ENGINE == 'postgresql':
+    # Requires the psycopg package
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DB_NAME', 'okapi'),
+            'USER': os.environ.get('DB_USER', ''),
+            'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+            'HOST': os.environ.get('DB_HOST', ''),
+            'PORT': os.environ.get('DB_PORT', ''),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+        }
     }
+elif DB_ENGINE == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('DB_NAME', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                # Take the write lock when a transaction starts, so concurrent writers wait
+                # for the busy timeout instead of failing with "database is locked"
+                'transaction_mode': 'IMMEDIATE',
+            },
+            # Tests use an in-memory database unless DB_TEST_NAME names a file. Its shared cache
+            # raises "table is locked" at once instead of waiting, so concurrency tests need a file
+            'TEST': {
+                'NAME': os.environ.get('DB_TEST_NAME'),
+            },
+        }
+    }
+else:
+    raise ImproperlyConfigured(f"Unsupported DB_ENGINE {DB_ENGINE!r}, expected 'sqlite' or 'postgresql'")
+
+# PRAGMAs run on every new SQLite connection (see tutorials.signals). WAL lets readers
+# run alongside a writer, and the busy timeout (in milliseconds) makes writers queue.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': int(os.environ.get('DB_BUSY_TIMEOUT', 5000)),
+    'mmap_size': int(os.environ.get('DB_MMAP_SIZE', 128 * 1024 * 1024)),
+}
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# CACHE_BACKEND is 'locmem' (default, per process), 'file' or 'redis' (requires the redis package).
+# Invalidations of a locmem cache never reach other processes, so several workers need 'file' or 'redis'.
+
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'locmem')
+
+if CACHE_BACKEND == 'redis':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get('CACHE_LOCATION', 'redis://127.0.0.1:6379'),
+        }
+    }
+elif CACHE_BACKEND == 'file':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('CACHE_LOCATION', BASE_DIR / 'cache'),
+        }
+    }
+elif CACHE_BACKEND == 'locmem':
+    if int(os.environ.get('WEB_CONCURRENCY', 1)) > 1:
+        raise ImproperlyConfigured("Several workers (WEB_CONCURRENCY) need CACHE_BACKEND 'file' or 'redis'")
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'okapi',
+        }
+    }
+else:
+    raise ImproperlyConfigured(f"Unsupported CACHE_BACKEND {CACHE_BACKEND!r}, expected 'locmem', 'file' or 'redis'")
+
+
+# Gravatars
+# Store the hash of each user's email on save, so gravatar URLs never need hashing.
+
+GRAVATAR_STORE_HASH = True
+
+
+# Ticket events
+# Broker used to push new ticket messages to open ticket_events streams. The in-process
+# broker only reaches streams served by the same process; clients that miss an event
+# catch up from their last message id when they reconnect.
+
+TICKET_BROKER = 'tutorials.pubsub.InProcessBroker'
+
+
+# Request timing
+# REQUEST_TIMING=1 enables RequestTimingMiddleware, which adds Server-Timing headers, logs every
+# request on the tutorials.requests logger and keeps the last REQUEST_TIMING_WINDOW requests of
+# each URL for the admin request metrics page.
+
+REQUEST_TIMING = os.environ.get('REQUEST_TIMING', '') not in ('', '0', 'false', 'False')
+REQUEST_TIMING_WINDOW = int(os.environ.get('REQUEST_TIMING_WINDOW', 500))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'tutorials.requests': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
 }
 
 
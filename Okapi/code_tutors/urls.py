@@ -30,6 +30,7 @@ urlpatterns = [
     path('profile/', views.ProfileUpdateView.as_view(), name='profile'),
     path('sign_up/', views.SignUpView.as_view(), name='sign_up'),
     path('usernames/', views.show_usernames, name='show_usernames'),
+    path('usernames/export.csv', views.export_users, name='export_users'),
     path('',include("tutorials.urls")),
     
 ]
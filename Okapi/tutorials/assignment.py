@@ -0,0 +1,227 @@
+"""Assigning tutors to many pending request sessions at once.
+
+The assignment is solved as a min-cost flow from requests, through the tutors
+of their course (see tutorials.matching), to a sink. Sending a request to a
+tutor saves OVERLAP_COST for every hour their availability overlaps the
+request's, and the tutor's edge to the sink costs LOAD_COST more for each
+request they already teach or were given, so work spreads over tutors while
+requests go to the tutors who fit them best. Requests are added one at a time,
+each along the cheapest path, which may move earlier requests to other tutors;
+the flow stays of minimum cost after every step. Paths are searched between
+tutors only, with the cheapest move of a request between two tutors kept in a
+heap, and with node potentials so that Dijkstra's algorithm applies and stops
+as soon as the cheapest path is known. A step thus costs about as much as the
+number of tutors involved rather than the number of requests.
+
+Tutors are only offered requests they are free for (see tutorials.conflicts).
+Two requests of the solution may still clash with each other at one tutor;
+the later one is then solved again with the tutors left free for it.
+"""
+
+import heapq
+import time
+from collections import defaultdict
+from django.db.models import Count
+from django.utils import timezone
+from tutorials.conflicts import TutorBookingIndex
+from tutorials.enrolment import process_requests
+from tutorials.matching import rank_tutors
+from tutorials.models import RequestSession
+
+OVERLAP_COST = 4
+LOAD_COST = 1
+
+
+class AssignmentSolver:
+    """A minimum cost assignment of requests to tutors, grown one request at a time."""
+
+    def __init__(self, loads=None):
+        # Requests each tutor teaches already, outside the requests being assigned
+        self.loads = dict(loads or {})
+        self.counts = defaultdict(int)
+        self.assigned = {}
+        self.costs = {}
+        # The tutors a tutor's requests could move to, and heaps of (cost of the move, request id)
+        self.targets = defaultdict(set)
+        self.moves = defaultdict(list)
+        # Node potentials, so every move costs zero or more once reduced by them
+        self.potentials = {}
+        self.sink_potential = 0
+
+    def load_cost(self, tutor_id):
+        """Return the cost of giving a tutor one more request."""
+
+        return LOAD_COST * (self.loads.get(tutor_id, 0) + self.counts[tutor_id])
+
+    def total_cost(self):
+        """Return the cost of the current assignment."""
+
+        cost = sum(self.costs[request_id][tutor_id] for request_id, tutor_id in self.assigned.items())
+        for tutor_id, count in self.counts.items():
+            base = self.loads.get(tutor_id, 0)
+            cost += LOAD_COST * (count * base + count * (count - 1) // 2)
+        return cost
+
+    def add(self, request_id, costs):
+        """Assign a request to one of the tutors costs maps it to, returning the tutor or None if there is none.
+
+        Earlier requests may move to other tutors on the way.
+        """
+
+        if not costs:
+            return None
+        self.costs[request_id] = costs
+        for tutor_id in costs:
+            if tutor_id not in self.potentials:
+                self.potentials[tutor_id] = self.sink_potential - self.load_cost(tutor_id)
+        # Dijkstra over tutors with the costs reduced by the potentials, which keeps them
+        # from being negative, until the sink is nearer than any tutor left
+        distances = {tutor_id: cost - self.potentials[tutor_id] for tutor_id, cost in costs.items()}
+        previous = dict.fromkeys(costs)
+        heap = [(distance, tutor_id) for tutor_id, distance in distances.items()]
+        heapq.heapify(heap)
+        reached = set()
+        sink_distance = last = None
+        while heap:
+            distance, tutor_id = heapq.heappop(heap)
+            if tutor_id in reached:
+                continue
+            if sink_distance is not None and distance >= sink_distance:
+                break
+            reached.add(tutor_id)
+            to_sink = distance + self.load_cost(tutor_id) + self.potentials[tutor_id] - self.sink_potential
+            if sink_distance is None or to_sink < sink_distance:
+                sink_distance, last = to_sink, tutor_id
+            base = distance + self.potentials[tutor_id]
+            for target in list(self.targets[tutor_id]):
+                if target in reached:
+                    continue
+                move = self._cheapest_move(tutor_id, target)
+                if move is None:
+                    continue
+                target_distance = base + move[0] - self.potentials[target]
+                if target not in distances or target_distance < distances[target]:
+                    distances[target] = target_distance
+                    previous[target] = (tutor_id, move[1])
+                    heapq.heappush(heap, (target_distance, target))
+        for tutor_id in self.potentials:
+            self.potentials[tutor_id] += distances[tutor_id] if tutor_id in reached else sink_distance
+        self.sink_potential += sink_distance
+        self.counts[last] += 1
+        tutor_id = last
+        while previous[tutor_id] is not None:
+            source, moved = previous[tutor_id]
+            self._assign(moved, tutor_id)
+            tutor_id = source
+        self._assign(request_id, tutor_id)
+        return last
+
+    def _assign(self, request_id, tutor_id):
+        self.assigned[request_id] = tutor_id
+        costs = self.costs[request_id]
+        for target, cost in costs.items():
+            if target != tutor_id:
+                heapq.heappush(self.moves[tutor_id, target], (cost - costs[tutor_id], request_id))
+                self.targets[tutor_id].add(target)
+
+    def _cheapest_move(self, tutor_id, target):
+        heap = self.moves[tutor_id, target]
+        # Entries of requests that have since moved away are dropped when they come up
+        while heap and self.assigned[heap[0][1]] != tutor_id:
+            heapq.heappop(heap)
+        if not heap:
+            self.targets[tutor_id].discard(target)
+            return None
+        return heap[0]
+
+
+def tutor_loads(today=None):
+    """Return the number of accepted, unfinished requests of each tutor, by user id."""
+
+    rows = (
+        RequestSession.objects.filter(status='accepted', tutor__isnull=False, end_date__gte=today or timezone.localdate())
+        .values('tutor_id')
+        .annotate(count=Count('id'))
+    )
+    return {row['tutor_id']: row['count'] for row in rows}
+
+
+def tutor_costs(request_session, bookings, only_overlapping=True):
+    """Return the cost of each tutor free to teach a request session, by user id.
+
+    With only_overlapping, tutors must also be available at some time of the request.
+    A request that already names a tutor can only go to that tutor.
+    """
+
+    if request_session.course_id is None:
+        return {}
+    ranked = rank_tutors(request_session.course_id, request_session.availability, only_overlapping)
+    if request_session.tutor_id is not None:
+        ranked = [(tutor_id, overlap) for tutor_id, overlap in ranked if tutor_id == request_session.tutor_id]
+    return {
+        tutor_id: -OVERLAP_COST * overlap
+        for tutor_id, overlap in ranked
+        if bookings.is_free(tutor_id, request_session)
+    }
+
+
+def plan_assignments(request_sessions, only_overlapping=True):
+    """Return the tutor user id to assign to each request session that can have one, by request id."""
+
+    bookings = TutorBookingIndex.build()
+    loads = tutor_loads()
+    plan = {}
+    remaining = sorted(request_sessions, key=lambda request_session: request_session.id)
+    while remaining:
+        solver = AssignmentSolver(loads)
+        for request_session in remaining:
+            solver.add(request_session.id, tutor_costs(request_session, bookings, only_overlapping))
+        # The first assigned request always fits, so every round settles at least one
+        retry = []
+        for request_session in remaining:
+            tutor_id = solver.assigned.get(request_session.id)
+            if tutor_id is None:
+                continue
+            if bookings.is_free(tutor_id, request_session):
+                bookings.add(tutor_id, request_session)
+                loads[tutor_id] = loads.get(tutor_id, 0) + 1
+                plan[request_session.id] = tutor_id
+            else:
+                retry.append(request_session)
+        remaining = retry
+    return plan
+
+
+class AssignmentResult:
+    """The tutors planned for a set of pending requests and, unless it was a dry run, the batch accepting them."""
+
+    def __init__(self, plan, unassigned, seconds, batch=None):
+        self.plan = plan
+        self.unassigned = unassigned
+        self.seconds = seconds
+        self.batch = batch
+
+
+def auto_assign(request_ids=None, only_overlapping=True, dry_run=False):
+    """Assign tutors to pending requests, all of them by default, and accept them in one batch.
+
+    The plan is solved before the batch locks the requests, and the batch checks each
+    request again, so requests accepted or booked meanwhile are skipped rather than
+    double-booked. Tutors who are not available at any time of a request are not given
+    it unless only_overlapping is turned off. With dry_run, nothing is written.
+    """
+
+    started = time.perf_counter()
+    pending = RequestSession.objects.filter(status='pending').only(
+        'id', 'course_id', 'tutor_id', 'availability', 'start_date', 'end_date', 'fortnightly'
+    )
+    if request_ids is not None:
+        pending = pending.filter(id__in=request_ids)
+    pending = list(pending)
+    plan = plan_assignments(pending, only_overlapping)
+    unassigned = [request_session for request_session in pending if request_session.id not in plan]
+    batch = None
+    if plan and not dry_run:
+        batch = process_requests(list(plan), 'accept', tutors=plan)
+        unassigned = sorted(unassigned + batch.skipped, key=lambda request_session: request_session.id)
+    return AssignmentResult(plan, unassigned, time.perf_counter() - started, batch)
@@ -0,0 +1,138 @@
+"""Normalized availability stored as AvailabilitySlot rows.
+
+Tutor, Student and RequestSession keep their availability JSON for display, and
+the receivers in tutorials.signals mirror it into one AvailabilitySlot row per
+weekday and start time. Overlap questions then become indexed range queries on
+``(weekday, start_minute)`` instead of parsing JSON in Python.
+"""
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from tutorials.scheduling import weekday_index
+
+SLOT_MINUTES = 60
+MINUTES_PER_DAY = 24 * 60
+
+
+def parse_minute(time):
+    """Return the minute of the day of an 'H:MM' or 'HH:MM' string, or None if it is not a valid time."""
+
+    try:
+        hours, minutes = str(time).strip().split(':')
+        minute = int(hours) * 60 + int(minutes)
+    except ValueError:
+        return None
+    if not 0 <= int(minutes) < 60 or not 0 <= minute < MINUTES_PER_DAY:
+        return None
+    return minute
+
+
+def _times(value):
+    return [value] if isinstance(value, str) else value
+
+
+def validate_availability(value):
+    """Validate that an availability maps weekday names to a time or a list of times."""
+
+    if not isinstance(value, dict):
+        raise ValidationError('Availability must map weekdays to times.')
+    for day, times in value.items():
+        if weekday_index(day) is None:
+            raise ValidationError(f'{day} is not a weekday.')
+        if not isinstance(times, (str, list)) or any(parse_minute(time) is None for time in _times(times)):
+            raise ValidationError(f'Times for {day} must be HH:MM or a list of HH:MM.')
+
+
+def availability_slots(availability):
+    """Return the set of (weekday, start minute, end minute) slots of an availability dict.
+
+    Each listed time starts a slot of SLOT_MINUTES, clipped at midnight. Unknown days
+    and unreadable times are skipped.
+    """
+
+    slots = set()
+    for day, times in (availability or {}).items():
+        weekday = weekday_index(day)
+        if weekday is None or not isinstance(times, (str, list)):
+            continue
+        for time in _times(times):
+            start = parse_minute(time)
+            if start is not None:
+                slots.add((weekday, start, min(start + SLOT_MINUTES, MINUTES_PER_DAY)))
+    return slots
+
+
+def build_slots(availability, **owner):
+    """Return unsaved AvailabilitySlot rows for an availability dict and an owner (user or request_session)."""
+
+    from tutorials.models import AvailabilitySlot
+
+    return [
+        AvailabilitySlot(weekday=weekday, start_minute=start, end_minute=end, **owner)
+        for weekday, start, end in sorted(availability_slots(availability))
+    ]
+
+
+def _sync_slots(slots, availability, **owner):
+    wanted = availability_slots(availability)
+    if set(slots.values_list('weekday', 'start_minute', 'end_minute')) == wanted:
+        return
+    slots.delete()
+    slots.model.objects.bulk_create(build_slots(availability, **owner))
+
+
+def sync_user_availability(user_id, availability):
+    """Replace the slots of a tutor or student with those in their availability dict."""
+
+    from tutorials.models import AvailabilitySlot
+
+    _sync_slots(AvailabilitySlot.objects.filter(user_id=user_id), availability, user_id=user_id)
+
+
+def sync_request_availability(request_session):
+    """Replace the slots of a request session with those in its availability dict."""
+
+    from tutorials.models import AvailabilitySlot
+
+    _sync_slots(
+        AvailabilitySlot.objects.filter(request_session=request_session),
+        request_session.availability,
+        request_session=request_session
+    )
+
+
+def overlapping_slots(availability):
+    """Return a Q matching slots that overlap any slot of an availability dict, or None if it has none."""
+
+    query = None
+    for weekday, start, end in availability_slots(availability):
+        overlap = Q(weekday=weekday, start_minute__lt=end, end_minute__gt=start)
+        query = overlap if query is None else query | overlap
+    return query
+
+
+def users_available_for(availability, role):
+    """Return the users of a role with at least one slot overlapping an availability dict."""
+
+    from tutorials.models import AvailabilitySlot, User
+
+    query = overlapping_slots(availability)
+    if query is None:
+        return User.objects.none()
+    user_ids = AvailabilitySlot.objects.filter(query, user__role=role).values('user_id')
+    return User.objects.filter(id__in=user_ids)
+
+
+def tutors_available_for(availability, course=None):
+    """Return the tutors, optionally of a course, free at some time of an availability dict."""
+
+    tutors = users_available_for(availability, 'Tutor')
+    if course is not None:
+        tutors = tutors.filter(courses=course)
+    return tutors
+
+
+def students_available_for(availability):
+    """Return the students free at some time of an availability dict."""
+
+    return users_available_for(availability, 'Student')
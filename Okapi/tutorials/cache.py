@@ -0,0 +1,128 @@
+"""Helpers for caching derived data in Django's cache framework.
+
+Cached values live in namespaces. Every key embeds the current version of its
+namespace, so invalidating a namespace is a single increment of its version
+number and stale entries are simply never read again and expire on their own.
+Hits and misses are counted per namespace in this process for monitoring.
+
+Indexes too large to store in the cache, or read too often to unpickle each time,
+are kept in process memory by versioned_index instead and built again once their
+namespace is invalidated.
+"""
+
+from collections import defaultdict
+from functools import wraps
+from threading import Lock
+from time import time_ns
+from django.core.cache import cache
+
+KEY_PREFIX = 'tutorials'
+DEFAULT_TIMEOUT = 60
+
+_MISSING = object()
+_stats = defaultdict(lambda: {'hits': 0, 'misses': 0})
+_stats_lock = Lock()
+
+
+def _version_key(namespace):
+    return f'{KEY_PREFIX}:{namespace}:version'
+
+
+def namespace_version(namespace):
+    """Return the current version of a namespace.
+
+    Versions start from the current time rather than 1, so a version key that was
+    evicted never comes back with a number whose stale entries are still cached.
+    """
+
+    return cache.get_or_set(_version_key(namespace), time_ns, None)
+
+
+def make_key(namespace, *parts):
+    """Return the cache key for the given parts in the current version of a namespace."""
+
+    key = f'{KEY_PREFIX}:{namespace}:v{namespace_version(namespace)}'
+    for part in parts:
+        key += f':{part}'
+    return key
+
+
+def invalidate(namespace):
+    """Make every value cached in a namespace stale."""
+
+    try:
+        cache.incr(_version_key(namespace))
+    except ValueError:
+        # The version was evicted, so start a new one
+        cache.set(_version_key(namespace), time_ns(), None)
+
+
+def _record(namespace, outcome):
+    with _stats_lock:
+        _stats[namespace][outcome] += 1
+
+
+def get_or_compute(namespace, parts, compute, timeout=DEFAULT_TIMEOUT):
+    """Return the value cached under the namespace and parts, computing and storing it on a miss."""
+
+    key = make_key(namespace, *parts)
+    value = cache.get(key, _MISSING)
+    if value is not _MISSING:
+        _record(namespace, 'hits')
+        return value
+    _record(namespace, 'misses')
+    value = compute()
+    cache.set(key, value, timeout)
+    return value
+
+
+def memoize(namespace, timeout=DEFAULT_TIMEOUT):
+    """Decorator caching a function's result in a namespace, keyed by its positional arguments."""
+
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args):
+            return get_or_compute(namespace, args, lambda: function(*args), timeout)
+        return wrapper
+    return decorator
+
+
+_indexes = {}
+
+
+def versioned_index(namespace, build):
+    """Return a function returning the value of build(), kept in process memory.
+
+    The value is built on first use and again whenever the namespace's version has
+    changed since, so invalidating the namespace reaches every process.
+    """
+
+    def get_index():
+        version = namespace_version(namespace)
+        built = _indexes.get(namespace)
+        if built is None or built[0] != version:
+            built = (version, build())
+            _indexes[namespace] = built
+        return built[1]
+
+    return get_index
+
+
+def clear_indexes():
+    """Drop every index kept in process memory, so each is built again when next used."""
+
+    _indexes.clear()
+
+
+def cache_stats():
+    """Return a copy of the hit and miss counters of each namespace."""
+
+    with _stats_lock:
+        return {namespace: dict(counts) for namespace, counts in _stats.items()}
+
+
+def reset_cache_stats():
+    """Clear the hit and miss counters."""
+
+    with _stats_lock:
+        _stats.clear()
@@ -0,0 +1,21 @@
+"""Read-mostly queries shared by several views, memoized with tutorials.cache.
+
+The namespaces used here are invalidated by the receivers in tutorials.signals.
+"""
+
+from tutorials.cache import invalidate, memoize
+from tutorials.models import Course
+
+COURSES_NAMESPACE = 'courses'
+
+
+@memoize(COURSES_NAMESPACE, timeout=300)
+def course_catalogue():
+    """Return a list of every course offered."""
+
+    return list(Course.objects.all())
+
+
+def invalidate_courses():
+    invalidate(COURSES_NAMESPACE)
+
@@ -0,0 +1,160 @@
+"""iCalendar feeds of a student's or tutor's sessions.
+
+A feed lists one event per dated occurrence of the user's accepted request
+sessions (see tutorials.occurrences), in UTC, so every weekday slot and
+fortnightly schedule is already expanded and daylight saving needs no time
+zone definitions. Calendar apps poll feeds without logging in, so each feed
+lives at a URL signed for its user.
+
+The version of a feed is read with one aggregate query: the latest update of
+any of the user's requests, or of the user, course or other user they show,
+and the number of requests accepted. It gives the feed's
+ETag, so a poll of an unchanged feed is answered with 304 Not Modified before
+anything is rendered, and it keys the rendered feed in the cache, so changes
+never need invalidating. Feeds have no Last-Modified header: deleting the most
+recently updated request moves the latest update back in time, and a client
+comparing dates would keep the feed that still showed it.
+"""
+
+from datetime import timezone
+from django.core import signing
+from django.db.models import Count, Max, Q
+from tutorials.cache import get_or_compute
+from tutorials.models import RequestSession, SessionOccurrence, User
+from tutorials.timetable import SESSION_USER_FIELDS
+
+CALENDAR_NAMESPACE = 'calendar_feed'
+CALENDAR_TIMEOUT = 60 * 60 * 24
+FEED_SALT = 'tutorials.calendars'
+PRODUCT_ID = '-//Okapi//Tutoring sessions//EN'
+UID_DOMAIN = 'okapi'
+# iCalendar lines longer than this many octets are folded
+LINE_OCTETS = 75
+
+
+def feed_token(user):
+    """Return the signed token of a user's feed URL."""
+
+    return signing.Signer(salt=FEED_SALT).sign(str(user.pk))
+
+
+def feed_user(token):
+    """Return the student or tutor a feed token was signed for, or None if it is not valid."""
+
+    try:
+        user_id = signing.Signer(salt=FEED_SALT).unsign(token)
+    except signing.BadSignature:
+        return None
+    return User.objects.filter(pk=user_id, role__in=SESSION_USER_FIELDS).first()
+
+
+def feed_version(user):
+    """Return when a user's feed last changed, or None if it never had sessions, and its ETag.
+
+    Feeds show the names of the user, their courses and the tutors or students they
+    meet, so renaming any of them changes the version as well.
+    """
+
+    field = SESSION_USER_FIELDS[user.role]
+    other = 'tutor' if field == 'student' else 'student'
+    version = RequestSession.objects.filter(**{field: user}).aggregate(
+        sessions=Max('updated_at'), courses=Max('course__updated_at'), others=Max(f'{other}__updated_at'),
+        accepted=Count('id', filter=Q(status='accepted')),
+    )
+    if version['sessions'] is None:
+        return None, f'"{user.pk}-0-0"'
+    updated = max(
+        moment for moment in (version['sessions'], version['courses'], version['others'], user.updated_at)
+        if moment is not None
+    )
+    stamp = int(updated.timestamp() * 1_000_000)
+    return updated, f'"{user.pk}-{stamp}-{version["accepted"]}"'
+
+
+def escape_text(value):
+    """Return a value escaped for an iCalendar TEXT property."""
+
+    return (
+        str(value).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+        .replace('\r\n', '\\n').replace('\n', '\\n')
+    )
+
+
+def fold(line):
+    """Return a content line folded into lines of at most LINE_OCTETS octets, as RFC 5545 requires."""
+
+    encoded = line.encode()
+    if len(encoded) <= LINE_OCTETS:
+        return line
+    parts = []
+    start = 0
+    limit = LINE_OCTETS
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        # Never split a multibyte character
+        while end < len(encoded) and (encoded[end] & 0xC0) == 0x80:
+            end -= 1
+        parts.append(encoded[start:end].decode())
+        start = end
+        # Continuation lines start with a space
+        limit = LINE_OCTETS - 1
+    return '\r\n '.join(parts)
+
+
+def format_utc(moment):
+    return moment.astimezone(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def occurrence_event(occurrence, user, stamp):
+    """Return the content lines of the event of an occurrence, as seen by a user."""
+
+    request_session = occurrence.request_session
+    course = request_session.course.name if request_session.course else 'Session'
+    other = occurrence.tutor if user.role == 'Student' else occurrence.student
+    lines = [
+        'BEGIN:VEVENT',
+        # Occurrences are rebuilt when their request changes, so the UID is made from what they are
+        f'UID:{request_session.id}-{format_utc(occurrence.starts_at)}@{UID_DOMAIN}',
+        f'DTSTAMP:{stamp}',
+        f'DTSTART:{format_utc(occurrence.starts_at)}',
+        f'DTEND:{format_utc(occurrence.ends_at)}',
+        f'SUMMARY:{escape_text(course)}',
+        f'LOCATION:{escape_text(request_session.venue)}',
+    ]
+    if other is not None:
+        role = 'Tutor' if user.role == 'Student' else 'Student'
+        lines.append(f'DESCRIPTION:{escape_text(f"{role}: {other.full_name()}")}')
+    lines.append('END:VEVENT')
+    return lines
+
+
+def render_feed(user, updated):
+    """Return the iCalendar text of a user's occurrences."""
+
+    field = SESSION_USER_FIELDS[user.role]
+    occurrences = (
+        SessionOccurrence.objects.filter(**{field: user})
+        .select_related('request_session__course', 'tutor', 'student')
+        .order_by('starts_at', 'id')
+    )
+    stamp = format_utc(updated) if updated else '19700101T000000Z'
+    lines = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        f'PRODID:{PRODUCT_ID}',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f'X-WR-CALNAME:{escape_text(f"Okapi sessions of {user.full_name()}")}',
+    ]
+    for occurrence in occurrences.iterator():
+        lines.extend(occurrence_event(occurrence, user, stamp))
+    lines.append('END:VCALENDAR')
+    return ''.join(fold(line) + '\r\n' for line in lines)
+
+
+def cached_feed(user, updated, etag):
+    """Return the iCalendar text of a user's feed at a version, rendering it only if it is not cached."""
+
+    return get_or_compute(
+        CALENDAR_NAMESPACE, (user.pk, etag.strip('"')), lambda: render_feed(user, updated), CALENDAR_TIMEOUT
+    )
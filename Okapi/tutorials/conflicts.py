@@ -0,0 +1,140 @@
+"""In-memory index of tutors' bookings, for catching double-booked tutors.
+
+Each accepted request session with a tutor books that tutor for its weekly slots
+(see tutorials.availability) on the dates between its start and end date, every
+week or every other week. The index keeps those bookings grouped by tutor and
+weekday, so whether a tutor is free for a request only compares the request's
+slots with the tutor's bookings on the same weekdays. One query builds it, and
+tutorials.cache.versioned_index keeps it until the tutor_booking_index namespace
+is invalidated.
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+from tutorials.availability import availability_slots
+from tutorials.cache import invalidate, versioned_index
+from tutorials.models import RequestSession
+from tutorials.scheduling import as_date
+
+TUTOR_BOOKING_NAMESPACE = 'tutor_booking_index'
+
+
+class TutorUnavailable(Exception):
+    """A tutor is already booked at some time of a request session."""
+
+    def __init__(self, tutor_id, conflicting_ids):
+        self.tutor_id = tutor_id
+        self.conflicting_ids = conflicting_ids
+        super().__init__(f'Tutor {tutor_id} is already booked by requests {conflicting_ids}.')
+
+
+class Booking:
+    """A weekly slot of a request session, on the dates it runs."""
+
+    __slots__ = ('request_id', 'start_minute', 'end_minute', 'first_date', 'end_date', 'step')
+
+    def __init__(self, request_id, weekday, start_minute, end_minute, start_date, end_date, fortnightly):
+        start_date = as_date(start_date)
+        self.request_id = request_id
+        self.start_minute = start_minute
+        self.end_minute = end_minute
+        # The first date on the weekday, from which the booking repeats every step days
+        self.first_date = start_date + timedelta(days=(weekday - start_date.weekday()) % 7)
+        self.end_date = as_date(end_date)
+        self.step = 14 if fortnightly else 7
+
+    def overlaps(self, other):
+        """Return whether two bookings on the same weekday meet at the same time on some date."""
+
+        if self.start_minute >= other.end_minute or other.start_minute >= self.end_minute:
+            return False
+        last = min(self.end_date, other.end_date)
+        # Both run on the same weekday, so their dates are whole weeks apart. Two fortnightly
+        # bookings only meet if they run in the same weeks.
+        if self.step == other.step == 14 and (self.first_date - other.first_date).days % 14:
+            return False
+        # Every date of the sparser booking from the later start is a date of the other one
+        sparse, dense = (self, other) if self.step >= other.step else (other, self)
+        first = max(sparse.first_date, dense.first_date)
+        behind = (first - sparse.first_date).days
+        first += timedelta(days=-behind % sparse.step)
+        return first <= last
+
+
+def request_bookings(request_id, availability, start_date, end_date, fortnightly):
+    """Return the bookings of a request session's slots, as (weekday, booking) pairs."""
+
+    return [
+        (weekday, Booking(request_id, weekday, start, end, start_date, end_date, fortnightly))
+        for weekday, start, end in sorted(availability_slots(availability))
+    ]
+
+
+class TutorBookingIndex:
+    """The bookings of each tutor, grouped by weekday."""
+
+    def __init__(self):
+        self.bookings = defaultdict(lambda: defaultdict(list))
+
+    def add(self, tutor_id, request_session):
+        """Book a tutor for the slots of a request session."""
+
+        for weekday, booking in request_bookings(
+            request_session.id, request_session.availability,
+            request_session.start_date, request_session.end_date, request_session.fortnightly,
+        ):
+            self.bookings[tutor_id][weekday].append(booking)
+
+    @classmethod
+    def build(cls, tutor_ids=None):
+        """Return an index of the accepted request sessions with a tutor (or one of tutor_ids), read from the database."""
+
+        index = cls()
+        rows = RequestSession.objects.filter(status='accepted', tutor__isnull=False)
+        if tutor_ids is not None:
+            rows = rows.filter(tutor__in=tutor_ids)
+        rows = rows.values_list('id', 'tutor_id', 'availability', 'start_date', 'end_date', 'fortnightly')
+        for request_id, tutor_id, availability, start_date, end_date, fortnightly in rows:
+            for weekday, booking in request_bookings(request_id, availability, start_date, end_date, fortnightly):
+                index.bookings[tutor_id][weekday].append(booking)
+        return index
+
+    def conflicts(self, tutor_id, request_session):
+        """Return the sorted ids of the other requests booking a tutor when a request session needs them."""
+
+        tutor_bookings = self.bookings.get(tutor_id)
+        if not tutor_bookings:
+            return []
+        found = set()
+        for weekday, wanted in request_bookings(
+            request_session.id, request_session.availability,
+            request_session.start_date, request_session.end_date, request_session.fortnightly,
+        ):
+            for booking in tutor_bookings.get(weekday, ()):
+                if booking.request_id != request_session.id and wanted.overlaps(booking):
+                    found.add(booking.request_id)
+        return sorted(found)
+
+    def is_free(self, tutor_id, request_session):
+        return not self.conflicts(tutor_id, request_session)
+
+
+# Returns the tutor booking index, rebuilding it if it was invalidated
+get_booking_index = versioned_index(TUTOR_BOOKING_NAMESPACE, TutorBookingIndex.build)
+
+
+def tutor_conflicts(tutor_id, request_session):
+    """Return the ids of the accepted requests that already book a tutor at some time of a request session."""
+
+    return get_booking_index().conflicts(tutor_id, request_session)
+
+
+def free_tutors(tutor_ids, request_session):
+    """Return the tutor ids, in order, of the tutors free at every time of a request session."""
+
+    index = get_booking_index()
+    return [tutor_id for tutor_id in tutor_ids if index.is_free(tutor_id, request_session)]
+
+
+def invalidate_booking_index():
+    invalidate(TUTOR_BOOKING_NAMESPACE)
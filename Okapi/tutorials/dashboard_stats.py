@@ -0,0 +1,53 @@
+"""Counters shown on the admin dashboard.
+
+The counters are gathered in two queries, one conditional aggregate over users and
+one UNION ALL of the remaining table counts, and memoized with tutorials.cache for a
+short time. Signal handlers in tutorials.signals drop the cached copy whenever a row that
+feeds a counter is saved or deleted; bulk updates skip those signals, so the
+timeout bounds how stale a counter can get.
+"""
+
+from django.db.models import CharField, Count, Q, Value
+from tutorials.cache import invalidate, memoize
+from tutorials.models import Course, Invoices, RequestSession, User
+
+DASHBOARD_STATS_NAMESPACE = 'dashboard_stats'
+DASHBOARD_STATS_TIMEOUT = 60
+
+
+def _labelled_count(queryset, label):
+    """Return a queryset yielding a single (label, row count) pair for the queryset."""
+
+    return queryset.annotate(
+        stat=Value(label, output_field=CharField())
+    ).values('stat').annotate(total=Count('id')).values_list('stat', 'total')
+
+
+def compute_dashboard_stats():
+    """Return the admin dashboard counters, read from the database."""
+
+    stats = User.objects.aggregate(
+        students_count=Count('id', filter=Q(role='Student')),
+        tutors_count=Count('id', filter=Q(role='Tutor')),
+        admin_count=Count('id', filter=Q(role='Admin')),
+    )
+    other_counts = _labelled_count(RequestSession.objects.filter(status='pending'), 'request_count').union(
+        _labelled_count(Course.objects.all(), 'courses_count'),
+        _labelled_count(Invoices.objects.filter(status=False), 'unpaid_invoices_count'),
+        all=True
+    )
+    stats.update(dict(other_counts))
+    return stats
+
+
+@memoize(DASHBOARD_STATS_NAMESPACE, timeout=DASHBOARD_STATS_TIMEOUT)
+def get_dashboard_stats():
+    """Return the admin dashboard counters, from the cache when they are fresh."""
+
+    return compute_dashboard_stats()
+
+
+def invalidate_dashboard_stats():
+    """Drop the cached counters so the next dashboard load recomputes them."""
+
+    invalidate(DASHBOARD_STATS_NAMESPACE)
@@ -0,0 +1,49 @@
+"""Queries behind the admin user directory.
+
+Search matches a case-insensitive prefix of the username or last name. Instead of
+LIKE, which most databases cannot answer from an index without special collations,
+a prefix is turned into the range ``prefix <= LOWER(column) < next prefix`` that
+the user_username_lower and user_last_name_lower indexes answer directly.
+"""
+
+from django.db.models import Q
+from django.db.models.functions import Lower
+from tutorials.models import User
+
+DIRECTORY_FIELDS = ('id', 'username', 'first_name', 'last_name', 'email', 'role')
+ROLES = [role for role, _ in User._meta.get_field('role').choices]
+
+
+def prefix_upper_bound(prefix):
+    """Return the smallest string greater than every string starting with prefix."""
+
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def prefix_filter(field, prefix):
+    """Return a Q matching rows whose field, lowercased, starts with the lowercased prefix."""
+
+    prefix = prefix.lower()
+    return Q(**{
+        f'{field}_lower__gte': prefix,
+        f'{field}_lower__lt': prefix_upper_bound(prefix),
+    })
+
+
+def directory_users(search='', role=''):
+    """Return the directory rows of the users matching a search prefix and role, as named tuples.
+
+    An empty search or role matches every user, as does a role that does not exist.
+    """
+
+    users = User.objects.all()
+    if role in ROLES:
+        users = users.filter(role=role)
+    search = search.strip()
+    if search:
+        # Every username starts with @, so let admins leave it out
+        username_prefix = search if search.startswith('@') else f'@{search}'
+        users = users.annotate(
+            username_lower=Lower('username'), last_name_lower=Lower('last_name')
+        ).filter(prefix_filter('username', username_prefix) | prefix_filter('last_name', search))
+    return users.values_list(*DIRECTORY_FIELDS, named=True)
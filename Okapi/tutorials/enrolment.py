@@ -0,0 +1,169 @@
+"""Accepting and rejecting request sessions.
+
+An accepted request is billed with one invoice, due a few days after the request
+starts, for the course price times the number of sessions it books. Invoices are
+linked to their request by a unique field, and requests are locked while they are
+accepted, so accepting a request twice, even from two admins at once, never bills
+it twice. A tutor is only assigned to requests that do not clash with the sessions
+they already teach (see tutorials.conflicts). Requests can be processed in batches:
+a batch is locked, updated and invoiced in one transaction with a constant number
+of queries, however many requests it holds.
+"""
+
+import time
+from datetime import timedelta
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from tutorials.conflicts import TutorBookingIndex, TutorUnavailable, invalidate_booking_index
+from tutorials.matching import rank_tutors
+from tutorials.models import Invoices, RequestSession, User
+from tutorials.occurrences import sync_occurrences
+from tutorials.scheduling import count_sessions
+
+INVOICE_DUE_DAYS = 3
+BATCH_ACTIONS = {
+    'accept': 'accepted',
+    'reject': 'rejected',
+}
+
+
+def build_invoice(request_session, tutor_id):
+    """Return the unsaved invoice billing a request taught by the given tutor."""
+
+    session_count = count_sessions(
+        request_session.start_date,
+        request_session.end_date,
+        request_session.availability,
+        request_session.fortnightly,
+    )
+    return Invoices(
+        due_date=request_session.start_date + timedelta(days=INVOICE_DUE_DAYS),
+        course_id=request_session.course_id,
+        student_id=request_session.student_id,
+        tutor_id=tutor_id,
+        request_session_id=request_session.id,
+        total=request_session.course.price * session_count,
+    )
+
+
+def accept_request(request_id, tutor_id):
+    """Accept a request with a tutor and invoice it, returning the request, its invoice and whether it was created.
+
+    The request row is locked until the transaction ends, so concurrent accepts of one
+    request run one after the other and only the first creates an invoice. A request
+    that already has an invoice, say one accepted, rejected and accepted again, is
+    accepted with the tutor but keeps that invoice. Raises TutorUnavailable if the tutor
+    already teaches at some time of the request; the tutor's row is locked while that
+    is checked, so two requests cannot book them at once.
+    """
+
+    with transaction.atomic():
+        request_session = (
+            RequestSession.objects.select_for_update(of=('self',)).select_related('course').get(id=request_id)
+        )
+        # Accepts booking the same tutor wait here for each other
+        User.objects.select_for_update().only('id').get(id=tutor_id)
+        conflicts = TutorBookingIndex.build(tutor_ids=[tutor_id]).conflicts(tutor_id, request_session)
+        if conflicts:
+            raise TutorUnavailable(tutor_id, conflicts)
+        request_session.status = 'accepted'
+        request_session.tutor_id = tutor_id
+        invoice = Invoices.objects.filter(request_session=request_session).first()
+        created = invoice is None
+        if created:
+            invoice = build_invoice(request_session, tutor_id)
+            try:
+                # The unique link still holds if the database could not lock the row
+                with transaction.atomic():
+                    invoice.save()
+            except IntegrityError:
+                invoice = Invoices.objects.get(request_session=request_session)
+                created = False
+        request_session.save(update_fields=['status', 'tutor', 'updated_at'])
+    return request_session, invoice, created
+
+
+class BatchResult:
+    """What a batch of requests was processed into, and how long it took."""
+
+    def __init__(self, processed, skipped, invoices, seconds):
+        self.processed = processed
+        self.skipped = skipped
+        self.invoices = invoices
+        self.seconds = seconds
+
+    @property
+    def per_second(self):
+        """Return how many requests were processed per second."""
+
+        return len(self.processed) / self.seconds if self.seconds else 0.0
+
+
+def process_requests(request_ids, action, tutors=None):
+    """Accept or reject the pending requests with the given ids in one transaction.
+
+    tutors optionally maps request ids to the tutor user id to assign. Other accepted
+    requests keep the tutor they already have or get the best free match of their
+    course from tutorials.matching. Requests that are not pending, and accepted
+    requests without a course, with no free tutor to assign or mapped to a user who is
+    not a tutor or is busy, are skipped. Tutors assigned earlier in the batch count as
+    busy for later requests. Requests that were invoiced before are accepted without a
+    new invoice.
+    """
+
+    status = BATCH_ACTIONS[action]
+    tutors = tutors or {}
+    started = time.perf_counter()
+    with transaction.atomic():
+        requests = list(
+            RequestSession.objects.select_for_update(of=('self',))
+            .select_related('course')
+            .filter(id__in=request_ids, status='pending')
+            .order_by('id')
+        )
+        processed, skipped, invoices = [], [], []
+        if status == 'rejected':
+            processed = requests
+        else:
+            known_tutors = set(
+                User.objects.filter(id__in=set(tutors.values()), role='Tutor').values_list('id', flat=True)
+            )
+            invoiced = set(
+                Invoices.objects.filter(request_session__in=requests).values_list('request_session_id', flat=True)
+            )
+            bookings = TutorBookingIndex.build()
+            for request_session in requests:
+                tutor_id = _tutor_for(request_session, tutors.get(request_session.id), known_tutors, bookings)
+                if request_session.course is None or tutor_id is None:
+                    skipped.append(request_session)
+                    continue
+                request_session.tutor_id = tutor_id
+                bookings.add(tutor_id, request_session)
+                if request_session.id not in invoiced:
+                    invoices.append(build_invoice(request_session, tutor_id))
+                processed.append(request_session)
+        # bulk_update does not fill in auto_now fields itself
+        now = timezone.now()
+        for request_session in processed:
+            request_session.status = status
+            request_session.updated_at = now
+        RequestSession.objects.bulk_update(processed, ['status', 'tutor', 'updated_at'])
+        Invoices.objects.bulk_create(invoices)
+        # bulk_update sends no post_save, so build the calendar of the batch and
+        # refresh the tutors' bookings here
+        sync_occurrences(processed)
+        transaction.on_commit(invalidate_booking_index)
+    return BatchResult(processed, skipped, invoices, time.perf_counter() - started)
+
+
+def _tutor_for(request_session, chosen, known_tutors, bookings):
+    if chosen is not None:
+        return chosen if chosen in known_tutors and bookings.is_free(chosen, request_session) else None
+    if request_session.tutor_id is not None:
+        return request_session.tutor_id if bookings.is_free(request_session.tutor_id, request_session) else None
+    if request_session.course_id is None:
+        return None
+    for tutor_id, overlap in rank_tutors(request_session.course_id, request_session.availability):
+        if bookings.is_free(tutor_id, request_session):
+            return tutor_id
+    return None
@@ -0,0 +1,119 @@
+"""Streaming exports of query results.
+
+Rows are read from the database in chunks with QuerySet.iterator(), which uses a
+server-side cursor where the database supports one, and written to the response
+as they are produced. An export never holds every row in memory and the first
+bytes are sent as soon as the first chunk is read. Rows are written as CSV or as
+NDJSON (one JSON object per line).
+
+ASGI servers read a synchronous iterator into a list before sending any of it, so
+responses to ASGI requests stream an asynchronous iterator that reads a chunk of
+lines at a time in the thread the view's queries run in.
+"""
+
+import csv
+from itertools import islice
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_FORMATS = ['csv', 'ndjson']
+
+# Export column names and the lookups they are read from
+INVOICE_EXPORT_COLUMNS = {
+    'id': 'id',
+    'student': 'student__username',
+    'tutor': 'tutor__username',
+    'course': 'course__name',
+    'due_date': 'due_date',
+    'payment_date': 'payment_date',
+    'paid': 'status',
+    'total': 'total',
+}
+SESSION_EXPORT_COLUMNS = {
+    'id': 'id',
+    'student': 'student__username',
+    'tutor': 'tutor__username',
+    'course': 'course__name',
+    'start_date': 'start_date',
+    'end_date': 'end_date',
+    'status': 'status',
+    'fortnightly': 'fortnightly',
+    'venue': 'venue',
+}
+
+
+class Echo:
+    """File-like object whose write() returns what was written, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def csv_rows(header, rows):
+    """Yield the header and each row as a line of CSV."""
+
+    writer = csv.writer(Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+async def chunked_lines(lines):
+    """Yield the lines of a synchronous iterator joined EXPORT_CHUNK_SIZE at a time, read in a worker thread."""
+
+    read_chunk = sync_to_async(lambda: ''.join(islice(lines, EXPORT_CHUNK_SIZE)))
+    while chunk := await read_chunk():
+        yield chunk
+
+
+def streamed_lines(lines, asynchronous):
+    """Return lines as a StreamingHttpResponse should be given them, asynchronously for ASGI requests."""
+
+    return chunked_lines(lines) if asynchronous else lines
+
+
+def csv_response(filename, header, queryset, asynchronous=False):
+    """Return a response streaming a values_list queryset as a CSV attachment.
+
+    Pass asynchronous=True when answering an ASGI request.
+    """
+
+    response = StreamingHttpResponse(
+        streamed_lines(csv_rows(header, queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE)), asynchronous),
+        content_type='text/csv'
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def ndjson_rows(header, rows):
+    """Yield each row as a JSON object keyed by the header, one per line."""
+
+    encoder = DjangoJSONEncoder(separators=(',', ':'))
+    for row in rows:
+        yield encoder.encode(dict(zip(header, row))) + '\n'
+
+
+def ndjson_response(filename, header, queryset, asynchronous=False):
+    """Return a response streaming a values_list queryset as an NDJSON attachment.
+
+    Pass asynchronous=True when answering an ASGI request.
+    """
+
+    response = StreamingHttpResponse(
+        streamed_lines(ndjson_rows(header, queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE)), asynchronous),
+        content_type='application/x-ndjson'
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def export_response(export_format, name, columns, queryset, asynchronous=False):
+    """Return a response streaming the columns of a queryset as name.csv or name.ndjson."""
+
+    rows = queryset.values_list(*columns.values())
+    if export_format == 'ndjson':
+        return ndjson_response(f'{name}.ndjson', list(columns), rows, asynchronous)
+    return csv_response(f'{name}.csv', list(columns), rows, asynchronous)
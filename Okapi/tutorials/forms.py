@@ -3,7 +3,8 @@ from django import forms
 from django.forms import  ModelForm
 from django.contrib.auth import authenticate
 from django.core.validators import RegexValidator
-from .models import User, Course
+from .exports import EXPORT_FORMATS
+from .models import User, Course, RequestSession
 
 
 class LogInForm(forms.Form):
@@ -130,4 +131,63 @@ class CourseForm(forms.ModelForm):
         queryset=tutor_users_queryset,
         widget=forms.SelectMultiple,  # Optional: Allows selection with checkboxes
         label="Users"
-    )
\ No newline at end of file
+    )
+
+
+class ExportForm(forms.Form):
+    """Format and filters of an admin export, read from the query string."""
+
+    date_field = None
+
+    format = forms.ChoiceField(choices=[(name, name) for name in EXPORT_FORMATS], required=False)
+    start = forms.DateField(required=False)
+    end = forms.DateField(required=False)
+    status = forms.ChoiceField(choices=[('', 'Any')], required=False)
+
+    def clean(self):
+        """Check that the date range does not end before it starts."""
+
+        super().clean()
+        start = self.cleaned_data.get('start')
+        end = self.cleaned_data.get('end')
+        if start and end and end < start:
+            self.add_error('end', 'The end date must not be before the start date.')
+        return self.cleaned_data
+
+    def status_filter(self, status):
+        """Return the lookups selecting rows with the given status."""
+
+        return {'status': status}
+
+    def filter(self, queryset):
+        """Return the queryset limited to the date range and status of this form."""
+
+        start = self.cleaned_data.get('start')
+        end = self.cleaned_data.get('end')
+        status = self.cleaned_data.get('status')
+        if start:
+            queryset = queryset.filter(**{f'{self.date_field}__gte': start})
+        if end:
+            queryset = queryset.filter(**{f'{self.date_field}__lte': end})
+        if status:
+            queryset = queryset.filter(**self.status_filter(status))
+        return queryset
+
+
+class InvoiceExportForm(ExportForm):
+    """Export filters for invoices, by due date and paid status."""
+
+    date_field = 'due_date'
+
+    status = forms.ChoiceField(choices=[('', 'Any'), ('paid', 'Paid'), ('unpaid', 'Unpaid')], required=False)
+
+    def status_filter(self, status):
+        return {'status': status == 'paid'}
+
+
+class SessionExportForm(ExportForm):
+    """Export filters for request sessions, by start date and request status."""
+
+    date_field = 'start_date'
+
+    status = forms.ChoiceField(choices=[('', 'Any')] + RequestSession.STATUS_CHOICES, required=False)
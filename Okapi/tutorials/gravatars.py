@@ -0,0 +1,44 @@
+"""Memoized gravatar URLs.
+
+Gravatar URLs only depend on the MD5 hash of the sanitized email and the image
+size, so both steps are kept in bounded LRU caches in this process. Keys include
+the email (or its hash), so a user whose email changes never gets the old URL.
+When the GRAVATAR_STORE_HASH setting is on, User.save() also stores the hash in
+User.email_hash, and pages listing many users never hash at all. The stored hash
+is only used while the user's email is the one it was computed from, and
+QuerySet.update() clears it when it changes emails.
+"""
+
+from functools import lru_cache
+from libgravatar import Gravatar, md5_hash, sanitize_email
+
+GRAVATAR_CACHE_SIZE = 4096
+DEFAULT_IMAGE = 'mp'
+
+
+class HashedGravatar(Gravatar):
+    """Gravatar of an email whose hash is already known."""
+
+    def __init__(self, email_hash):
+        self.email_hash = email_hash
+
+
+@lru_cache(maxsize=GRAVATAR_CACHE_SIZE)
+def email_hash(email):
+    """Return the gravatar hash of an email address."""
+
+    return md5_hash(sanitize_email(email))
+
+
+@lru_cache(maxsize=GRAVATAR_CACHE_SIZE)
+def gravatar_url(hashed_email, size):
+    """Return the URL of the gravatar with the given email hash and size."""
+
+    return HashedGravatar(hashed_email).get_image(size=size, default=DEFAULT_IMAGE)
+
+
+def clear_gravatar_caches():
+    """Empty the hash and URL caches."""
+
+    email_hash.cache_clear()
+    gravatar_url.cache_clear()
@@ -9,4 +9,30 @@ def login_prohibited(view_function):
             return redirect(settings.REDIRECT_URL_WHEN_LOGGED_IN)
         else:
             return view_function(request)
-    return modified_view_function
\ No newline at end of file
+    return modified_view_function
+
+def parse_cursor(value):
+    """Return the integer cursor in a query string value, or None if it is missing or invalid."""
+
+    try:
+        cursor = int(value)
+    except (TypeError, ValueError):
+        return None
+    return cursor if cursor > 0 else None
+
+def keyset_paginate(queryset, after=None, page_size=20):
+    """Return a page of the queryset, newest id first, and the cursor of the next page.
+
+    Rows are selected with ``id < after`` rather than an OFFSET, so every page is a
+    single index range scan however deep the user pages. The cursor is None on the last page.
+    """
+
+    queryset = queryset.order_by('-id')
+    if after is not None:
+        queryset = queryset.filter(id__lt=after)
+    page = list(queryset[:page_size + 1])
+    next_cursor = None
+    if len(page) > page_size:
+        page = page[:page_size]
+        next_cursor = page[-1].id
+    return page, next_cursor
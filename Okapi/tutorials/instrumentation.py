@@ -0,0 +1,198 @@
+"""Per-request SQL and timing measurements.
+
+RequestTimingMiddleware opens a RequestMetrics collector for each request. Every
+query run on any database connection while it is open is counted and timed, and
+templates rendered through InstrumentedDjangoTemplates add their render time to it.
+Finished requests are kept in a rolling window per URL name in this process, from
+which request_stats() builds latency histograms for the admin metrics page.
+"""
+
+from collections import Counter, defaultdict, deque
+from contextvars import ContextVar
+from math import ceil
+from threading import Lock
+from time import perf_counter
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, Template, reraise
+
+# Upper bounds in milliseconds of the latency histogram buckets, the last one is open ended
+HISTOGRAM_BOUNDS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500]
+DEFAULT_WINDOW = 500
+
+_current = ContextVar('request_metrics', default=None)
+_samples = defaultdict(deque)
+_samples_lock = Lock()
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 3)
+
+
+class RequestMetrics:
+    """Queries and time spent handling a single request."""
+
+    def __init__(self):
+        self.started = perf_counter()
+        self.view_started = None
+        self.finished = None
+        self.queries = Counter()
+        self.sql_seconds = 0.0
+        self.template_seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        """Database execute wrapper timing each query and remembering its SQL and parameters."""
+
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_seconds += perf_counter() - started
+            self.queries[(sql, repr(params))] += 1
+
+    def activate(self):
+        """Make this the collector of the current request, returning a token for deactivate()."""
+
+        return _current.set(self)
+
+    def deactivate(self, token):
+        self.finished = perf_counter()
+        _current.reset(token)
+
+    @property
+    def query_count(self):
+        return sum(self.queries.values())
+
+    @property
+    def duplicate_count(self):
+        """Return how many queries repeated an earlier query of the request with the same parameters."""
+
+        return sum(count - 1 for count in self.queries.values())
+
+    def most_duplicated(self):
+        """Return the SQL of the most repeated query and its count, or None if no query repeated."""
+
+        if not self.queries:
+            return None
+        (sql, _), count = self.queries.most_common(1)[0]
+        return (sql, count) if count > 1 else None
+
+    def as_dict(self):
+        """Return the measurements in milliseconds."""
+
+        end = self.finished or perf_counter()
+        return {
+            'queries': self.query_count,
+            'duplicate_queries': self.duplicate_count,
+            'sql_ms': _ms(self.sql_seconds),
+            'template_ms': _ms(self.template_seconds),
+            'view_ms': _ms(end - self.view_started) if self.view_started is not None else 0.0,
+            'total_ms': _ms(end - self.started),
+        }
+
+    def server_timing(self):
+        """Return the value of a Server-Timing header describing the request."""
+
+        metrics = self.as_dict()
+        return ', '.join([
+            f'sql;dur={metrics["sql_ms"]};desc="{metrics["queries"]} queries, '
+            f'{metrics["duplicate_queries"]} duplicates"',
+            f'template;dur={metrics["template_ms"]}',
+            f'view;dur={metrics["view_ms"]}',
+            f'total;dur={metrics["total_ms"]}',
+        ])
+
+
+def current_metrics():
+    """Return the collector of the request being handled, or None outside an instrumented request."""
+
+    return _current.get()
+
+
+class TimedTemplate(Template):
+    """Django template adding its render time to the current request's metrics."""
+
+    def render(self, context=None, request=None):
+        metrics = current_metrics()
+        if metrics is None:
+            return super().render(context, request)
+        started = perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            metrics.template_seconds += perf_counter() - started
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """DjangoTemplates backend whose templates report their render time.
+
+    Only the top level template of a render is timed, so included and extended
+    templates are not counted twice. Outside an instrumented request it behaves
+    exactly like DjangoTemplates.
+    """
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
+
+
+def record_request(url_name, metrics, window=DEFAULT_WINDOW):
+    """Add a finished request's measurements to the rolling window of its URL name."""
+
+    with _samples_lock:
+        samples = _samples[url_name]
+        if samples.maxlen != window:
+            samples = _samples[url_name] = deque(samples, maxlen=window)
+        samples.append(metrics)
+
+
+def _percentile(ordered, fraction):
+    return ordered[max(ceil(fraction * len(ordered)) - 1, 0)]
+
+
+def histogram(values):
+    """Return the number of values in each latency bucket as (label, count) pairs."""
+
+    counts = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+    for value in values:
+        bucket = 0
+        while bucket < len(HISTOGRAM_BOUNDS_MS) and value > HISTOGRAM_BOUNDS_MS[bucket]:
+            bucket += 1
+        counts[bucket] += 1
+    labels = [f'≤{bound}' for bound in HISTOGRAM_BOUNDS_MS] + [f'>{HISTOGRAM_BOUNDS_MS[-1]}']
+    return list(zip(labels, counts))
+
+
+def request_stats():
+    """Return summary statistics and a latency histogram for each URL name, slowest p95 first."""
+
+    with _samples_lock:
+        windows = {url_name: list(samples) for url_name, samples in _samples.items()}
+    stats = []
+    for url_name, samples in windows.items():
+        totals = sorted(sample['total_ms'] for sample in samples)
+        stats.append({
+            'url_name': url_name,
+            'requests': len(samples),
+            'p50_ms': _percentile(totals, 0.5),
+            'p95_ms': _percentile(totals, 0.95),
+            'max_ms': totals[-1],
+            'mean_queries': round(sum(sample['queries'] for sample in samples) / len(samples), 1),
+            'max_duplicate_queries': max(sample['duplicate_queries'] for sample in samples),
+            'mean_sql_ms': round(sum(sample['sql_ms'] for sample in samples) / len(samples), 3),
+            'mean_template_ms': round(sum(sample['template_ms'] for sample in samples) / len(samples), 3),
+            'histogram': histogram(totals),
+        })
+    stats.sort(key=lambda row: row['p95_ms'], reverse=True)
+    return stats
+
+
+def reset_request_stats():
+    """Forget every recorded request."""
+
+    with _samples_lock:
+        _samples.clear()
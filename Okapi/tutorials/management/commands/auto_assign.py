@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+from tutorials.assignment import auto_assign
+
+
+class Command(BaseCommand):
+    """Assign tutors to pending request sessions and accept them in one batch."""
+
+    help = 'Assigns the best free tutors to pending request sessions, balancing their load, and accepts them'
+
+    def add_arguments(self, parser):
+        parser.add_argument('request_ids', nargs='*', type=int, help='Pending requests to assign')
+        parser.add_argument('--all', action='store_true', help='Assign every pending request')
+        parser.add_argument('--any-availability', action='store_true',
+                            help='Also assign tutors not available at any time of the request')
+        parser.add_argument('--dry-run', action='store_true', help='Print the assignment without saving it')
+
+    def handle(self, *args, **options):
+        if not options['request_ids'] and not options['all'] and not options['dry_run']:
+            raise CommandError('Give the ids of the requests to assign, or --all to assign every pending request')
+        result = auto_assign(
+            request_ids=options['request_ids'] or None,
+            only_overlapping=not options['any_availability'],
+            dry_run=options['dry_run'],
+        )
+        if options['dry_run']:
+            for request_id, tutor_id in sorted(result.plan.items()):
+                self.stdout.write(f'Request {request_id} -> tutor {tutor_id}')
+            self.stdout.write(f'Planned {len(result.plan)} requests in {result.seconds * 1000:.0f} ms.')
+        else:
+            processed = len(result.batch.processed) if result.batch else 0
+            invoices = len(result.batch.invoices) if result.batch else 0
+            self.stdout.write(
+                f'Accepted {processed} requests and created {invoices} invoices '
+                f'in {result.seconds * 1000:.0f} ms.'
+            )
+        if result.unassigned:
+            unassigned = ', '.join(f'#{request_session.id}' for request_session in result.unassigned)
+            self.stdout.write(f'No tutor could be assigned to requests {unassigned}.')
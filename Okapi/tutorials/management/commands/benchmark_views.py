@@ -0,0 +1,228 @@
+import json
+import logging
+import random
+import tracemalloc
+from io import StringIO
+from math import ceil
+from time import perf_counter
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, reset_queries
+from django.test import Client
+from django.test.utils import (
+    CaptureQueriesContext, override_settings, setup_test_environment, teardown_test_environment
+)
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+from faker import Faker
+from tutorials.models import Course, Invoices, Messages, RequestSession, Ticket, User
+from tutorials.tickets import recount_tickets
+
+ROLES = ['Student', 'Tutor', 'Admin']
+
+# Views that change state on GET or end the session, which would skew every later measurement,
+# and streams, whose latency is how long they stay open
+SKIP_URL_NAMES = {'log_out', 'mark_invoice_paid', 'ticket_events', 'export_users', 'export_invoices', 'export_sessions'}
+
+BENCHMARK_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'benchmark',
+    }
+}
+
+
+class Command(BaseCommand):
+    """Benchmark every named view as each role and report query counts, latency and memory."""
+
+    help = 'Benchmarks the query count, latency and peak memory of every named view'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=300, help='Number of users to seed')
+        parser.add_argument('--requests', type=int, default=20, help='Timed requests per view and role')
+        parser.add_argument('--output', default='benchmark.json', help='Path of the JSON report to write')
+        parser.add_argument('--compare', help='Path of a baseline report to compare against')
+        parser.add_argument('--threshold', type=float, default=0.25,
+                            help='Allowed relative increase in latency and memory over the baseline')
+        parser.add_argument('--query-threshold', type=int, default=0,
+                            help='Allowed number of extra queries over the baseline')
+        parser.add_argument('--noise-ms', type=float, default=1.0,
+                            help='Latency increases smaller than this many milliseconds are never regressions')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for a reproducible dataset')
+
+    def handle(self, *args, **options):
+        """Run the benchmark in a throwaway test database and cache so real data is never touched."""
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        # Failing views are reported by status, so keep their tracebacks out of the output
+        request_logger = logging.getLogger('django.request')
+        request_logger.disabled = True
+        try:
+            with override_settings(CACHES=BENCHMARK_CACHES):
+                report = run_benchmark(options['users'], options['requests'], options['seed'])
+        finally:
+            request_logger.disabled = False
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        with open(options['output'], 'w') as report_file:
+            json.dump(report, report_file, indent=2, sort_keys=True)
+        self.stdout.write(format_report(report))
+        self.stdout.write(f"Report written to {options['output']}")
+
+        if options['compare']:
+            with open(options['compare']) as baseline_file:
+                baseline = json.load(baseline_file)
+            regressions = compare_reports(
+                baseline, report, options['threshold'], options['query_threshold'], options['noise_ms']
+            )
+            if regressions:
+                raise CommandError('Views regressed:\n' + '\n'.join(regressions))
+            self.stdout.write('No regressions against the baseline.')
+
+
+def percentile(samples, fraction):
+    """Return the nearest-rank percentile of a list of numbers."""
+
+    ordered = sorted(samples)
+    return ordered[max(ceil(fraction * len(ordered)) - 1, 0)]
+
+
+def named_url_patterns(resolver=None):
+    """Yield (url name, route keyword names) for every named pattern outside a namespace."""
+
+    resolver = resolver or get_resolver()
+    for pattern in resolver.url_patterns:
+        if isinstance(pattern, URLResolver):
+            if pattern.namespace is None:
+                yield from named_url_patterns(pattern)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            yield pattern.name, sorted(pattern.pattern.converters)
+
+
+def seed_benchmark_data(users, seed=0):
+    """Seed users, sessions and invoices in bulk, and a ticket thread for a student."""
+
+    random.seed(seed)
+    Faker.seed(seed)
+    call_command('seed', '--bulk', '--users', str(users), stdout=StringIO())
+    student = benchmark_user('Student')
+    ticket = Ticket.objects.create(student=student, title='Benchmark ticket')
+    Messages.objects.bulk_create([
+        Messages(ticket=ticket, content=f'Message {number}', msg_from=['student', 'admin'][number % 2])
+        for number in range(20)
+    ])
+    recount_tickets(Ticket.objects.filter(id=ticket.id))
+
+
+def benchmark_user(role):
+    """Return a user of the role, preferring one with request sessions so pages have content."""
+
+    users = User.objects.filter(role=role).order_by('id')
+    if role == 'Student':
+        users = users.filter(request_sessions_student__isnull=False)
+    elif role == 'Tutor':
+        users = users.filter(request_sessions_tutor__isnull=False)
+    return users.first() or User.objects.filter(role=role).order_by('id').first()
+
+
+def url_kwargs(student):
+    """Return sample values for the route keywords used in the URL patterns."""
+
+    ticket = Ticket.objects.filter(student=student).first()
+    return {
+        'course_id': Course.objects.values_list('id', flat=True).first(),
+        'request_id': RequestSession.objects.values_list('id', flat=True).first(),
+        'invoice_id': Invoices.objects.values_list('id', flat=True).first(),
+        'ticket_id': ticket.id if ticket else None,
+    }
+
+
+def measure(client, url, requests):
+    """Return the status, query count, latency percentiles and peak memory of GETting a URL."""
+
+    # The query log is bounded, so empty it or a full log would hide this request's queries.
+    # Every request empties it again, so count the queries before making the next one.
+    reset_queries()
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    query_count = len(queries)
+    timings = []
+    for _ in range(requests):
+        started = perf_counter()
+        client.get(url)
+        timings.append((perf_counter() - started) * 1000)
+    tracemalloc.start()
+    try:
+        client.get(url)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        'status': response.status_code,
+        'queries': query_count,
+        'p50_ms': round(percentile(timings, 0.5), 3),
+        'p95_ms': round(percentile(timings, 0.95), 3),
+        'peak_kb': round(peak / 1024, 1),
+    }
+
+
+def run_benchmark(users, requests, seed=0):
+    """Seed a dataset in the current database and measure every named view as each role."""
+
+    seed_benchmark_data(users, seed)
+    role_users = {role: benchmark_user(role) for role in ROLES}
+    kwargs = url_kwargs(role_users['Student'])
+    results = {}
+    for name, keywords in named_url_patterns():
+        if name in SKIP_URL_NAMES or any(kwargs.get(keyword) is None for keyword in keywords):
+            continue
+        url = reverse(name, kwargs={keyword: kwargs[keyword] for keyword in keywords})
+        for role, user in role_users.items():
+            if user is None:
+                continue
+            # Record server errors as a 500 status instead of aborting the run
+            client = Client(raise_request_exception=False)
+            client.force_login(user)
+            results.setdefault(name, {})[role] = dict(measure(client, url, requests), url=url)
+    return {
+        'meta': {
+            'users': users,
+            'requests': requests,
+            'seed': seed,
+            'database': settings.DATABASES['default']['ENGINE'],
+        },
+        'results': results,
+    }
+
+
+def compare_reports(baseline, report, threshold, query_threshold=0, noise_ms=1.0):
+    """Return a description of every view and role that regressed against the baseline."""
+
+    regressions = []
+    for name, roles in report['results'].items():
+        for role, current in roles.items():
+            previous = baseline.get('results', {}).get(name, {}).get(role)
+            if previous is None:
+                continue
+            if current['queries'] > previous['queries'] + query_threshold:
+                regressions.append(f"{name} as {role}: {previous['queries']} -> {current['queries']} queries")
+            for metric in ['p50_ms', 'p95_ms', 'peak_kb']:
+                slack = noise_ms if metric.endswith('_ms') else 0
+                if current[metric] > max(previous[metric] * (1 + threshold), previous[metric] + slack):
+                    regressions.append(f"{name} as {role}: {metric} {previous[metric]} -> {current[metric]}")
+    return regressions
+
+
+def format_report(report):
+    """Return the report as a plain text table."""
+
+    lines = [f"{'view':32} {'role':8} {'status':>6} {'queries':>7} {'p50 ms':>9} {'p95 ms':>9} {'peak kB':>9}"]
+    for name, roles in sorted(report['results'].items()):
+        for role, result in roles.items():
+            lines.append(
+                f"{name:32} {role:8} {result['status']:>6} {result['queries']:>7} "
+                f"{result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} {result['peak_kb']:>9.1f}"
+            )
+    return '\n'.join(lines)
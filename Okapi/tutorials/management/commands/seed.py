@@ -1,11 +1,19 @@
 from email.headerregistry import Group
+from django.contrib.auth.hashers import make_password
 from django.core.management.base import BaseCommand, CommandError
-from tutorials.models import User, Course, Tutor, Student, RequestSession, Invoices
+from django.db import transaction
+from django.db.models import Max
+from tutorials.availability import build_slots
+from tutorials.models import User, Course, Tutor, Student, RequestSession, Invoices, AvailabilitySlot, SessionOccurrence
+from tutorials.matching import rank_tutors
+from tutorials.occurrences import build_occurrences
+from tutorials.scheduling import count_sessions
 import pytz
 from faker import Faker
 from random import randint, random, choice, sample, uniform
-from datetime import date, timedelta ,datetime
-import ast
+from datetime import date, timedelta
+from time import perf_counter
+import re
 
 user_fixtures = [
     {'username': '@johndoe', 'email': 'john.doe@example.org', 'first_name': 'John', 'last_name': 'Doe', 'role':'Student'},
@@ -60,9 +68,20 @@ class Command(BaseCommand):
         super().__init__(*args, **kwargs)
         self.faker = Faker('en_GB')
 
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=self.USER_COUNT, help='Number of users to seed')
+        parser.add_argument('--bulk', action='store_true', help='Insert rows in batches with bulk_create')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per batch in bulk mode')
+
     def handle(self, *args, **options):
+        self.user_count = options['users']
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
         Course.objects.all().delete()
         self.create_courses()
+        if options['bulk']:
+            self.bulk_seed(options['batch_size'])
+            return
         self.create_users()
         self.add_tutor_to_course()
         self.users = User.objects.all()
@@ -110,10 +129,10 @@ class Command(BaseCommand):
 
     def generate_random_users(self):
         user_count = User.objects.count()
-        while user_count < self.USER_COUNT:
-            print(f"Seeding user {user_count}/{self.USER_COUNT}", end='\r')
-            self.generate_user()
-            user_count = User.objects.count()
+        while user_count < self.user_count:
+            print(f"Seeding user {user_count}/{self.user_count}", end='\r')
+            if self.generate_user():
+                user_count += 1
         print("User seeding complete.      ")
 
     def generate_user(self):
@@ -125,7 +144,8 @@ class Command(BaseCommand):
         try:
             self.create_user({'username': username, 'email': email,'password':"Password123", 'first_name': first_name, 'last_name': last_name, 'role': generated_role})
         except:
-            pass
+            return False
+        return True
                
     
     def create_user(self, data):
@@ -169,13 +189,17 @@ class Command(BaseCommand):
             print(f"Error creating request sessions: {e}")
 
     def create_request_session(self, this_student, their_course):
-        # Find tutors that teach this course
-        available_tutors = Tutor.objects.filter(courses=their_course)
-        if not available_tutors.exists():
+        # Find tutors that teach this course and share some of the student's availability
+        matches = rank_tutors(their_course.id, this_student.availability, only_overlapping=True)
+        if not matches:
             print(f"No available tutors for student {this_student.user.first_name}")
             return  
         
-        their_tutor = choice(available_tutors)
+        # The index may list a tutor whose profile was deleted since it was built
+        their_tutor = Tutor.objects.select_related('user').filter(user_id=choice(matches)[0]).first()
+        if their_tutor is None:
+            print(f"No available tutors for student {this_student.user.first_name}")
+            return
         start_date = generate_start_date()
         end_date = generate_end_date()
 
@@ -193,35 +217,26 @@ class Command(BaseCommand):
                         end_date=end_date,
                         status=choice(['pending', 'accepted', 'rejected'])
                     )
-            self.create_invoice(new_session)
+            # Only accepted requests are billed; accepting a pending one later invoices it then
+            if new_session.status == 'accepted':
+                self.create_invoice(new_session)
     
     def create_invoice(self, new_session):
-        availability = ast.literal_eval(str(new_session.availability))
-        start_date = datetime.strptime(str(new_session.start_date), "%Y-%m-%d")
-        end_date = datetime.strptime(str(new_session.end_date), "%Y-%m-%d")
-
-        # Map day names to their respective integers
-        day_map = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
-
-        # Initialize session count
-        session_count = 0
-
-        # Loop through all dates from start_date to end_date
-        current_date = start_date
-
-        while current_date <= end_date:
-            day_name = current_date.strftime("%A")  # Get the day name (e.g., "Tuesday")
-            if day_name.lower() in availability:  # Check if the day is in availability
-                session_count += 1  # Add the number of sessions for that day
-            current_date += timedelta(days=1)
+        session_count = count_sessions(
+            new_session.start_date,
+            new_session.end_date,
+            new_session.availability,
+            new_session.fortnightly
+        )
         total = new_session.course.price * session_count
-        due_date = start_date + timedelta(days=3)
+        due_date = new_session.start_date + timedelta(days=3)
 
         try:
             Invoices.objects.create(
             student= new_session.student,
             tutor= new_session.tutor,
             course= new_session.course,
+            request_session= new_session,
             due_date= due_date,
             status= False,
             total=total,
@@ -230,6 +245,140 @@ class Command(BaseCommand):
             print(f"Error creating invoice {e}")
             raise
 
+    def bulk_seed(self, batch_size):
+        """Seed the users, profiles, request sessions and invoices in batches.
+
+        Every user shares one precomputed password hash. Tutors are inserted before
+        students so the tutors of each course are known when student sessions are built.
+        """
+
+        started = perf_counter()
+        self.batch_size = batch_size
+        self.password_hash = make_password(Command.DEFAULT_PASSWORD)
+        self.courses = list(Course.objects.all())
+        self.tutors_by_course = {course.id: [] for course in self.courses}
+        self.row_counts = {'users': 0, 'sessions': 0, 'invoices': 0}
+
+        for data in user_fixtures:
+            if not User.objects.filter(username=data['username']).exists():
+                self.create_user(data)
+        for tutor in Tutor.objects.select_related('user').prefetch_related('courses'):
+            for course in tutor.courses.all():
+                self.tutors_by_course[course.id].append(tutor)
+        roles = sorted(
+            (generate_role() for _ in range(max(self.user_count - User.objects.count(), 0))),
+            key=['Tutor', 'Admin', 'Student'].index
+        )
+        first_suffix = (User.objects.aggregate(Max('id'))['id__max'] or 0) + 1
+        with transaction.atomic():
+            for start in range(0, len(roles), batch_size):
+                self.bulk_create_batch(roles[start:start + batch_size], first_suffix + start)
+                print(f"Seeding user {min(start + batch_size, len(roles))}/{len(roles)}", end='\r')
+        print("User seeding complete.      ")
+
+        elapsed = perf_counter() - started
+        rows = sum(self.row_counts.values())
+        self.stdout.write(
+            f"Seeded {self.row_counts['users']} users, {self.row_counts['sessions']} request sessions "
+            f"and {self.row_counts['invoices']} invoices in {elapsed:.1f}s ({rows / max(elapsed, 0.001):.0f} rows/s)"
+        )
+
+    def bulk_create_batch(self, roles, first_suffix):
+        users = []
+        for offset, role in enumerate(roles):
+            first_name = self.faker.first_name()
+            last_name = self.faker.last_name()
+            suffix = str(first_suffix + offset)
+            users.append(User(
+                username=create_unique_username(first_name, last_name, suffix),
+                email=create_unique_email(first_name, last_name, suffix),
+                password=self.password_hash,
+                first_name=first_name,
+                last_name=last_name,
+                role=role
+            ))
+        User.objects.bulk_create(users, batch_size=self.batch_size)
+        self.row_counts['users'] += len(users)
+
+        tutors = [Tutor(
+            user=user,
+            availability=generate_availability(),
+            years_exp=randint(1, 15),
+            rate=round(uniform(0.5, 3.0), 2)
+        ) for user in users if user.role == 'Tutor']
+        students = [Student(user=user, availability=generate_availability())
+                    for user in users if user.role == 'Student']
+        Tutor.objects.bulk_create(tutors, batch_size=self.batch_size)
+        Student.objects.bulk_create(students, batch_size=self.batch_size)
+
+        tutor_courses = []
+        course_users = []
+        for tutor in tutors:
+            for course in sample(self.courses, randint(1, 3)):
+                tutor_courses.append(Tutor.courses.through(tutor_id=tutor.id, course_id=course.id))
+                course_users.append(Course.users.through(course_id=course.id, user_id=tutor.user.id))
+                self.tutors_by_course[course.id].append(tutor)
+        Tutor.courses.through.objects.bulk_create(tutor_courses, batch_size=self.batch_size)
+        Course.users.through.objects.bulk_create(course_users, batch_size=self.batch_size)
+
+        student_courses = []
+        sessions = []
+        for student in students:
+            for course in sample(self.courses, randint(1, 3)):
+                student_courses.append(Student.courses.through(student_id=student.id, course_id=course.id))
+                session = self.build_request_session(student, course)
+                if session is not None:
+                    sessions.append(session)
+        Student.courses.through.objects.bulk_create(student_courses, batch_size=self.batch_size)
+        RequestSession.objects.bulk_create(sessions, batch_size=self.batch_size)
+        self.row_counts['sessions'] += len(sessions)
+
+        slots = []
+        for profile in tutors + students:
+            slots += build_slots(profile.availability, user_id=profile.user.id)
+        for session in sessions:
+            slots += build_slots(session.availability, request_session=session)
+        AvailabilitySlot.objects.bulk_create(slots, batch_size=self.batch_size)
+
+        occurrences = [occurrence for session in sessions for occurrence in build_occurrences(session)]
+        SessionOccurrence.objects.bulk_create(occurrences, batch_size=self.batch_size)
+
+        invoices = [self.build_invoice(session) for session in sessions if session.status == 'accepted']
+        Invoices.objects.bulk_create(invoices, batch_size=self.batch_size)
+        self.row_counts['invoices'] += len(invoices)
+
+    def build_request_session(self, student, course):
+        """Return an unsaved request session with a random tutor of the course, or None if none fits."""
+
+        available_tutors = self.tutors_by_course[course.id]
+        if not available_tutors:
+            return None
+        tutor = choice(available_tutors)
+        shared_availability = generate_shared_availability(student.availability, tutor.availability)
+        if not shared_availability:
+            return None
+        return RequestSession(
+            student_id=student.user.id,
+            tutor_id=tutor.user.id,
+            course=course,
+            availability=shared_availability,
+            start_date=generate_start_date(),
+            end_date=generate_end_date(),
+            status=choice(['pending', 'accepted', 'rejected'])
+        )
+
+    def build_invoice(self, session):
+        session_count = count_sessions(session.start_date, session.end_date, session.availability, session.fortnightly)
+        return Invoices(
+            student_id=session.student_id,
+            tutor_id=session.tutor_id,
+            course=session.course,
+            request_session=session,
+            due_date=session.start_date + timedelta(days=3),
+            status=False,
+            total=session.course.price * session_count
+        )
+
 
 def create_username(first_name, last_name):
     return '@' + first_name.lower() + last_name.lower()
@@ -239,6 +388,18 @@ def create_email(first_name, last_name):
     return first_name + '.' + last_name + '@example.org'
 
 
+def create_unique_username(first_name, last_name, suffix):
+    """Return a valid username made unique by a numeric suffix."""
+
+    name = re.sub(r'\W', '', (first_name + last_name).lower())
+    return '@' + name[:29 - len(suffix)] + suffix
+
+
+def create_unique_email(first_name, last_name, suffix):
+    name = re.sub(r'[^\w.]', '', first_name + '.' + last_name)
+    return name + suffix + '@example.org'
+
+
 def generate_role():
     rand = random()
     if rand < 0.80:
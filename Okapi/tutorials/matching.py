@@ -0,0 +1,82 @@
+"""In-memory index for matching tutors to request sessions.
+
+Availability is encoded as a 168 bit integer with one bit per weekday and hour
+(bit ``weekday * 24 + hour``), so the overlap between a tutor and a request is a
+single AND and a popcount. Times are read into slots by tutorials.availability,
+and each slot sets the bits of every hour it touches. The index maps each course
+to the tutors who teach it (``Course.users``) and their availability masks. It is
+built with two queries and held by tutorials.cache.versioned_index under the
+tutor_match_index namespace.
+"""
+
+from tutorials.availability import availability_slots
+from tutorials.cache import invalidate, versioned_index
+from tutorials.models import Course, Tutor
+
+TUTOR_MATCH_NAMESPACE = 'tutor_match_index'
+HOURS_PER_DAY = 24
+
+
+def availability_mask(availability):
+    """Return the weekday by hour bitmask of an availability dict.
+
+    Each slot of availability_slots sets the bits of the hours from the one it starts
+    in up to the one it ends in, so a slot starting at 9:30 marks 9:00 and 10:00.
+    """
+
+    mask = 0
+    for weekday, start, end in availability_slots(availability):
+        for hour in range(start // 60, (end - 1) // 60 + 1):
+            mask |= 1 << (weekday * HOURS_PER_DAY + hour)
+    return mask
+
+
+class TutorMatchIndex:
+    """Tutors of each course with their availability masks."""
+
+    def __init__(self, tutors_by_course, masks):
+        self.tutors_by_course = tutors_by_course
+        self.masks = masks
+
+    @classmethod
+    def build(cls):
+        """Return an index of every course's tutors, read from the database."""
+
+        tutors_by_course = {}
+        for course_id, user_id in Course.users.through.objects.values_list('course_id', 'user_id'):
+            tutors_by_course.setdefault(course_id, []).append(user_id)
+        masks = {
+            user_id: availability_mask(availability)
+            for user_id, availability in Tutor.objects.values_list('user_id', 'availability')
+        }
+        return cls(tutors_by_course, masks)
+
+    def rank(self, course_id, availability, only_overlapping=False):
+        """Return (tutor user id, overlapping hours) pairs for a course, best match first.
+
+        Ties are broken by user id so the order is stable. Tutors without any overlap,
+        including those with no availability on record, come last unless only_overlapping is set.
+        """
+
+        wanted = availability_mask(availability)
+        ranked = []
+        for user_id in self.tutors_by_course.get(course_id, ()):
+            overlap = (self.masks.get(user_id, 0) & wanted).bit_count()
+            if overlap or not only_overlapping:
+                ranked.append((user_id, overlap))
+        ranked.sort(key=lambda match: (-match[1], match[0]))
+        return ranked
+
+
+# Returns the tutor match index, rebuilding it if it was invalidated
+get_match_index = versioned_index(TUTOR_MATCH_NAMESPACE, TutorMatchIndex.build)
+
+
+def rank_tutors(course_id, availability, only_overlapping=False):
+    """Return the ranked (tutor user id, overlapping hours) pairs of a course."""
+
+    return get_match_index().rank(course_id, availability, only_overlapping)
+
+
+def invalidate_match_index():
+    invalidate(TUTOR_MATCH_NAMESPACE)
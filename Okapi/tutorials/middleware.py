@@ -1,41 +1,113 @@
+import logging
+from contextlib import ExitStack
+from time import perf_counter
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
 from django.shortcuts import redirect
 from django.urls import reverse
+from tutorials.instrumentation import RequestMetrics, current_metrics, record_request
+
+logger = logging.getLogger('tutorials.requests')
 
 class UserRoleRedirectMiddleware:
+    """Keep authenticated users away from dashboards that belong to another role.
+
+    The dashboard for each role is resolved from the ``role`` column of the already
+    loaded user, so no queries are made, and every URL is reversed once when the
+    middleware is created rather than on each request.
+    """
+
+    dashboard_url_names = {
+        'Admin': 'dashboard',
+        'Tutor': 'dashboard',
+        'Student': 'dashboard',
+    }
+
     def __init__(self, get_response):
         self.get_response = get_response
+        self.dashboard_urls = {
+            role: reverse(url_name) for role, url_name in self.dashboard_url_names.items()
+        }
+        self.dashboard_paths = set(self.dashboard_urls.values())
+        self.static_url = settings.STATIC_URL
 
     def __call__(self, request):
-        # Process the request before the view is called
-        if request.user.is_authenticated:
-            # If user is authenticated, determine their correct dashboard URL
-            dashboard_url = None
-
-            if request.user.groups.filter(name='admin').exists():
-                dashboard_url = reverse('admin-dashboard')
-            elif request.user.groups.filter(name='tutor').exists():
-                dashboard_url = reverse('tutor-dashboard')
-            elif request.user.groups.filter(name='student').exists():
-                dashboard_url = reverse('dashboard')
-
-            # If we found a dashboard URL and the user is not currently at that URL,
-            # and isn't at the logout or login pages (to avoid loops), redirect them.
-            if dashboard_url:
-                # Get current path
-                current_path = request.path
-                # You can specify some allowed paths to avoid redirection loops
-                allowed_paths = [
-                    reverse('logout'),
-                    reverse('login'),
-                ]
-
-                # If the user is authenticated and the current page isn't their
-                # correct dashboard (and not an allowed exception), redirect them.
-                # This ensures that users are always on the right dashboard if they
-                # try to navigate elsewhere.
-                if current_path not in allowed_paths and current_path != dashboard_url:
-                    return redirect(dashboard_url)
+        # Static assets never need a role check, so do not load the session or user for them
+        if not (self.static_url and request.path.startswith(self.static_url)):
+            redirect_url = self.get_redirect_url(request)
+            if redirect_url:
+                return redirect(redirect_url)
 
         # Proceed with the response if no conditions met
         response = self.get_response(request)
         return response
+
+    def get_redirect_url(self, request):
+        """Return the user's own dashboard if they are on another role's dashboard, otherwise None."""
+
+        if request.path not in self.dashboard_paths or not request.user.is_authenticated:
+            return None
+        dashboard_url = self.dashboard_urls.get(request.user.role)
+        if dashboard_url and request.path != dashboard_url:
+            return dashboard_url
+        return None
+
+
+class RequestTimingMiddleware:
+    """Measure the queries and time spent on each request.
+
+    Enabled by the REQUEST_TIMING setting. Each response gets a Server-Timing header
+    with the SQL, template, view and total time, every request is logged as one line
+    of key=value pairs on the tutorials.requests logger (as a warning if a query was
+    repeated with the same parameters), and the measurements are kept in a rolling
+    window per URL name for the admin request metrics page. Place it first so the
+    total time covers the other middleware.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'REQUEST_TIMING', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.window = getattr(settings, 'REQUEST_TIMING_WINDOW', 500)
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = metrics.activate()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            metrics.deactivate(token)
+
+        url_name = request.resolver_match.view_name if request.resolver_match else '<unresolved>'
+        response['Server-Timing'] = metrics.server_timing()
+        measurements = metrics.as_dict()
+        record_request(url_name, measurements, self.window)
+        self.log(request, response, url_name, metrics, measurements)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # Every other middleware has seen the request by now, so the view starts here
+        metrics = current_metrics()
+        if metrics is not None:
+            metrics.view_started = perf_counter()
+        return None
+
+    def log(self, request, response, url_name, metrics, measurements):
+        fields = {
+            'method': request.method,
+            'path': request.path,
+            'url_name': url_name,
+            'status': response.status_code,
+            **measurements,
+        }
+        message = ' '.join(f'{key}={value}' for key, value in fields.items())
+        duplicated = metrics.most_duplicated()
+        if duplicated:
+            sql, count = duplicated
+            logger.warning('%s most_duplicated=%r x%d', message, sql, count, extra={'request_metrics': fields})
+        else:
+            logger.info(message, extra={'request_metrics': fields})
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.2 on 2026-10-17 22:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tutorials', '0017_messages_is_read'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='requestsession',
+            index=models.Index(fields=['student', 'status', 'start_date'], name='request_student_status_start'),
+        ),
+    ]
@@ -0,0 +1,90 @@
+# Generated by Django 5.1.2 on 2026-10-17 23:05
+
+import django.core.validators
+import django.db.models.deletion
+import tutorials.availability
+from django.conf import settings
+from django.db import migrations, models
+
+WEEKDAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+BATCH_SIZE = 1000
+
+
+def slots(availability):
+    """Return the (weekday, start minute, end minute) slots of an availability dict, one hour each."""
+
+    found = set()
+    if not isinstance(availability, dict):
+        return found
+    for day, times in availability.items():
+        day = str(day).strip().lower()
+        if day not in WEEKDAYS:
+            continue
+        for time in [times] if isinstance(times, str) else times if isinstance(times, list) else []:
+            try:
+                hours, minutes = str(time).strip().split(':')
+                start = int(hours) * 60 + int(minutes)
+            except ValueError:
+                continue
+            if 0 <= int(minutes) < 60 and 0 <= start < 24 * 60:
+                found.add((WEEKDAYS.index(day), start, min(start + 60, 24 * 60)))
+    return found
+
+
+def copy_availability_to_slots(apps, schema_editor):
+    AvailabilitySlot = apps.get_model('tutorials', 'AvailabilitySlot')
+    sources = [
+        (apps.get_model('tutorials', 'Tutor').objects.values_list('user_id', 'availability'), 'user_id'),
+        (apps.get_model('tutorials', 'Student').objects.values_list('user_id', 'availability'), 'user_id'),
+        (apps.get_model('tutorials', 'RequestSession').objects.values_list('id', 'availability'), 'request_session_id'),
+    ]
+    for rows, owner_field in sources:
+        batch = []
+        for owner_id, availability in rows.iterator(chunk_size=BATCH_SIZE):
+            for weekday, start, end in sorted(slots(availability)):
+                batch.append(AvailabilitySlot(weekday=weekday, start_minute=start, end_minute=end, **{owner_field: owner_id}))
+            if len(batch) >= BATCH_SIZE:
+                AvailabilitySlot.objects.bulk_create(batch)
+                batch = []
+        AvailabilitySlot.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tutorials', '0018_requestsession_student_status_start_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='requestsession',
+            name='availability',
+            field=models.JSONField(validators=[tutorials.availability.validate_availability]),
+        ),
+        migrations.AlterField(
+            model_name='student',
+            name='availability',
+            field=models.JSONField(validators=[tutorials.availability.validate_availability]),
+        ),
+        migrations.AlterField(
+            model_name='tutor',
+            name='availability',
+            field=models.JSONField(validators=[tutorials.availability.validate_availability]),
+        ),
+        migrations.CreateModel(
+            name='AvailabilitySlot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weekday', models.PositiveSmallIntegerField(validators=[django.core.validators.MaxValueValidator(6)])),
+                ('start_minute', models.PositiveSmallIntegerField(validators=[django.core.validators.MaxValueValidator(1439)])),
+                ('end_minute', models.PositiveSmallIntegerField(validators=[django.core.validators.MaxValueValidator(1440)])),
+                ('request_session', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='availability_slots', to='tutorials.requestsession')),
+                ('user', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='availability_slots', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['weekday', 'start_minute', 'end_minute'], name='slot_weekday_start_end')],
+                'constraints': [models.CheckConstraint(condition=models.Q(models.Q(('request_session__isnull', True), ('user__isnull', False)), models.Q(('request_session__isnull', False), ('user__isnull', True)), _connector='OR'), name='slot_has_one_owner'), models.CheckConstraint(condition=models.Q(('end_minute__gt', models.F('start_minute'))), name='slot_ends_after_start')],
+            },
+        ),
+        migrations.RunPython(copy_availability_to_slots, migrations.RunPython.noop),
+    ]
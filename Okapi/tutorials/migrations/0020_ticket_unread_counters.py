@@ -0,0 +1,73 @@
+# Generated by Django 5.1.2 on 2026-10-17 23:23
+
+import datetime
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Q, Subquery
+
+BATCH_SIZE = 1000
+
+
+def fill_ticket_counters(apps, schema_editor):
+    Ticket = apps.get_model('tutorials', 'Ticket')
+    Messages = apps.get_model('tutorials', 'Messages')
+    counts = dict(
+        (ticket_id, (admin, student))
+        for ticket_id, admin, student in Messages.objects.values('ticket_id').annotate(
+            admin=Count('id', filter=Q(msg_from='student', is_read=False)),
+            student=Count('id', filter=Q(msg_from='admin', is_read=False)),
+        ).values_list('ticket_id', 'admin', 'student')
+    )
+    # Messages only store a date and a time, so the latest is the last one by date, time and id
+    latest = Messages.objects.filter(ticket=OuterRef('pk')).order_by('-date', '-time', '-id')
+    tickets = Ticket.objects.only('id', 'date', 'time').annotate(
+        last_date=Subquery(latest.values('date')[:1]),
+        last_time=Subquery(latest.values('time')[:1]),
+    )
+    batch = []
+    for ticket in tickets.iterator(chunk_size=BATCH_SIZE):
+        if ticket.last_date is None:
+            date, time = ticket.date, ticket.time
+        else:
+            date, time = ticket.last_date, ticket.last_time
+        ticket.last_message_at = datetime.datetime.combine(date, time, tzinfo=datetime.timezone.utc)
+        ticket.unread_for_admin, ticket.unread_for_student = counts.get(ticket.id, (0, 0))
+        batch.append(ticket)
+        if len(batch) >= BATCH_SIZE:
+            Ticket.objects.bulk_update(batch, ['last_message_at', 'unread_for_admin', 'unread_for_student'])
+            batch = []
+    Ticket.objects.bulk_update(batch, ['last_message_at', 'unread_for_admin', 'unread_for_student'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tutorials', '0019_availabilityslot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ticket',
+            name='last_message_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='unread_for_admin',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='unread_for_student',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['-last_message_at', '-id'], name='ticket_activity'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['student', '-last_message_at', '-id'], name='ticket_student_activity'),
+        ),
+        migrations.RunPython(fill_ticket_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.2 on 2026-10-17 23:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tutorials', '0020_ticket_unread_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='messages',
+            index=models.Index(fields=['ticket', 'id'], name='message_ticket_id'),
+        ),
+    ]
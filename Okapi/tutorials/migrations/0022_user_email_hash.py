@@ -0,0 +1,34 @@
+# Generated by Django 5.1.2 on 2026-10-17 23:40
+
+import hashlib
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def fill_email_hashes(apps, schema_editor):
+    User = apps.get_model('tutorials', 'User')
+    batch = []
+    for user in User.objects.only('id', 'email').iterator(chunk_size=BATCH_SIZE):
+        user.email_hash = hashlib.md5(user.email.lower().strip().encode('utf-8')).hexdigest()
+        batch.append(user)
+        if len(batch) >= BATCH_SIZE:
+            User.objects.bulk_update(batch, ['email_hash'])
+            batch = []
+    User.objects.bulk_update(batch, ['email_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tutorials', '0021_message_ticket_id_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='email_hash',
+            field=models.CharField(blank=True, editable=False, max_length=32),
+        ),
+        migrations.RunPython(fill_email_hashes, migrations.RunPython.noop),
+    ]
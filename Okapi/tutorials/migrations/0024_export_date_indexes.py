@@ -0,0 +1,21 @@
+# Generated by Django 5.1.2 on 2026-10-17 23:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tutorials', '0023_user_directory_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='invoices',
+            index=models.Index(fields=['due_date', 'id'], name='invoice_due_date'),
+        ),
+        migrations.AddIndex(
+            model_name='requestsession',
+            index=models.Index(fields=['start_date', 'id'], name='request_start_date'),
+        ),
+    ]
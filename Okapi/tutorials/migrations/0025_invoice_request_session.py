@@ -0,0 +1,53 @@
+# Generated by Django 5.1.2 on 2026-10-18 00:00
+
+from datetime import timedelta
+import django.db.models.deletion
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+INVOICE_DUE_DAYS = 3
+
+
+def link_invoices(apps, schema_editor):
+    """Link each accepted request to one unlinked invoice with its student, tutor, course and due date.
+
+    Duplicate invoices created by re-submitted accepts are left unlinked.
+    """
+
+    Invoices = apps.get_model('tutorials', 'Invoices')
+    RequestSession = apps.get_model('tutorials', 'RequestSession')
+    candidates = {}
+    invoices = Invoices.objects.filter(request_session__isnull=True).order_by('id')
+    for invoice_id, student_id, tutor_id, course_id, due_date in invoices.values_list(
+        'id', 'student_id', 'tutor_id', 'course_id', 'due_date'
+    ).iterator(chunk_size=BATCH_SIZE):
+        candidates.setdefault((student_id, tutor_id, course_id, due_date), []).append(invoice_id)
+
+    batch = []
+    accepted = RequestSession.objects.filter(status='accepted', tutor__isnull=False).order_by('id')
+    for request_id, student_id, tutor_id, course_id, start_date in accepted.values_list(
+        'id', 'student_id', 'tutor_id', 'course_id', 'start_date'
+    ).iterator(chunk_size=BATCH_SIZE):
+        matches = candidates.get((student_id, tutor_id, course_id, start_date + timedelta(days=INVOICE_DUE_DAYS)))
+        if matches:
+            batch.append(Invoices(id=matches.pop(0), request_session_id=request_id))
+        if len(batch) >= BATCH_SIZE:
+            Invoices.objects.bulk_update(batch, ['request_session'])
+            batch = []
+    Invoices.objects.bulk_update(batch, ['request_session'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tutorials', '0024_export_date_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='invoices',
+            name='request_session',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='invoice', to='tutorials.requestsession'),
+        ),
+        migrations.RunPython(link_invoices, migrations.RunPython.noop),
+    ]
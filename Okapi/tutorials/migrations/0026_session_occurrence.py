@@ -0,0 +1,62 @@
+# Generated by Django 5.1.2 on 2026-10-18 00:13
+
+from datetime import datetime, time, timedelta
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+from tutorials.migrations._slots import slots
+
+BATCH_SIZE = 1000
+
+
+def expand_accepted_requests(apps, schema_editor):
+    RequestSession = apps.get_model('tutorials', 'RequestSession')
+    SessionOccurrence = apps.get_model('tutorials', 'SessionOccurrence')
+    zone = timezone.get_default_timezone()
+    batch = []
+    requests = RequestSession.objects.filter(status='accepted').values_list(
+        'id', 'tutor_id', 'student_id', 'start_date', 'end_date', 'availability', 'fortnightly'
+    )
+    for request_id, tutor_id, student_id, start_date, end_date, availability, fortnightly in requests.iterator(
+        chunk_size=BATCH_SIZE
+    ):
+        for weekday, start, end in sorted(slots(availability)):
+            day = start_date + timedelta(days=(weekday - start_date.weekday()) % 7)
+            while day <= end_date:
+                starts_at = timezone.make_aware(datetime.combine(day, time(start // 60, start % 60)), zone)
+                batch.append(SessionOccurrence(
+                    request_session_id=request_id, tutor_id=tutor_id, student_id=student_id,
+                    starts_at=starts_at, ends_at=starts_at + timedelta(minutes=end - start),
+                ))
+                day += timedelta(weeks=2 if fortnightly else 1)
+        if len(batch) >= BATCH_SIZE:
+            SessionOccurrence.objects.bulk_create(batch)
+            batch = []
+    SessionOccurrence.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tutorials', '0025_invoice_request_session'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SessionOccurrence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('starts_at', models.DateTimeField()),
+                ('ends_at', models.DateTimeField()),
+                ('request_session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occurrences', to='tutorials.requestsession')),
+                ('student', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='student_occurrences', to=settings.AUTH_USER_MODEL)),
+                ('tutor', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='tutor_occurrences', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['tutor', 'starts_at'], name='occurrence_tutor_start'), models.Index(fields=['student', 'starts_at'], name='occurrence_student_start')],
+                'constraints': [models.UniqueConstraint(fields=('request_session', 'starts_at'), name='occurrence_unique_start')],
+            },
+        ),
+        migrations.RunPython(expand_accepted_requests, migrations.RunPython.noop),
+    ]
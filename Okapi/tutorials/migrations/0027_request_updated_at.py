@@ -0,0 +1,18 @@
+# Generated by Django 5.1.2 on 2026-10-18 00:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tutorials', '0026_session_occurrence'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='requestsession',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
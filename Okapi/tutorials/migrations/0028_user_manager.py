@@ -0,0 +1,20 @@
+# Generated by Django 5.1.2 on 2026-10-18 01:04
+
+import tutorials.models
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tutorials', '0027_request_updated_at'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='user',
+            managers=[
+                ('objects', tutorials.models.UserManager()),
+            ],
+        ),
+    ]
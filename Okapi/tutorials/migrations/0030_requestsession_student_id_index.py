@@ -0,0 +1,21 @@
+# Generated by Django 5.1.2 on 2026-10-18 03:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tutorials', '0029_course_user_updated_at'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='requestsession',
+            name='request_student_status_start',
+        ),
+        migrations.AddIndex(
+            model_name='requestsession',
+            index=models.Index(fields=['student', 'id'], name='request_student_id'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+"""Availability parsing frozen for data migrations.
+
+Migrations must keep working however tutorials.availability changes later, so the
+ones that read availability JSON share this copy instead of importing it. The
+migration loader skips modules starting with an underscore.
+"""
+
+WEEKDAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+
+def slots(availability):
+    """Return the (weekday, start minute, end minute) slots of an availability dict, one hour each."""
+
+    found = set()
+    if not isinstance(availability, dict):
+        return found
+    for day, times in availability.items():
+        day = str(day).strip().lower()
+        if day not in WEEKDAYS:
+            continue
+        for time in [times] if isinstance(times, str) else times if isinstance(times, list) else []:
+            try:
+                hours, minutes = str(time).strip().split(':')
+                start = int(hours) * 60 + int(minutes)
+            except ValueError:
+                continue
+            if 0 <= int(minutes) < 60 and 0 <= start < 24 * 60:
+                found.add((WEEKDAYS.index(day), start, min(start + 60, 24 * 60)))
+    return found
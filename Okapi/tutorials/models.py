@@ -1,7 +1,24 @@
+from django.conf import settings
 from django.core.validators import RegexValidator, MinValueValidator, MaxValueValidator
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, UserManager as BaseUserManager
 from django.db import models
-from libgravatar import Gravatar
+from django.db.models.functions import Lower
+from django.utils import timezone
+from tutorials.availability import validate_availability
+from tutorials.gravatars import email_hash, gravatar_url
+
+class UserQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        """Update the users, dropping the stored email hashes an email change makes stale."""
+
+        if 'email' in kwargs:
+            kwargs.setdefault('email_hash', '')
+        return super().update(**kwargs)
+
+
+class UserManager(BaseUserManager.from_queryset(UserQuerySet)):
+    pass
+
 
 class User(AbstractUser):
     """Model used for user authentication, and team member related information."""
@@ -22,24 +39,53 @@ class User(AbstractUser):
         ('Tutor', 'Tutor'), 
         ('Admin', 'Admin')
     ], max_length=7, default='Student') #
+    # Hash of the email for gravatar URLs, kept by save() when GRAVATAR_STORE_HASH is on
+    email_hash = models.CharField(max_length=32, blank=True, editable=False)
+    # When the user last changed, so calendar feeds showing their name can tell
+    updated_at = models.DateTimeField(auto_now=True)
 
+    objects = UserManager()
 
     class Meta:
         """Model options."""
 
         ordering = ['last_name', 'first_name']
+        indexes = [
+            # Case-insensitive prefix search in the user directory is a range scan on these
+            models.Index(Lower('username'), name='user_username_lower'),
+            models.Index(Lower('last_name'), name='user_last_name_lower'),
+            models.Index(fields=['role', 'id'], name='user_role_id'),
+        ]
 
     def full_name(self):
         """Return a string containing the user's full name."""
 
         return f'{self.first_name} {self.last_name}'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        user = super().from_db(db, field_names, values)
+        # A stored hash belongs to the email it was loaded with
+        user._hashed_email = user.__dict__.get('email') if user.__dict__.get('email_hash') else None
+        return user
+
+    def save(self, *args, **kwargs):
+        """Save the user, storing the hash of their email if GRAVATAR_STORE_HASH is on."""
+
+        # Clear the hash when not storing it, so a hash left from before can never be stale
+        self.email_hash = email_hash(self.email) if settings.GRAVATAR_STORE_HASH else ''
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'email' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'email_hash'}
+        super().save(*args, **kwargs)
+        self._hashed_email = self.email if self.email_hash else None
+
     def gravatar(self, size=120):
         """Return a URL to the user's gravatar."""
 
-        gravatar_object = Gravatar(self.email)
-        gravatar_url = gravatar_object.get_image(size=size, default='mp')
-        return gravatar_url
+        # The stored hash is only used while the email is the one it was computed from
+        stored = settings.GRAVATAR_STORE_HASH and self.email == getattr(self, '_hashed_email', None)
+        return gravatar_url(self.email_hash if stored else email_hash(self.email), size)
 
     def mini_gravatar(self):
         """Return a URL to a miniature version of the user's gravatar."""
@@ -52,12 +98,14 @@ class Course(models.Model):
     desc = models.CharField(max_length=200)
     price = models.DecimalField(decimal_places=2, max_digits=10)
     users = models.ManyToManyField(User, related_name='courses')
+    # When the course last changed, so calendar feeds showing its name can tell
+    updated_at = models.DateTimeField(auto_now=True)
 
 class Tutor(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     courses = models.ManyToManyField(Course)
     years_exp = models.IntegerField()
-    availability = models.JSONField()  # JSON of available times #Add validation later TBD
+    availability = models.JSONField(validators=[validate_availability])  # JSON of available times
     rate = models.DecimalField(
         max_digits=3,
         decimal_places=2,
@@ -70,7 +118,7 @@ class Tutor(models.Model):
 class Student(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     courses = models.ManyToManyField(Course)  # courses they're enrolled in
-    availability = models.JSONField()  # when they can take classes
+    availability = models.JSONField(validators=[validate_availability])  # when they can take classes
 
 # class RequestSession(models.Model):
 #     user = models.ForeignKey(User, on_delete=models.CASCADE,null=True)
@@ -93,13 +141,24 @@ class RequestSession(models.Model):
     student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='request_sessions_student', null=True)
     tutor = models.ForeignKey(User, on_delete=models.CASCADE, related_name='request_sessions_tutor', null=True)
     course = models.ForeignKey(Course, on_delete=models.CASCADE,null=True)
-    availability = models.JSONField()
+    availability = models.JSONField(validators=[validate_availability])
     start_date = models.DateField()
     end_date = models.DateField()
     #status = models.BooleanField(null=True, default=None)
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
     fortnightly= models.BooleanField(default= False)
     venue= models.CharField(max_length=25, default='online')
+    # When the request last changed, so calendar feeds can tell whether they changed
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        """Model options."""
+
+        indexes = [
+            # Each student's request list is paged by id, newest first
+            models.Index(fields=['student', 'id'], name='request_student_id'),
+            models.Index(fields=['start_date', 'id'], name='request_start_date'),
+        ]
 
     def get_formatted_availability(self):
         if not self.availability:
@@ -123,6 +182,53 @@ class RequestSession(models.Model):
    
 
 
+class AvailabilitySlot(models.Model):
+    """A weekly time slot, normalized from the availability of a user or a request session."""
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='availability_slots', null=True)
+    request_session = models.ForeignKey(RequestSession, on_delete=models.CASCADE, related_name='availability_slots', null=True)
+    weekday = models.PositiveSmallIntegerField(validators=[MaxValueValidator(6)])  # 0 is Monday
+    start_minute = models.PositiveSmallIntegerField(validators=[MaxValueValidator(24 * 60 - 1)])
+    end_minute = models.PositiveSmallIntegerField(validators=[MaxValueValidator(24 * 60)])
+
+    class Meta:
+        """Model options."""
+
+        indexes = [
+            models.Index(fields=['weekday', 'start_minute', 'end_minute'], name='slot_weekday_start_end'),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(user__isnull=False, request_session__isnull=True)
+                | models.Q(user__isnull=True, request_session__isnull=False),
+                name='slot_has_one_owner'
+            ),
+            models.CheckConstraint(condition=models.Q(end_minute__gt=models.F('start_minute')), name='slot_ends_after_start'),
+        ]
+
+
+class SessionOccurrence(models.Model):
+    """One dated session of an accepted request session, materialized by tutorials.occurrences."""
+
+    request_session = models.ForeignKey(RequestSession, on_delete=models.CASCADE, related_name='occurrences')
+    # Copied from the request so calendars are answered from this table's indexes alone
+    tutor = models.ForeignKey(User, on_delete=models.CASCADE, related_name='tutor_occurrences', null=True)
+    student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='student_occurrences', null=True)
+    starts_at = models.DateTimeField()
+    ends_at = models.DateTimeField()
+
+    class Meta:
+        """Model options."""
+
+        indexes = [
+            models.Index(fields=['tutor', 'starts_at'], name='occurrence_tutor_start'),
+            models.Index(fields=['student', 'starts_at'], name='occurrence_student_start'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['request_session', 'starts_at'], name='occurrence_unique_start'),
+        ]
+
+
 class Invoices(models.Model):
     student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='student_invoices', null=True)
     tutor = models.ForeignKey(User, on_delete=models.CASCADE, related_name='tutor_invoices', null=True)
@@ -132,6 +238,16 @@ class Invoices(models.Model):
     status = models.BooleanField(default=False)
     total = models.DecimalField(decimal_places=2, max_digits=10,default=0.0)
     #status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    # The accepted request this invoice bills; unique, so a request is never invoiced twice
+    request_session = models.OneToOneField(
+        RequestSession, on_delete=models.SET_NULL, related_name='invoice', null=True, blank=True
+    )
+
+    class Meta:
+        indexes = [
+            # Exports read invoices by due date range
+            models.Index(fields=['due_date', 'id'], name='invoice_due_date'),
+        ]
 
 
 class Ticket(models.Model):
@@ -140,6 +256,16 @@ class Ticket(models.Model):
     is_close = models.BooleanField(default=False)
     date = models.DateField(auto_now_add=True)
     time = models.TimeField(auto_now_add=True)
+    # Maintained by tutorials.tickets when messages are posted or read, so inboxes need no aggregate
+    unread_for_admin = models.PositiveIntegerField(default=0)
+    unread_for_student = models.PositiveIntegerField(default=0)
+    last_message_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-last_message_at', '-id'], name='ticket_activity'),
+            models.Index(fields=['student', '-last_message_at', '-id'], name='ticket_student_activity'),
+        ]
 
 
 class Messages(models.Model):
@@ -152,4 +278,10 @@ class Messages(models.Model):
     msg_from = models.CharField(max_length=10, choices=FROM_CHOICES, default='student')
     is_read = models.BooleanField(default=False)
     date = models.DateField(auto_now_add=True)
-    time = models.TimeField(auto_now_add=True)
\ No newline at end of file
+    time = models.TimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Threads are read in id order, a page at a time from either end
+            models.Index(fields=['ticket', 'id'], name='message_ticket_id'),
+        ]
@@ -0,0 +1,125 @@
+"""Dated occurrences of accepted request sessions.
+
+A RequestSession only stores a date range and weekly availability. Once accepted,
+each weekly slot of its availability (see tutorials.availability) is expanded into
+one SessionOccurrence per date it runs on between the start and end dates, every
+other week when the request is fortnightly. Times are read in the current time
+zone. Calendars and "what is on next" questions are then range scans on the
+(tutor, starts_at) and (student, starts_at) indexes.
+
+The receiver in tutorials.signals keeps occurrences in step with saved requests;
+code updating requests in bulk calls sync_occurrences itself.
+"""
+
+from datetime import datetime, time, timedelta
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Min
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from tutorials.availability import availability_slots
+from tutorials.models import RequestSession, SessionOccurrence
+from tutorials.scheduling import as_date
+from tutorials.timetable import SESSION_USER_FIELDS
+
+OCCURRENCE_BATCH_SIZE = 1000
+# The RequestSession fields occurrences are built from
+OCCURRENCE_SOURCE_FIELDS = {'status', 'tutor', 'student', 'start_date', 'end_date', 'availability', 'fortnightly'}
+
+
+def occurrence_dates(start_date, end_date, weekday, fortnightly=False):
+    """Yield the dates a weekday falls on between two dates, both inclusive.
+
+    Fortnightly schedules skip every other week, starting with the first, as in
+    tutorials.scheduling.count_weekday_occurrences.
+    """
+
+    start_date = as_date(start_date)
+    end_date = as_date(end_date)
+    day = start_date + timedelta(days=(weekday - start_date.weekday()) % 7)
+    step = timedelta(weeks=2 if fortnightly else 1)
+    while day <= end_date:
+        yield day
+        day += step
+
+
+def build_occurrences(request_session):
+    """Return the unsaved occurrences of a request session, none unless it is accepted."""
+
+    if request_session.status != 'accepted':
+        return []
+    zone = timezone.get_current_timezone()
+    occurrences = []
+    for weekday, start, end in sorted(availability_slots(request_session.availability)):
+        for day in occurrence_dates(
+            request_session.start_date, request_session.end_date, weekday, request_session.fortnightly
+        ):
+            starts_at = timezone.make_aware(datetime.combine(day, time(start // 60, start % 60)), zone)
+            occurrences.append(SessionOccurrence(
+                request_session_id=request_session.id,
+                tutor_id=request_session.tutor_id,
+                student_id=request_session.student_id,
+                starts_at=starts_at,
+                ends_at=starts_at + timedelta(minutes=end - start),
+            ))
+    return occurrences
+
+
+def sync_occurrences(request_sessions):
+    """Replace the occurrences of request sessions with those built from their current fields."""
+
+    SessionOccurrence.objects.filter(request_session__in=[r.id for r in request_sessions]).delete()
+    SessionOccurrence.objects.bulk_create(
+        [occurrence for r in request_sessions for occurrence in build_occurrences(r)],
+        batch_size=OCCURRENCE_BATCH_SIZE,
+    )
+
+
+def user_occurrences(user, start, end=None):
+    """Return a student's or tutor's occurrences starting from start (and before end), earliest first."""
+
+    field = SESSION_USER_FIELDS.get(user.role)
+    if field is None:
+        return SessionOccurrence.objects.none()
+    occurrences = SessionOccurrence.objects.filter(**{field: user}, starts_at__gte=start)
+    if end is not None:
+        occurrences = occurrences.filter(starts_at__lt=end)
+    return occurrences.select_related('request_session__course').order_by('starts_at', 'id')
+
+
+def next_occurrence(user, now=None):
+    """Return a student's or tutor's next occurrence, or None."""
+
+    return user_occurrences(user, now or timezone.now()).first()
+
+
+def upcoming_request_sessions(user, start):
+    """Return a student's or tutor's request sessions meeting from start, in the order they next meet.
+
+    Each request session is listed once, however many of its occurrences are ahead.
+    """
+
+    field = SESSION_USER_FIELDS.get(user.role)
+    if field is None:
+        return RequestSession.objects.none()
+    return (
+        RequestSession.objects.filter(**{f'occurrences__{field}': user, 'occurrences__starts_at__gte': start})
+        .annotate(next_starts_at=Min('occurrences__starts_at'))
+        .select_related('course')
+        .order_by('next_starts_at', 'id')
+    )
+
+
+def occurrence_totals(request_sessions):
+    """Return the price of each request session's occurrences, summed in SQL, by request session id.
+
+    Like tutorials.scheduling.count_sessions, a day with several times is billed once.
+    """
+
+    rows = (
+        SessionOccurrence.objects.filter(request_session__in=request_sessions)
+        .values('request_session_id', 'request_session__course__price')
+        .annotate(total=ExpressionWrapper(
+            Count(TruncDate('starts_at'), distinct=True) * F('request_session__course__price'),
+            output_field=DecimalField(max_digits=10, decimal_places=2),
+        ))
+    )
+    return {row['request_session_id']: row['total'] for row in rows}
@@ -0,0 +1,66 @@
+"""Publish and subscribe to events on named channels.
+
+Async views subscribe to a channel and wait on a queue, so an open connection
+costs one idle coroutine. Sync code publishes from any thread. The broker used is
+named by the TICKET_BROKER setting. InProcessBroker only reaches subscribers in
+the same process, so deployments with several workers should point it at a
+broker with the same interface that is shared between them.
+"""
+
+import asyncio
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from functools import cache
+from threading import Lock
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class InProcessBroker:
+    """Broker delivering events to subscribers in this process."""
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._lock = Lock()
+
+    def publish(self, channel, event):
+        """Send an event to every current subscriber of a channel. Safe to call from any thread."""
+
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, event)
+            except RuntimeError:
+                # The subscriber's event loop has closed, its subscription is about to end
+                pass
+
+    @asynccontextmanager
+    async def subscribe(self, channel):
+        """Subscribe to a channel for the duration of the block, yielding a queue of its events."""
+
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue())
+        with self._lock:
+            self._subscribers[channel].add(subscriber)
+        try:
+            yield subscriber[1]
+        finally:
+            with self._lock:
+                self._subscribers[channel].discard(subscriber)
+                if not self._subscribers[channel]:
+                    del self._subscribers[channel]
+
+    def subscriber_count(self, channel):
+        with self._lock:
+            return len(self._subscribers.get(channel, ()))
+
+
+@cache
+def get_broker():
+    """Return the broker named by the TICKET_BROKER setting."""
+
+    return import_string(settings.TICKET_BROKER)()
+
+
+def ticket_channel(ticket_id):
+    return f'ticket:{ticket_id}'
@@ -0,0 +1,65 @@
+"""Arithmetic on weekly session schedules.
+
+A RequestSession runs between two dates on the weekdays named in its availability,
+either every week or every other week. The functions here count those occurrences
+in constant time instead of walking the calendar one day at a time.
+"""
+
+from datetime import date
+
+WEEKDAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+
+def as_date(value):
+    """Return value as a date, accepting ISO formatted strings as stored by some callers."""
+
+    if isinstance(value, str):
+        return date.fromisoformat(value)
+    return value
+
+
+def weekday_index(day):
+    """Return the Monday-based index of a weekday name, or None if it is not a weekday."""
+
+    try:
+        return WEEKDAYS.index(str(day).strip().lower())
+    except ValueError:
+        return None
+
+
+def count_weekday_occurrences(start_date, end_date, weekday, fortnightly=False):
+    """Return how many times a weekday falls between two dates, both inclusive.
+
+    The span is split into 7-day blocks starting at start_date, each of which contains
+    every weekday exactly once, so the count is the number of full blocks plus one if
+    the weekday lands in the remainder. Fortnightly schedules only run in the even
+    blocks (the first week, the third week, ...).
+    """
+
+    start_date = as_date(start_date)
+    end_date = as_date(end_date)
+    span = (end_date - start_date).days + 1
+    offset = (weekday - start_date.weekday()) % 7
+    if offset >= span:
+        return 0
+    occurrences = (span - 1 - offset) // 7 + 1
+    if fortnightly:
+        return (occurrences + 1) // 2
+    return occurrences
+
+
+def count_sessions(start_date, end_date, availability, fortnightly=False):
+    """Return the number of sessions a request with the given availability books.
+
+    One session is counted on each date that falls on a day named in the availability
+    dict, whatever times are listed for that day. Unknown day names are ignored.
+    """
+
+    if not availability:
+        return 0
+    weekdays = {weekday_index(day) for day in availability}
+    weekdays.discard(None)
+    return sum(
+        count_weekday_occurrences(start_date, end_date, weekday, fortnightly)
+        for weekday in weekdays
+    )
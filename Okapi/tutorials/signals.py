@@ -0,0 +1,93 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from tutorials.availability import sync_request_availability, sync_user_availability
+from tutorials.cached_queries import invalidate_courses
+from tutorials.conflicts import invalidate_booking_index
+from tutorials.dashboard_stats import invalidate_dashboard_stats
+from tutorials.matching import invalidate_match_index
+from tutorials.occurrences import OCCURRENCE_SOURCE_FIELDS, sync_occurrences
+from tutorials.models import AvailabilitySlot, Course, Invoices, RequestSession, Student, Tutor, User
+
+@receiver([post_save, post_delete], sender=User)
+@receiver([post_save, post_delete], sender=RequestSession)
+@receiver([post_save, post_delete], sender=Course)
+@receiver([post_save, post_delete], sender=Invoices)
+def dashboard_stats_changed(sender, update_fields=None, **kwargs):
+    """Invalidate the admin dashboard counters once a change to a counted row is committed."""
+
+    # Logging in only touches last_login, which no counter depends on
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    transaction.on_commit(invalidate_dashboard_stats)
+
+@receiver([post_save, post_delete], sender=Course)
+def course_changed(sender, **kwargs):
+    """Invalidate the cached course catalogue once a change to a course is committed."""
+
+    transaction.on_commit(invalidate_courses)
+
+@receiver([post_save, post_delete], sender=Tutor)
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=Course)
+@receiver(m2m_changed, sender=Course.users.through)
+def tutor_courses_changed(sender, **kwargs):
+    """Invalidate the tutor match index once a change to tutors or their courses is committed.
+
+    A process rebuilding the index before then would read the old rows and keep them.
+    """
+
+    transaction.on_commit(invalidate_match_index)
+
+@receiver(post_save, sender=Tutor)
+@receiver(post_save, sender=Student)
+def profile_availability_saved(sender, instance, **kwargs):
+    """Mirror a tutor's or student's availability into AvailabilitySlot rows."""
+
+    sync_user_availability(instance.user_id, instance.availability)
+
+@receiver(post_delete, sender=Tutor)
+@receiver(post_delete, sender=Student)
+def profile_deleted(sender, instance, **kwargs):
+    """Drop the slots of a deleted tutor or student profile."""
+
+    AvailabilitySlot.objects.filter(user_id=instance.user_id).delete()
+
+@receiver(post_save, sender=RequestSession)
+def request_availability_saved(sender, instance, update_fields=None, **kwargs):
+    """Mirror a request session's availability into AvailabilitySlot rows."""
+
+    if update_fields is not None and 'availability' not in update_fields:
+        return
+    sync_request_availability(instance)
+
+@receiver([post_save, post_delete], sender=RequestSession)
+def request_bookings_changed(sender, **kwargs):
+    """Invalidate the tutor booking index once a request session change is committed."""
+
+    # Other processes rebuild the index as soon as it is invalidated, so wait until they can see the change
+    transaction.on_commit(invalidate_booking_index)
+
+@receiver(post_save, sender=RequestSession)
+def request_schedule_saved(sender, instance, created, update_fields=None, **kwargs):
+    """Rebuild the dated occurrences of a request session whose schedule or status changed."""
+
+    if update_fields is not None and not OCCURRENCE_SOURCE_FIELDS & set(update_fields):
+        return
+    # A new request that is not accepted has no occurrences to replace
+    if created and instance.status != 'accepted':
+        return
+    sync_occurrences([instance])
+
+
+@receiver(connection_created)
+def configure_sqlite_connection(sender, connection, **kwargs):
+    """Apply the SQLITE_PRAGMAS setting to each new SQLite connection."""
+
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for pragma, value in getattr(settings, 'SQLITE_PRAGMAS', {}).items():
+            cursor.execute(f'PRAGMA {pragma} = {value}')
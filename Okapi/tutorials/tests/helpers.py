@@ -1,5 +1,9 @@
+from datetime import date
+from django.core.cache import cache
 from django.urls import reverse
 from with_asserts.mixin import AssertHTMLMixin
+from tutorials.cache import clear_indexes
+from tutorials.models import RequestSession
 
 def reverse_with_next(url_name, next_url):
     """Extended version of reverse to generate URLs with redirects"""
@@ -34,4 +38,37 @@ class MenuTesterMixin(AssertHTMLMixin):
         """Check that no menu is present."""
         
         for url in self.menu_urls:
-            self.assertNotHTML(response, f'a[href="{url}"]')
\ No newline at end of file
+            self.assertNotHTML(response, f'a[href="{url}"]')
+
+
+class CacheResetMixin:
+    """Class to start each test with an empty cache and no in-process indexes.
+
+    Both outlive the rollback of each test, so cached courses, counters and indexes
+    would otherwise leak from one test into the next.
+    """
+
+    def setUp(self):
+        cache.clear()
+        clear_indexes()
+        super().setUp()
+
+class RequestFactoryMixin:
+    """Class to create request sessions of self.student for self.course."""
+
+    # Fields of every request the test case creates, unless given to create_request
+    request_defaults = {}
+
+    def create_request(self, **fields):
+        """Create a pending weekly request on Mondays at nine in January 2024."""
+
+        fields = {
+            'student': self.student,
+            'course': self.course,
+            'availability': {'monday': '09:00'},
+            'start_date': date(2024, 1, 1),
+            'end_date': date(2024, 1, 31),
+            **self.request_defaults,
+            **fields,
+        }
+        return RequestSession.objects.create(**fields)
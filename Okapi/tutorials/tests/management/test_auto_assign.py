@@ -0,0 +1,66 @@
+"""Tests for the auto_assign management command."""
+from datetime import date
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from tutorials.models import Course, RequestSession, Tutor, User
+from tutorials.tests.helpers import CacheResetMixin
+
+class AutoAssignCommandTestCase(CacheResetMixin, TestCase):
+    """Tests for assigning tutors from the command line."""
+
+    def setUp(self):
+        super().setUp()
+        course = Course.objects.create(name='Python', desc='Basics', price=20)
+        student = User.objects.create_user(
+            username='@student', password='student123', email='student@test.com', role='Student'
+        )
+        self.tutor = User.objects.create_user(
+            username='@tutor', password='tutor123', email='tutor@test.com', role='Tutor'
+        )
+        Tutor.objects.create(user=self.tutor, years_exp=2, rate=1.0, availability={'monday': ['9:00']})
+        course.users.add(self.tutor)
+        self.request = RequestSession.objects.create(
+            student=student, course=course, availability={'monday': '9:00'},
+            start_date=date(2024, 1, 1), end_date=date(2024, 1, 28)
+        )
+
+    def test_assigns_pending_requests(self):
+        output = StringIO()
+        call_command('auto_assign', '--all', stdout=output)
+
+        self.request.refresh_from_db()
+        self.assertEqual((self.request.status, self.request.tutor), ('accepted', self.tutor))
+        self.assertIn('Accepted 1 requests and created 1 invoices', output.getvalue())
+
+    def test_dry_run(self):
+        output = StringIO()
+        call_command('auto_assign', '--dry-run', stdout=output)
+
+        self.assertIn(f'Request {self.request.id} -> tutor {self.tutor.id}', output.getvalue())
+        self.request.refresh_from_db()
+        self.assertEqual(self.request.status, 'pending')
+
+    def test_assigns_given_requests(self):
+        call_command('auto_assign', str(self.request.id), stdout=StringIO())
+
+        self.request.refresh_from_db()
+        self.assertEqual(self.request.status, 'accepted')
+
+    def test_requires_requests_or_all(self):
+        with self.assertRaises(CommandError):
+            call_command('auto_assign', stdout=StringIO())
+        self.request.refresh_from_db()
+        self.assertEqual(self.request.status, 'pending')
+
+    def test_unavailable_tutors_need_opt_in(self):
+        self.request.availability = {'tuesday': '9:00'}
+        self.request.save()
+        output = StringIO()
+        call_command('auto_assign', '--all', stdout=output)
+        self.assertIn(f'No tutor could be assigned to requests #{self.request.id}.', output.getvalue())
+
+        call_command('auto_assign', '--all', '--any-availability', stdout=StringIO())
+        self.request.refresh_from_db()
+        self.assertEqual((self.request.status, self.request.tutor), ('accepted', self.tutor))
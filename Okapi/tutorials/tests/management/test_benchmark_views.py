@@ -0,0 +1,71 @@
+"""Tests for the benchmark_views management command."""
+import logging
+from unittest.mock import patch
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from tutorials.management.commands.benchmark_views import (
+    compare_reports, named_url_patterns, percentile, run_benchmark
+)
+
+class BenchmarkHelpersTestCase(SimpleTestCase):
+    """Unit tests for the benchmark helpers."""
+
+    def _report(self, queries=3, p50_ms=10.0, p95_ms=20.0, peak_kb=100.0):
+        return {'results': {'dashboard': {'Admin': {
+            'queries': queries, 'p50_ms': p50_ms, 'p95_ms': p95_ms, 'peak_kb': peak_kb
+        }}}}
+
+    def test_percentile(self):
+        samples = list(range(1, 101))
+        self.assertEqual(percentile(samples, 0.5), 50)
+        self.assertEqual(percentile(samples, 0.95), 95)
+        self.assertEqual(percentile([7], 0.95), 7)
+
+    def test_named_urls_skip_admin_site(self):
+        names = dict(named_url_patterns())
+        self.assertIn('dashboard', names)
+        self.assertEqual(names['ticket_details'], ['ticket_id'])
+        self.assertNotIn('index', names)
+
+    def test_no_regression_within_threshold(self):
+        self.assertEqual(compare_reports(self._report(), self._report(p50_ms=12.0), 0.25), [])
+
+    def test_extra_query_is_a_regression(self):
+        regressions = compare_reports(self._report(), self._report(queries=4), 0.25)
+        self.assertEqual(regressions, ['dashboard as Admin: 3 -> 4 queries'])
+
+    def test_slow_view_is_a_regression(self):
+        regressions = compare_reports(self._report(), self._report(p95_ms=30.0), 0.25)
+        self.assertEqual(regressions, ['dashboard as Admin: p95_ms 20.0 -> 30.0'])
+
+    def test_small_absolute_latency_change_is_noise(self):
+        self.assertEqual(compare_reports(self._report(p50_ms=1.0), self._report(p50_ms=1.9), 0.25), [])
+
+    def test_new_views_are_not_compared(self):
+        self.assertEqual(compare_reports({'results': {}}, self._report(), 0.25), [])
+
+class RunBenchmarkTestCase(TestCase):
+    """Tests for running the benchmark against a small dataset."""
+
+    def test_every_role_measured(self):
+        report = run_benchmark(users=30, requests=1)
+        dashboard = report['results']['dashboard']
+        self.assertEqual(set(dashboard), {'Student', 'Tutor', 'Admin'})
+        for result in dashboard.values():
+            self.assertEqual(result['status'], 200)
+            self.assertGreater(result['queries'], 0)
+            self.assertGreater(result['p95_ms'], 0)
+        self.assertNotIn('log_out', report['results'])
+
+class BenchmarkCommandTestCase(SimpleTestCase):
+    """Tests for the command around the benchmark run."""
+
+    @patch('tutorials.management.commands.benchmark_views.run_benchmark', side_effect=RuntimeError)
+    @patch('tutorials.management.commands.benchmark_views.teardown_test_environment')
+    @patch('tutorials.management.commands.benchmark_views.setup_test_environment')
+    def test_request_logging_restored_after_failure(self, *mocks):
+        with patch.object(connection.creation, 'create_test_db'), patch.object(connection.creation, 'destroy_test_db'):
+            with self.assertRaises(RuntimeError):
+                call_command('benchmark_views')
+        self.assertFalse(logging.getLogger('django.request').disabled)
@@ -0,0 +1,53 @@
+"""Tests for the seed management command."""
+from contextlib import redirect_stdout
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from tutorials.models import Invoices, RequestSession, Student, Tutor, User
+from tutorials.tests.helpers import CacheResetMixin
+
+class BulkSeedTestCase(TestCase):
+    """Tests for the bulk mode of the seed command."""
+
+    def setUp(self):
+        call_command('seed', '--bulk', '--users', '60', '--batch-size', '7', stdout=StringIO())
+
+    def test_seeds_requested_number_of_users(self):
+        self.assertEqual(User.objects.count(), 60)
+        self.assertTrue(User.objects.filter(username='@johndoe').exists())
+
+    def test_every_user_has_a_profile(self):
+        self.assertEqual(Tutor.objects.count(), User.objects.filter(role='Tutor').count())
+        self.assertEqual(Student.objects.count(), User.objects.filter(role='Student').count())
+
+    def test_users_can_log_in(self):
+        user = User.objects.exclude(username__in=['@johndoe', '@janedoe', '@charlie']).first()
+        self.assertTrue(user.check_password('Password123'))
+        user.full_clean()
+
+    def test_sessions_use_qualified_tutors(self):
+        for session in RequestSession.objects.select_related('course'):
+            self.assertTrue(Tutor.objects.filter(user_id=session.tutor_id, courses=session.course).exists())
+
+    def test_each_accepted_session_is_invoiced(self):
+        self.assertEqual(
+            set(Invoices.objects.values_list('request_session_id', flat=True)),
+            set(RequestSession.objects.filter(status='accepted').values_list('id', flat=True)),
+        )
+        self.assertEqual(Invoices.objects.count(), RequestSession.objects.filter(status='accepted').count())
+
+class SeedTestCase(CacheResetMixin, TestCase):
+    """Tests for the default mode of the seed command."""
+
+    def setUp(self):
+        super().setUp()
+        with redirect_stdout(StringIO()):
+            call_command('seed', '--users', '30', stdout=StringIO())
+
+    def test_each_accepted_session_is_invoiced(self):
+        self.assertTrue(RequestSession.objects.exists())
+        self.assertFalse(Invoices.objects.filter(request_session__isnull=True).exists())
+        self.assertEqual(
+            set(Invoices.objects.values_list('request_session_id', flat=True)),
+            set(RequestSession.objects.filter(status='accepted').values_list('id', flat=True)),
+        )
@@ -0,0 +1,89 @@
+"""Tests for the RequestTimingMiddleware."""
+import re
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from tutorials.instrumentation import histogram, request_stats, reset_request_stats
+from tutorials.middleware import RequestTimingMiddleware
+from tutorials.models import User
+
+@override_settings(REQUEST_TIMING=True)
+class RequestTimingMiddlewareTestCase(TestCase):
+    """Tests for the RequestTimingMiddleware."""
+
+    fixtures = ['tutorials/tests/fixtures/default_user.json']
+
+    def setUp(self):
+        self.user = User.objects.get(username='@johndoe')
+        self.client.login(username=self.user.username, password='Password123')
+        reset_request_stats()
+
+    def _server_timing(self, response):
+        entries = {}
+        for name, params in re.findall(r'(\w+)((?:;\w+=(?:"[^"]*"|[^;,]*))*)', response['Server-Timing']):
+            entries[name] = dict(re.findall(r';(\w+)=("[^"]*"|[^;,]*)', params))
+        return entries
+
+    def test_server_timing_header(self):
+        with self.assertLogs('tutorials.requests', 'INFO'):
+            response = self.client.get(reverse('dashboard'))
+        timing = self._server_timing(response)
+        self.assertEqual(set(timing), {'sql', 'template', 'view', 'total'})
+        self.assertGreater(float(timing['template']['dur']), 0)
+        self.assertGreaterEqual(float(timing['total']['dur']), float(timing['view']['dur']))
+        self.assertIn('queries', timing['sql']['desc'])
+
+    def test_request_is_logged(self):
+        with self.assertLogs('tutorials.requests', 'INFO') as logs:
+            self.client.get(reverse('dashboard'))
+        self.assertIn('url_name=dashboard', logs.output[0])
+        self.assertIn('status=200', logs.output[0])
+        self.assertIn('queries=', logs.output[0])
+
+    def test_requests_recorded_per_url_name(self):
+        with self.assertLogs('tutorials.requests', 'INFO'):
+            self.client.get(reverse('dashboard'))
+            self.client.get(reverse('dashboard'))
+            self.client.get(reverse('profile'))
+        stats = {row['url_name']: row for row in request_stats()}
+        self.assertEqual(stats['dashboard']['requests'], 2)
+        self.assertEqual(stats['profile']['requests'], 1)
+        self.assertEqual(sum(count for _, count in stats['dashboard']['histogram']), 2)
+
+    @override_settings(REQUEST_TIMING_WINDOW=2)
+    def test_window_keeps_latest_requests(self):
+        with self.assertLogs('tutorials.requests', 'INFO'):
+            for _ in range(3):
+                self.client.get(reverse('dashboard'))
+        stats = {row['url_name']: row for row in request_stats()}
+        self.assertEqual(stats['dashboard']['requests'], 2)
+
+    def test_duplicate_queries_are_detected(self):
+        def view(request):
+            for _ in range(3):
+                list(User.objects.filter(id=self.user.id))
+            return HttpResponse('ok')
+
+        middleware = RequestTimingMiddleware(view)
+        request = RequestFactory().get('/')
+        with self.assertLogs('tutorials.requests', 'WARNING') as logs:
+            response = middleware(request)
+        self.assertIn('2 duplicates', response['Server-Timing'])
+        self.assertIn('duplicate_queries=2', logs.output[0])
+        self.assertIn('url_name=<unresolved>', logs.output[0])
+        self.assertIn('most_duplicated=', logs.output[0])
+
+    @override_settings(REQUEST_TIMING=False)
+    def test_disabled_by_default(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            RequestTimingMiddleware(lambda request: HttpResponse('ok'))
+        response = self.client.get(reverse('dashboard'))
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual(request_stats(), [])
+
+    def test_histogram_buckets(self):
+        buckets = dict(histogram([1, 5, 7, 3000]))
+        self.assertEqual(buckets['≤5'], 2)
+        self.assertEqual(buckets['≤10'], 1)
+        self.assertEqual(buckets['>2500'], 1)
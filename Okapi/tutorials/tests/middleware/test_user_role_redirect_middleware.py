@@ -0,0 +1,71 @@
+"""Tests for the UserRoleRedirectMiddleware."""
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser, Group
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from tutorials.middleware import UserRoleRedirectMiddleware
+from tutorials.models import User
+
+MIDDLEWARE_PATH = 'tutorials.middleware.UserRoleRedirectMiddleware'
+
+class UserRoleRedirectMiddlewareTestCase(TestCase):
+    """Tests for the UserRoleRedirectMiddleware."""
+
+    fixtures = ['tutorials/tests/fixtures/default_user.json']
+
+    def setUp(self):
+        self.user = User.objects.get(username='@johndoe')
+        self.factory = RequestFactory()
+        self.middleware = UserRoleRedirectMiddleware(lambda request: HttpResponse('ok'))
+
+    def _count_queries(self, url):
+        self.client.login(username=self.user.username, password='Password123')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_urls_are_reversed_once_at_init(self):
+        self.assertEqual(self.middleware.dashboard_urls['Student'], reverse('dashboard'))
+        self.assertIn(reverse('dashboard'), self.middleware.dashboard_paths)
+
+    def test_no_extra_queries_per_request(self):
+        for url in [reverse('dashboard'), reverse('profile')]:
+            # Load the page once, so both counts read the cached courses
+            self._count_queries(url)
+            with_middleware = self._count_queries(url)
+            without = [name for name in settings.MIDDLEWARE if name != MIDDLEWARE_PATH]
+            with self.settings(MIDDLEWARE=without):
+                without_middleware = self._count_queries(url)
+            self.assertEqual(with_middleware, without_middleware)
+
+    def test_groups_are_not_consulted(self):
+        self.user.groups.add(Group.objects.create(name='admin'))
+        request = self.factory.get(reverse('dashboard'))
+        request.user = self.user
+        with self.assertNumQueries(0):
+            response = self.middleware(request)
+        self.assertEqual(response.content, b'ok')
+
+    def test_static_requests_do_not_load_user(self):
+        request = self.factory.get(settings.STATIC_URL + 'custom.css')
+        response = self.middleware(request)
+        self.assertEqual(response.content, b'ok')
+
+    def test_redirects_to_own_dashboard(self):
+        self.middleware.dashboard_urls = {'Student': '/student/', 'Tutor': '/tutor/'}
+        self.middleware.dashboard_paths = {'/student/', '/tutor/'}
+        request = self.factory.get('/tutor/')
+        request.user = self.user
+        response = self.middleware(request)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response.url, '/student/')
+
+    def test_anonymous_user_is_not_redirected(self):
+        request = self.factory.get(reverse('dashboard'))
+        request.user = AnonymousUser()
+        response = self.middleware(request)
+        self.assertEqual(response.content, b'ok')
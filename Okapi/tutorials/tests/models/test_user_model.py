@@ -1,5 +1,6 @@
 """Unit tests for the User model."""
 from django.core.exceptions import ValidationError
+from unittest.mock import patch
 from django.test import TestCase
 from tutorials.models import User
 
@@ -143,6 +144,60 @@ class UserModelTestCase(TestCase):
         expected_gravatar_url = self._gravatar_url(size=60)
         self.assertEqual(actual_gravatar_url, expected_gravatar_url)
 
+    def test_save_stores_email_hash(self):
+        self.user.save()
+        self.assertEqual(self.user.email_hash, self.GRAVATAR_URL.rsplit('/', 1)[1])
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.email_hash, self.GRAVATAR_URL.rsplit('/', 1)[1])
+
+    def test_gravatar_follows_email_change(self):
+        self.user.save()
+        self.user.gravatar()
+        self.user.email = 'someone.else@example.org'
+        self.user.save(update_fields=['email'])
+        self.user.refresh_from_db()
+        self.assertNotEqual(self.user.gravatar(), self._gravatar_url(size=120))
+        self.assertEqual(self.user.gravatar(), User(email='someone.else@example.org').gravatar())
+
+    def test_gravatar_follows_unsaved_email_change(self):
+        self.user.save()
+        self.user.email = 'someone.else@example.org'
+        self.assertEqual(self.user.gravatar(), User(email='someone.else@example.org').gravatar())
+
+    def test_gravatar_follows_queryset_email_update(self):
+        self.user.save()
+        User.objects.filter(pk=self.user.pk).update(email='someone.else@example.org')
+        user = User.objects.get(pk=self.user.pk)
+        self.assertEqual(user.email_hash, '')
+        self.assertEqual(user.gravatar(), User(email='someone.else@example.org').gravatar())
+
+    def test_stored_hash_ignored_when_disabled(self):
+        self.user.save()
+        User.objects.filter(pk=self.user.pk).update(email_hash='0' * 32)
+        user = User.objects.get(pk=self.user.pk)
+        with self.settings(GRAVATAR_STORE_HASH=False):
+            self.assertEqual(user.gravatar(), self._gravatar_url(size=120))
+
+    def test_loaded_hash_is_used(self):
+        self.user.save()
+        user = User.objects.get(pk=self.user.pk)
+        with patch('tutorials.models.email_hash') as hash_email:
+            user.gravatar()
+        hash_email.assert_not_called()
+
+    def test_stored_hash_is_used(self):
+        self.user.save()
+        with patch('tutorials.models.email_hash') as hash_email:
+            self.user.gravatar()
+        hash_email.assert_not_called()
+
+    def test_email_hash_not_stored_when_disabled(self):
+        with self.settings(GRAVATAR_STORE_HASH=False):
+            self.user.save()
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.email_hash, '')
+        self.assertEqual(self.user.gravatar(), self._gravatar_url(size=120))
+
     def _gravatar_url(self, size):
         gravatar_url = f"{UserModelTestCase.GRAVATAR_URL}?size={size}&default=mp"
         return gravatar_url
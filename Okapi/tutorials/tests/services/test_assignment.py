@@ -0,0 +1,135 @@
+"""Unit tests for assigning tutors to pending requests in bulk."""
+import itertools
+import random
+from datetime import date
+from decimal import Decimal
+from django.test import SimpleTestCase, TestCase
+from tutorials.assignment import LOAD_COST, AssignmentSolver, auto_assign, plan_assignments
+from tutorials.models import Course, Invoices, RequestSession, SessionOccurrence, Tutor, User
+from tutorials.tests.helpers import CacheResetMixin, RequestFactoryMixin
+
+class AssignmentSolverTestCase(SimpleTestCase):
+    """Tests for the min-cost assignment of requests to tutors."""
+
+    def best_cost(self, requests, loads):
+        """Return the cost of the cheapest assignment, found by trying every one."""
+
+        best = None
+        for tutors in itertools.product(*[list(costs) for costs in requests.values()]):
+            counts = {}
+            cost = 0
+            for costs, tutor_id in zip(requests.values(), tutors):
+                cost += costs[tutor_id] + LOAD_COST * (loads.get(tutor_id, 0) + counts.get(tutor_id, 0))
+                counts[tutor_id] = counts.get(tutor_id, 0) + 1
+            best = cost if best is None else min(best, cost)
+        return best
+
+    def test_matches_exhaustive_search(self):
+        generator = random.Random(1)
+        for _ in range(200):
+            tutor_count = generator.randint(1, 4)
+            requests = {
+                request_id: {
+                    tutor_id: -4 * generator.randint(0, 3)
+                    for tutor_id in generator.sample(range(tutor_count), generator.randint(1, tutor_count))
+                }
+                for request_id in range(generator.randint(1, 6))
+            }
+            loads = {tutor_id: generator.randint(0, 3) for tutor_id in range(tutor_count)}
+            solver = AssignmentSolver(loads)
+            for request_id, costs in requests.items():
+                solver.add(request_id, costs)
+            self.assertEqual(len(solver.assigned), len(requests))
+            self.assertEqual(solver.total_cost(), self.best_cost(requests, loads))
+
+    def test_earlier_request_moves_for_a_later_one(self):
+        solver = AssignmentSolver()
+        solver.add(1, {10: 0, 20: 0})
+        solver.add(2, {10: 0})
+        self.assertEqual(solver.assigned, {1: 20, 2: 10})
+
+    def test_load_is_balanced(self):
+        solver = AssignmentSolver({10: 2})
+        for request_id in range(4):
+            solver.add(request_id, {10: 0, 20: 0})
+        self.assertEqual(sorted(solver.assigned.values()), [10, 20, 20, 20])
+
+    def test_request_without_tutors(self):
+        solver = AssignmentSolver()
+        self.assertIsNone(solver.add(1, {}))
+        self.assertEqual(solver.assigned, {})
+
+class AutoAssignTestCase(CacheResetMixin, RequestFactoryMixin, TestCase):
+    """Tests for planning and saving assignments of pending requests."""
+
+    request_defaults = {'end_date': date(2024, 1, 28)}
+
+    def setUp(self):
+        super().setUp()
+        self.course = Course.objects.create(name='Python', desc='Basics', price=Decimal('20.00'))
+        self.student = User.objects.create_user(
+            username='@student', password='student123', email='student@test.com', role='Student'
+        )
+        self.morning = self.create_tutor('@morning', {'monday': ['9:00', '10:00']})
+        self.evening = self.create_tutor('@evening', {'monday': ['18:00']})
+
+    def create_tutor(self, username, availability):
+        tutor = User.objects.create_user(
+            username=username, password='tutor123', email=f'{username[1:]}@test.com', role='Tutor'
+        )
+        Tutor.objects.create(user=tutor, years_exp=2, rate=1.0, availability=availability)
+        self.course.users.add(tutor)
+        return tutor
+
+    def test_plan_prefers_available_tutors(self):
+        morning = self.create_request(availability={'monday': '9:00'})
+        evening = self.create_request(availability={'monday': '18:00'})
+        plan = plan_assignments([morning, evening])
+        self.assertEqual(plan, {morning.id: self.morning.id, evening.id: self.evening.id})
+
+    def test_plan_never_double_books(self):
+        requests = [self.create_request(availability={'monday': '9:00'}) for _ in range(3)]
+        plan = plan_assignments(requests, only_overlapping=False)
+        # Two tutors can teach at nine, so the third request is left over
+        self.assertEqual(sorted(plan.values()), sorted([self.morning.id, self.evening.id]))
+
+    def test_only_overlapping_by_default(self):
+        requests = [self.create_request(availability={'monday': '9:00'}) for _ in range(2)]
+        plan = plan_assignments(requests)
+        self.assertEqual(list(plan.values()), [self.morning.id])
+
+    def test_auto_assign_accepts_in_bulk(self):
+        requests = [self.create_request(availability={'monday': f'{hour}:00'}) for hour in (9, 10, 18)]
+        orphan = self.create_request(
+            availability={'monday': '9:00'}, course=Course.objects.create(name='Go', desc='Basics', price=10)
+        )
+        result = auto_assign()
+
+        self.assertEqual(len(result.batch.processed), 3)
+        self.assertEqual(result.unassigned, [orphan])
+        self.assertEqual(
+            dict(RequestSession.objects.filter(status='accepted').values_list('id', 'tutor_id')),
+            {requests[0].id: self.morning.id, requests[1].id: self.morning.id, requests[2].id: self.evening.id},
+        )
+        self.assertEqual(Invoices.objects.count(), 3)
+        self.assertEqual(SessionOccurrence.objects.count(), 12)
+
+    def test_dry_run_writes_nothing(self):
+        request = self.create_request(availability={'monday': '9:00'})
+        result = auto_assign(dry_run=True)
+
+        self.assertEqual(result.plan, {request.id: self.morning.id})
+        self.assertIsNone(result.batch)
+        self.assertFalse(RequestSession.objects.filter(status='accepted').exists())
+
+    def test_query_count_does_not_grow_with_requests(self):
+        self.create_request(availability={'monday': '9:00'})
+        # Build the tutor match index first
+        auto_assign(dry_run=True)
+        with self.assertNumQueries(13):
+            auto_assign()
+        for hour in range(10):
+            self.create_request(availability={'monday': f'{hour}:00'}, start_date=date(2024, 3, 4), end_date=date(2024, 3, 25))
+        with self.assertNumQueries(13):
+            result = auto_assign(only_overlapping=False)
+        self.assertEqual(len(result.batch.processed), 10)
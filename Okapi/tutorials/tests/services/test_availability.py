@@ -0,0 +1,90 @@
+"""Unit tests for normalized availability."""
+from datetime import date
+from django.core.exceptions import ValidationError
+from django.test import SimpleTestCase, TestCase
+from tutorials.availability import (
+    availability_slots, parse_minute, students_available_for, tutors_available_for, validate_availability
+)
+from tutorials.models import AvailabilitySlot, Course, RequestSession, Student, Tutor, User
+
+class AvailabilityParsingTestCase(SimpleTestCase):
+    """Unit tests for reading availability dicts."""
+
+    def test_parse_minute(self):
+        self.assertEqual(parse_minute('09:30'), 570)
+        self.assertEqual(parse_minute('1:00'), 60)
+        self.assertIsNone(parse_minute('24:00'))
+        self.assertIsNone(parse_minute('9:75'))
+        self.assertIsNone(parse_minute('noon'))
+
+    def test_slots_from_single_times_and_lists(self):
+        self.assertEqual(
+            availability_slots({'monday': '09:00', 'Friday': ['1:00', '23:30']}),
+            {(0, 540, 600), (4, 60, 120), (4, 1410, 1440)}
+        )
+
+    def test_valid_availability(self):
+        validate_availability({'monday': '09:00', 'tuesday': ['1:00', '2:00']})
+
+    def test_invalid_availability(self):
+        for value in [['monday'], {'someday': '09:00'}, {'monday': 9}, {'monday': ['09:00', 'late']}]:
+            with self.assertRaises(ValidationError):
+                validate_availability(value)
+
+class AvailabilitySlotTestCase(TestCase):
+    """Tests for mirroring availability into slots and querying them."""
+
+    fixtures = [
+        'tutorials/tests/fixtures/default_user.json',
+        'tutorials/tests/fixtures/other_users.json'
+    ]
+
+    def setUp(self):
+        self.student_user = User.objects.get(username='@johndoe')
+        self.tutor_user = User.objects.get(username='@janedoe')
+        self.tutor_user.role = 'Tutor'
+        self.tutor_user.save()
+        self.course = Course.objects.create(name='Python', desc='Basics', price=10)
+        self.course.users.add(self.tutor_user)
+        self.tutor = Tutor.objects.create(
+            user=self.tutor_user, years_exp=3, rate=1.5, availability={'monday': ['9:00', '10:00']}
+        )
+        self.student = Student.objects.create(user=self.student_user, availability={'monday': ['9:30']})
+
+    def test_profile_slots_follow_availability(self):
+        self.assertEqual(self.tutor_user.availability_slots.count(), 2)
+        self.tutor.availability = {'friday': ['9:00']}
+        self.tutor.save()
+        self.assertEqual(list(self.tutor_user.availability_slots.values_list('weekday', flat=True)), [4])
+
+    def test_deleting_profile_drops_slots(self):
+        self.tutor.delete()
+        self.assertFalse(AvailabilitySlot.objects.filter(user=self.tutor_user).exists())
+
+    def test_request_session_slots(self):
+        request_session = RequestSession.objects.create(
+            student=self.student_user,
+            course=self.course,
+            availability={'monday': '09:00'},
+            start_date=date(2024, 1, 1),
+            end_date=date(2024, 1, 31)
+        )
+        self.assertEqual(
+            list(request_session.availability_slots.values_list('weekday', 'start_minute', 'end_minute')),
+            [(0, 540, 600)]
+        )
+
+    def test_unchanged_availability_is_not_rewritten(self):
+        slot_ids = set(AvailabilitySlot.objects.values_list('id', flat=True))
+        self.tutor.availability = {'monday': ['10:00', '9:00']}
+        self.tutor.save()
+        self.assertEqual(set(AvailabilitySlot.objects.values_list('id', flat=True)), slot_ids)
+
+    def test_overlapping_tutors(self):
+        self.assertEqual(list(tutors_available_for({'monday': '10:30'}, self.course)), [self.tutor_user])
+        self.assertEqual(list(tutors_available_for({'monday': '11:00'})), [])
+        self.assertEqual(list(tutors_available_for({})), [])
+
+    def test_overlapping_students(self):
+        self.assertEqual(list(students_available_for({'monday': '09:00'})), [self.student_user])
+        self.assertEqual(list(students_available_for({'tuesday': '09:00'})), [])
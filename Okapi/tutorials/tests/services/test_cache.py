@@ -0,0 +1,85 @@
+"""Unit tests for the cache helpers."""
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from tutorials.cache import (
+    cache_stats, clear_indexes, get_or_compute, invalidate, make_key, memoize, namespace_version, reset_cache_stats,
+    versioned_index
+)
+
+class CacheHelpersTestCase(SimpleTestCase):
+    """Unit tests for the cache helpers."""
+
+    def setUp(self):
+        cache.clear()
+        clear_indexes()
+        reset_cache_stats()
+        self.calls = 0
+
+    def _compute(self):
+        self.calls += 1
+        return self.calls
+
+    def test_keys_are_versioned(self):
+        version = namespace_version('things')
+        self.assertEqual(make_key('things', 1, 'a'), f'tutorials:things:v{version}:1:a')
+        invalidate('things')
+        self.assertEqual(make_key('things', 1, 'a'), f'tutorials:things:v{version + 1}:1:a')
+
+    def test_evicted_version_does_not_reuse_old_keys(self):
+        old_key = make_key('things', 1)
+        cache.delete('tutorials:things:version')
+        self.assertNotEqual(make_key('things', 1), old_key)
+
+    def test_versioned_index_is_built_once_per_version(self):
+        get_index = versioned_index('things', self._compute)
+        self.assertEqual(get_index(), 1)
+        self.assertEqual(get_index(), 1)
+        invalidate('things')
+        self.assertEqual(get_index(), 2)
+        clear_indexes()
+        self.assertEqual(get_index(), 3)
+        self.assertEqual(self.calls, 3)
+
+    def test_value_is_computed_once(self):
+        self.assertEqual(get_or_compute('things', [1], self._compute), 1)
+        self.assertEqual(get_or_compute('things', [1], self._compute), 1)
+        self.assertEqual(self.calls, 1)
+
+    def test_invalidate_recomputes(self):
+        get_or_compute('things', [1], self._compute)
+        invalidate('things')
+        self.assertEqual(get_or_compute('things', [1], self._compute), 2)
+
+    def test_invalidate_only_affects_its_namespace(self):
+        get_or_compute('things', [1], self._compute)
+        get_or_compute('others', [1], self._compute)
+        invalidate('others')
+        self.assertEqual(get_or_compute('things', [1], self._compute), 1)
+
+    def test_invalidate_after_version_evicted(self):
+        get_or_compute('things', [1], self._compute)
+        cache.clear()
+        invalidate('things')
+        self.assertEqual(get_or_compute('things', [1], self._compute), 2)
+
+    def test_none_is_cached(self):
+        get_or_compute('things', [1], lambda: None)
+        self.assertIsNone(get_or_compute('things', [1], self._compute))
+        self.assertEqual(self.calls, 0)
+
+    def test_memoize_keys_on_arguments(self):
+        @memoize('squares')
+        def square(number):
+            self.calls += 1
+            return number * number
+
+        self.assertEqual(square(3), 9)
+        self.assertEqual(square(3), 9)
+        self.assertEqual(square(4), 16)
+        self.assertEqual(self.calls, 2)
+
+    def test_hits_and_misses_are_counted(self):
+        get_or_compute('things', [1], self._compute)
+        get_or_compute('things', [1], self._compute)
+        get_or_compute('things', [2], self._compute)
+        self.assertEqual(cache_stats(), {'things': {'hits': 1, 'misses': 2}})
@@ -0,0 +1,32 @@
+"""Unit tests for the memoized shared queries."""
+from django.test import TestCase
+from tutorials.cached_queries import course_catalogue
+from tutorials.models import Course
+from tutorials.tests.helpers import CacheResetMixin
+
+class CachedQueriesTestCase(CacheResetMixin, TestCase):
+    """Unit tests for the memoized shared queries."""
+
+    def setUp(self):
+        super().setUp()
+        self.course = Course.objects.create(name='Python', desc='Basics', price=10)
+
+    def test_course_catalogue_is_cached(self):
+        self.assertEqual(course_catalogue(), [self.course])
+        with self.assertNumQueries(0):
+            self.assertEqual(course_catalogue(), [self.course])
+
+    def test_course_catalogue_invalidated_on_change(self):
+        course_catalogue()
+        with self.captureOnCommitCallbacks(execute=True):
+            other = Course.objects.create(name='Java', desc='Basics', price=10)
+        self.assertEqual(course_catalogue(), [self.course, other])
+        with self.captureOnCommitCallbacks(execute=True):
+            other.delete()
+        self.assertEqual(course_catalogue(), [self.course])
+
+    def test_course_catalogue_kept_until_commit(self):
+        course_catalogue()
+        with self.captureOnCommitCallbacks():
+            Course.objects.create(name='Java', desc='Basics', price=10)
+            self.assertEqual(course_catalogue(), [self.course])
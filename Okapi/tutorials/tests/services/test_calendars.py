@@ -0,0 +1,129 @@
+"""Unit tests for the iCalendar feeds of sessions."""
+from datetime import date
+from decimal import Decimal
+from django.test import SimpleTestCase, TestCase
+from tutorials.calendars import (
+    LINE_OCTETS, cached_feed, escape_text, feed_token, feed_user, feed_version, fold, render_feed
+)
+from tutorials.models import Course, RequestSession, User
+from tutorials.tests.helpers import CacheResetMixin
+
+class CalendarTextTestCase(SimpleTestCase):
+    """Tests for writing iCalendar content lines."""
+
+    def test_escape_text(self):
+        self.assertEqual(escape_text('a,b;c\\d\ne'), r'a\,b\;c\\d\ne')
+
+    def test_short_lines_are_not_folded(self):
+        self.assertEqual(fold('SUMMARY:Python'), 'SUMMARY:Python')
+
+    def test_long_lines_are_folded(self):
+        line = 'DESCRIPTION:' + 'é' * 100
+        folded = fold(line)
+        parts = folded.split('\r\n')
+        self.assertTrue(all(len(part.encode()) <= LINE_OCTETS for part in parts))
+        self.assertTrue(all(part.startswith(' ') for part in parts[1:]))
+        self.assertEqual(folded.replace('\r\n ', ''), line)
+
+class CalendarFeedTestCase(CacheResetMixin, TestCase):
+    """Tests for the content and version of a user's feed."""
+
+    def setUp(self):
+        super().setUp()
+        self.course = Course.objects.create(name='Python, Basics', desc='Basics', price=Decimal('20.00'))
+        self.student = User.objects.create_user(
+            username='@student', password='student123', email='student@test.com', role='Student',
+            first_name='Sam', last_name='Student',
+        )
+        self.tutor = User.objects.create_user(
+            username='@tutor', password='tutor123', email='tutor@test.com', role='Tutor',
+            first_name='Tia', last_name='Tutor',
+        )
+        self.request = RequestSession.objects.create(
+            student=self.student, tutor=self.tutor, course=self.course,
+            availability={'monday': '09:00', 'thursday': '14:00'},
+            start_date=date(2024, 1, 1), end_date=date(2024, 1, 28),
+            fortnightly=True, status='accepted',
+        )
+
+    def test_events_expand_the_schedule(self):
+        feed = render_feed(self.student, feed_version(self.student)[0])
+
+        self.assertTrue(feed.startswith('BEGIN:VCALENDAR\r\nVERSION:2.0\r\n'))
+        self.assertTrue(feed.endswith('END:VCALENDAR\r\n'))
+        # Every other week from 1 January: Mondays 1 and 15, Thursdays 4 and 18
+        self.assertEqual(feed.count('BEGIN:VEVENT'), 4)
+        self.assertIn('DTSTART:20240101T090000Z\r\nDTEND:20240101T100000Z', feed)
+        self.assertIn('DTSTART:20240118T140000Z', feed)
+        self.assertIn(f'UID:{self.request.id}-20240115T090000Z@okapi', feed)
+        self.assertIn('SUMMARY:Python\\, Basics', feed)
+        self.assertIn('DESCRIPTION:Tutor: Tia Tutor', feed)
+
+    def test_tutor_sees_student(self):
+        feed = render_feed(self.tutor, feed_version(self.tutor)[0])
+        self.assertIn('DESCRIPTION:Student: Sam Student', feed)
+
+    def test_other_sessions_are_left_out(self):
+        RequestSession.objects.create(
+            student=self.student, course=self.course, availability={'friday': '10:00'},
+            start_date=date(2024, 1, 1), end_date=date(2024, 1, 28),
+        )
+        feed = render_feed(self.student, feed_version(self.student)[0])
+        self.assertEqual(feed.count('BEGIN:VEVENT'), 4)
+
+    def test_version_changes_with_sessions(self):
+        updated, etag = feed_version(self.student)
+        self.assertEqual(updated, self.request.updated_at)
+
+        self.request.status = 'rejected'
+        self.request.save()
+        self.assertNotEqual(feed_version(self.student)[1], etag)
+
+    def test_version_changes_when_a_course_is_renamed(self):
+        etag = feed_version(self.student)[1]
+        self.course.name = 'Python Fundamentals'
+        self.course.save()
+        self.assertNotEqual(feed_version(self.student)[1], etag)
+
+    def test_version_changes_when_a_user_is_renamed(self):
+        etag = feed_version(self.student)[1]
+        self.tutor.last_name = 'Teacher'
+        self.tutor.save()
+        self.assertNotEqual(feed_version(self.student)[1], etag)
+
+        etag = feed_version(self.student)[1]
+        self.student.first_name = 'Samantha'
+        self.student.save()
+        self.assertNotEqual(feed_version(self.student)[1], etag)
+
+    def test_version_changes_when_a_session_is_deleted(self):
+        other = RequestSession.objects.create(
+            student=self.student, tutor=self.tutor, course=self.course, availability={'friday': '10:00'},
+            start_date=date(2024, 1, 1), end_date=date(2024, 1, 28), status='accepted',
+        )
+        RequestSession.objects.filter(id=other.id).update(updated_at=self.request.updated_at)
+        etag = feed_version(self.student)[1]
+        other.delete()
+        self.assertNotEqual(feed_version(self.student)[1], etag)
+
+    def test_feed_without_sessions(self):
+        user = User.objects.create_user(
+            username='@new', password='student123', email='new@test.com', role='Student'
+        )
+        updated, etag = feed_version(user)
+        self.assertIsNone(updated)
+        self.assertNotIn('BEGIN:VEVENT', render_feed(user, updated))
+
+    def test_feed_is_cached_per_version(self):
+        updated, etag = feed_version(self.student)
+        feed = cached_feed(self.student, updated, etag)
+        with self.assertNumQueries(0):
+            self.assertEqual(cached_feed(self.student, updated, etag), feed)
+
+    def test_tokens(self):
+        self.assertEqual(feed_user(feed_token(self.student)), self.student)
+        self.assertIsNone(feed_user(feed_token(self.student) + 'x'))
+        admin = User.objects.create_user(
+            username='@admin', password='admin123', email='admin@test.com', role='Admin'
+        )
+        self.assertIsNone(feed_user(feed_token(admin)))
@@ -0,0 +1,130 @@
+"""Unit tests for the tutor booking index."""
+from datetime import date
+from decimal import Decimal
+from timeit import timeit
+from django.test import SimpleTestCase, TestCase
+from tutorials.conflicts import (
+    Booking, TutorBookingIndex, TutorUnavailable, free_tutors, get_booking_index, tutor_conflicts
+)
+from tutorials.enrolment import accept_request, process_requests
+from tutorials.models import Course, Invoices, RequestSession, Tutor, User
+from tutorials.tests.helpers import CacheResetMixin, RequestFactoryMixin
+
+class BookingOverlapTestCase(SimpleTestCase):
+    """Unit tests for comparing two bookings on the same weekday."""
+
+    def booking(self, start_minute=540, start_date=date(2024, 1, 1), end_date=date(2024, 3, 31), fortnightly=False):
+        # Mondays, as 1 January 2024 is a Monday
+        return Booking(1, 0, start_minute, start_minute + 60, start_date, end_date, fortnightly)
+
+    def test_same_time_and_dates(self):
+        self.assertTrue(self.booking().overlaps(self.booking()))
+
+    def test_adjacent_times(self):
+        self.assertFalse(self.booking(540).overlaps(self.booking(600)))
+        self.assertTrue(self.booking(540).overlaps(self.booking(570)))
+
+    def test_date_ranges_apart(self):
+        earlier = self.booking(end_date=date(2024, 1, 31))
+        later = self.booking(start_date=date(2024, 2, 1))
+        self.assertFalse(earlier.overlaps(later))
+
+    def test_overlapping_range_without_the_weekday(self):
+        # The ranges share 2 to 4 January, which has no Monday
+        earlier = self.booking(end_date=date(2024, 1, 4))
+        later = self.booking(start_date=date(2024, 1, 2))
+        self.assertFalse(earlier.overlaps(later))
+
+    def test_fortnightly_in_alternate_weeks(self):
+        first_weeks = self.booking(fortnightly=True)
+        second_weeks = self.booking(start_date=date(2024, 1, 8), fortnightly=True)
+        self.assertFalse(first_weeks.overlaps(second_weeks))
+        self.assertTrue(first_weeks.overlaps(self.booking(start_date=date(2024, 1, 15), fortnightly=True)))
+
+    def test_fortnightly_and_weekly(self):
+        # The fortnightly booking runs on 1 and 15 January, the weekly one only on 8 January
+        fortnightly = self.booking(end_date=date(2024, 1, 20), fortnightly=True)
+        self.assertFalse(fortnightly.overlaps(self.booking(start_date=date(2024, 1, 8), end_date=date(2024, 1, 14))))
+        self.assertTrue(fortnightly.overlaps(self.booking(start_date=date(2024, 1, 8))))
+
+    def test_checking_is_fast(self):
+        index = TutorBookingIndex()
+        for request_id in range(200):
+            index.add(1, RequestSession(
+                id=request_id, availability={'monday': f'{request_id % 24}:00', 'friday': '9:00'},
+                start_date=date(2024, 1, 1), end_date=date(2024, 6, 30), fortnightly=request_id % 2 == 0
+            ))
+        wanted = RequestSession(id=1000, availability={'tuesday': '10:00', 'wednesday': '11:00'},
+                                start_date=date(2024, 2, 1), end_date=date(2024, 3, 1))
+        seconds = timeit(lambda: index.is_free(1, wanted), number=1000) / 1000
+        self.assertLess(seconds, 0.001)
+
+class TutorBookingIndexDatabaseTestCase(CacheResetMixin, RequestFactoryMixin, TestCase):
+    """Tests for checking and enforcing tutor bookings from the database."""
+
+    def setUp(self):
+        super().setUp()
+        self.course = Course.objects.create(name='Python', desc='Basics', price=Decimal('20.00'))
+        self.student = User.objects.create_user(
+            username='@student', password='student123', email='student@test.com', role='Student'
+        )
+        self.tutor = User.objects.create_user(
+            username='@tutor', password='tutor123', email='tutor@test.com', role='Tutor'
+        )
+        self.other_tutor = User.objects.create_user(
+            username='@other', password='tutor123', email='other@test.com', role='Tutor'
+        )
+        for user in (self.tutor, self.other_tutor):
+            Tutor.objects.create(user=user, years_exp=3, rate=1.5, availability={'monday': ['9:00']})
+            self.course.users.add(user)
+        self.booked = self.create_request(tutor=self.tutor, status='accepted')
+
+    def test_conflicts(self):
+        clash = self.create_request()
+        self.assertEqual(tutor_conflicts(self.tutor.id, clash), [self.booked.id])
+        self.assertEqual(tutor_conflicts(self.other_tutor.id, clash), [])
+        self.assertEqual(free_tutors([self.tutor.id, self.other_tutor.id], clash), [self.other_tutor.id])
+
+    def test_request_does_not_conflict_with_itself(self):
+        self.assertEqual(tutor_conflicts(self.tutor.id, self.booked), [])
+
+    def test_index_reused_without_queries(self):
+        get_booking_index()
+        with self.assertNumQueries(0):
+            tutor_conflicts(self.tutor.id, self.booked)
+
+    def test_accepting_rebuilds_index(self):
+        later = self.create_request(start_date=date(2024, 2, 1), end_date=date(2024, 2, 29))
+        self.assertEqual(tutor_conflicts(self.other_tutor.id, later), [])
+        accepted = self.create_request(start_date=date(2024, 2, 5), end_date=date(2024, 2, 29))
+        # The index is invalidated once the accept commits
+        with self.captureOnCommitCallbacks(execute=True):
+            accept_request(accepted.id, self.other_tutor.id)
+        self.assertNotEqual(tutor_conflicts(self.other_tutor.id, later), [])
+
+    def test_accept_rejects_busy_tutor(self):
+        clash = self.create_request()
+        with self.assertRaises(TutorUnavailable) as raised:
+            accept_request(clash.id, self.tutor.id)
+
+        self.assertEqual(raised.exception.conflicting_ids, [self.booked.id])
+        clash.refresh_from_db()
+        self.assertEqual(clash.status, 'pending')
+        self.assertFalse(Invoices.objects.filter(request_session=clash).exists())
+
+    def test_batch_picks_free_tutors(self):
+        first = self.create_request()
+        second = self.create_request()
+        third = self.create_request()
+        result = process_requests([first.id, second.id, third.id], 'accept')
+
+        # The booked tutor is busy, so the other tutor takes the first request and is then busy too
+        self.assertEqual(result.processed, [first])
+        self.assertEqual(result.skipped, [second, third])
+        first.refresh_from_db()
+        self.assertEqual(first.tutor, self.other_tutor)
+
+    def test_batch_skips_busy_chosen_tutor(self):
+        clash = self.create_request()
+        result = process_requests([clash.id], 'accept', tutors={clash.id: self.tutor.id})
+        self.assertEqual(result.skipped, [clash])
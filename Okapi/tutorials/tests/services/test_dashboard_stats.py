@@ -0,0 +1,80 @@
+"""Unit tests for the admin dashboard counters."""
+from datetime import date
+from django.test import TestCase
+from tutorials.dashboard_stats import compute_dashboard_stats, get_dashboard_stats
+from tutorials.models import Course, Invoices, User
+from tutorials.tests.helpers import CacheResetMixin, RequestFactoryMixin
+
+class DashboardStatsTestCase(CacheResetMixin, RequestFactoryMixin, TestCase):
+    """Unit tests for the admin dashboard counters."""
+
+    fixtures = [
+        'tutorials/tests/fixtures/default_user.json',
+        'tutorials/tests/fixtures/other_users.json'
+    ]
+
+    def setUp(self):
+        super().setUp()
+        self.student = User.objects.get(username='@johndoe')
+        self.course = Course.objects.create(name='Python', desc='Basics', price=10)
+
+    def test_counts(self):
+        self.create_request()
+        self.create_request(status='accepted')
+        Invoices.objects.create(student=self.student, course=self.course, due_date=date(2024, 1, 4))
+        Invoices.objects.create(student=self.student, course=self.course, due_date=date(2024, 1, 4), status=True)
+        stats = compute_dashboard_stats()
+        self.assertEqual(stats, {
+            'students_count': User.objects.filter(role='Student').count(),
+            'tutors_count': User.objects.filter(role='Tutor').count(),
+            'admin_count': User.objects.filter(role='Admin').count(),
+            'request_count': 1,
+            'courses_count': 1,
+            'unpaid_invoices_count': 1,
+        })
+
+    def test_counts_empty_tables(self):
+        Course.objects.all().delete()
+        stats = compute_dashboard_stats()
+        self.assertEqual(stats['request_count'], 0)
+        self.assertEqual(stats['courses_count'], 0)
+        self.assertEqual(stats['unpaid_invoices_count'], 0)
+
+    def test_counts_use_two_queries(self):
+        with self.assertNumQueries(2):
+            compute_dashboard_stats()
+
+    def test_cached_counts_use_no_queries(self):
+        get_dashboard_stats()
+        with self.assertNumQueries(0):
+            get_dashboard_stats()
+
+    def test_saving_a_counted_row_invalidates_cache(self):
+        self.assertEqual(get_dashboard_stats()['request_count'], 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            request_session = self.create_request()
+        self.assertEqual(get_dashboard_stats()['request_count'], 1)
+        request_session.status = 'accepted'
+        with self.captureOnCommitCallbacks(execute=True):
+            request_session.save()
+        self.assertEqual(get_dashboard_stats()['request_count'], 0)
+
+    def test_cache_kept_until_commit(self):
+        get_dashboard_stats()
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.create_request()
+            self.assertEqual(get_dashboard_stats()['request_count'], 0)
+        self.assertTrue(callbacks)
+
+    def test_deleting_a_counted_row_invalidates_cache(self):
+        self.assertEqual(get_dashboard_stats()['courses_count'], 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.course.delete()
+        self.assertEqual(get_dashboard_stats()['courses_count'], 0)
+
+    def test_last_login_update_keeps_cache(self):
+        get_dashboard_stats()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.student.save(update_fields=['last_login'])
+        with self.assertNumQueries(0):
+            get_dashboard_stats()
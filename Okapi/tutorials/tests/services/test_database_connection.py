@@ -0,0 +1,27 @@
+"""Tests for the per-connection database configuration."""
+from django.conf import settings
+from django.db import connection
+from django.test import TestCase
+from unittest import skipUnless
+
+@skipUnless(connection.vendor == 'sqlite', 'SQLite specific')
+class SQLiteConnectionTestCase(TestCase):
+    """Tests that new SQLite connections are tuned for concurrent access."""
+
+    def _pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_synchronous_is_normal(self):
+        self.assertEqual(self._pragma('synchronous'), 1)
+
+    def test_busy_timeout_is_set(self):
+        self.assertEqual(self._pragma('busy_timeout'), settings.SQLITE_PRAGMAS['busy_timeout'])
+
+    def test_transactions_take_write_lock_immediately(self):
+        self.assertEqual(connection.settings_dict['OPTIONS']['transaction_mode'], 'IMMEDIATE')
+
+    def test_connections_are_persistent(self):
+        self.assertEqual(connection.settings_dict['CONN_MAX_AGE'], settings.DB_CONN_MAX_AGE)
+        self.assertTrue(connection.settings_dict['CONN_HEALTH_CHECKS'])
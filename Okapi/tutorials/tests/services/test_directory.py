@@ -0,0 +1,36 @@
+"""Unit tests for the user directory queries."""
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from tutorials.directory import directory_users, prefix_upper_bound
+
+class PrefixUpperBoundTestCase(SimpleTestCase):
+    """Unit tests for prefix_upper_bound."""
+
+    def test_upper_bound(self):
+        self.assertEqual(prefix_upper_bound('doe'), 'dof')
+        self.assertEqual(prefix_upper_bound('@'), 'A')
+        self.assertLess('doezzz', prefix_upper_bound('doe'))
+
+class DirectoryUsersTestCase(TestCase):
+    """Unit tests for directory_users."""
+
+    fixtures = [
+        'tutorials/tests/fixtures/default_user.json',
+        'tutorials/tests/fixtures/other_users.json'
+    ]
+
+    def test_search_uses_range_not_like(self):
+        with CaptureQueriesContext(connection) as queries:
+            list(directory_users('doe'))
+        self.assertNotIn(' LIKE ', queries.captured_queries[0]['sql'])
+
+    def test_search_is_case_insensitive(self):
+        self.assertEqual(
+            {user.username for user in directory_users('DOE')},
+            {user.username for user in directory_users('doe')}
+        )
+        self.assertIn('@johndoe', {user.username for user in directory_users('john')})
+
+    def test_unknown_role_is_ignored(self):
+        self.assertEqual(directory_users(role='Wizard').count(), directory_users().count())
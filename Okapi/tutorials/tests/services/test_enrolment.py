@@ -0,0 +1,218 @@
+"""Unit tests for accepting and rejecting request sessions."""
+from datetime import date
+from decimal import Decimal
+from threading import Barrier, Thread
+from unittest import SkipTest
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from tutorials.conflicts import free_tutors
+from tutorials.enrolment import accept_request, build_invoice, process_requests
+from tutorials.models import Course, Invoices, RequestSession, Tutor, User
+from tutorials.tests.helpers import CacheResetMixin, RequestFactoryMixin
+
+class ProcessRequestsTestCase(CacheResetMixin, RequestFactoryMixin, TestCase):
+    """Tests for processing batches of pending requests."""
+
+    # Four Mondays in January 2024
+    request_defaults = {'end_date': date(2024, 1, 28)}
+
+    def setUp(self):
+        super().setUp()
+        self.course = Course.objects.create(name='Python', desc='Basics', price=Decimal('20.00'))
+        self.student = User.objects.create_user(
+            username='@student', password='student123', email='student@test.com', role='Student'
+        )
+        self.tutor = User.objects.create_user(
+            username='@tutor', password='tutor123', email='tutor@test.com', role='Tutor'
+        )
+        self.other_tutor = User.objects.create_user(
+            username='@other', password='tutor123', email='other@test.com', role='Tutor'
+        )
+        Tutor.objects.create(user=self.tutor, years_exp=3, rate=1.5, availability={'monday': ['9:00']})
+        self.course.users.add(self.tutor)
+        self.hours = iter(range(24))
+
+    def create_request(self, **fields):
+        # A different hour for each request, so one tutor can teach them all
+        fields.setdefault('availability', {'monday': f'{next(self.hours)}:00'})
+        return super().create_request(**fields)
+
+    def test_build_invoice(self):
+        invoice = build_invoice(self.create_request(), self.tutor.id)
+        self.assertEqual(invoice.total, Decimal('80.00'))
+        self.assertEqual(invoice.due_date, date(2024, 1, 4))
+        self.assertEqual(invoice.tutor_id, self.tutor.id)
+        self.assertIsNone(invoice.pk)
+
+    def test_accept_assigns_best_tutor_and_invoices(self):
+        requests = [self.create_request() for _ in range(3)]
+        result = process_requests([r.id for r in requests], 'accept')
+
+        self.assertEqual(len(result.processed), 3)
+        self.assertEqual(len(result.invoices), 3)
+        self.assertEqual(
+            set(RequestSession.objects.values_list('status', 'tutor_id')), {('accepted', self.tutor.id)}
+        )
+        self.assertEqual(Invoices.objects.filter(tutor=self.tutor, total=Decimal('80.00')).count(), 3)
+
+    def test_accept_with_chosen_tutor(self):
+        request = self.create_request()
+        process_requests([request.id], 'accept', tutors={request.id: self.other_tutor.id})
+        request.refresh_from_db()
+        self.assertEqual(request.tutor_id, self.other_tutor.id)
+
+    def test_accept_skips_requests_without_tutor(self):
+        request = self.create_request(course=Course.objects.create(name='Go', desc='Basics', price=10))
+        chosen_student = self.create_request()
+        result = process_requests(
+            [request.id, chosen_student.id], 'accept', tutors={chosen_student.id: self.student.id}
+        )
+
+        self.assertEqual(result.processed, [])
+        self.assertEqual(result.skipped, [request, chosen_student])
+        self.assertFalse(Invoices.objects.exists())
+        self.assertFalse(RequestSession.objects.exclude(status='pending').exists())
+
+    def test_accepted_batch_books_tutors(self):
+        first = self.create_request(availability={'monday': '9:00'})
+        second = self.create_request(availability={'monday': '9:00'})
+        self.assertEqual(free_tutors([self.tutor.id], second), [self.tutor.id])
+        with self.captureOnCommitCallbacks(execute=True):
+            process_requests([first.id], 'accept')
+        self.assertEqual(free_tutors([self.tutor.id], second), [])
+
+    def test_reject_does_not_invoice(self):
+        requests = [self.create_request() for _ in range(2)]
+        result = process_requests([r.id for r in requests], 'reject')
+
+        self.assertEqual(len(result.processed), 2)
+        self.assertEqual(set(RequestSession.objects.values_list('status', flat=True)), {'rejected'})
+        self.assertFalse(Invoices.objects.exists())
+
+    def test_previously_invoiced_request_is_not_invoiced_again(self):
+        request = self.create_request()
+        accept_request(request.id, self.tutor.id)
+        RequestSession.objects.filter(id=request.id).update(status='pending')
+        result = process_requests([request.id], 'accept')
+
+        self.assertEqual(result.processed, [request])
+        self.assertEqual(result.invoices, [])
+        self.assertEqual(Invoices.objects.count(), 1)
+
+    def test_only_pending_requests_are_processed(self):
+        rejected = self.create_request(status='rejected')
+        result = process_requests([rejected.id], 'accept')
+
+        self.assertEqual(result.processed, [])
+        rejected.refresh_from_db()
+        self.assertEqual(rejected.status, 'rejected')
+        self.assertFalse(Invoices.objects.exists())
+
+    def test_query_count_does_not_grow_with_batch(self):
+        process_requests([self.create_request().id], 'accept')
+        small = [self.create_request().id for _ in range(2)]
+        large = [self.create_request().id for _ in range(20)]
+        with self.assertNumQueries(9):
+            process_requests(small, 'accept')
+        with self.assertNumQueries(9):
+            result = process_requests(large, 'accept')
+        self.assertEqual(len(result.invoices), 20)
+        self.assertGreater(result.per_second, 0)
+
+class AcceptRequestTestCase(TestCase):
+    """Tests for accepting a single request."""
+
+    def setUp(self):
+        self.course = Course.objects.create(name='Python', desc='Basics', price=Decimal('20.00'))
+        self.student = User.objects.create_user(
+            username='@student', password='student123', email='student@test.com', role='Student'
+        )
+        self.tutor = User.objects.create_user(
+            username='@tutor', password='tutor123', email='tutor@test.com', role='Tutor'
+        )
+        self.request = RequestSession.objects.create(
+            student=self.student, course=self.course, availability={'monday': '09:00'},
+            start_date=date(2024, 1, 1), end_date=date(2024, 1, 28)
+        )
+
+    def test_accept_links_invoice(self):
+        request, invoice, created = accept_request(self.request.id, self.tutor.id)
+
+        self.assertTrue(created)
+        self.assertEqual(request.status, 'accepted')
+        self.assertEqual(invoice.request_session, request)
+        self.assertEqual(invoice.total, Decimal('80.00'))
+        self.request.refresh_from_db()
+        self.assertEqual(self.request.tutor, self.tutor)
+        self.assertEqual(self.request.invoice, invoice)
+
+    def test_accept_is_idempotent(self):
+        _, first, _ = accept_request(self.request.id, self.tutor.id)
+        _, second, created = accept_request(self.request.id, self.tutor.id)
+
+        self.assertFalse(created)
+        self.assertEqual(first, second)
+        self.assertEqual(Invoices.objects.count(), 1)
+
+    def test_reaccept_after_reject_keeps_invoice(self):
+        other_tutor = User.objects.create_user(
+            username='@other', password='tutor123', email='other@test.com', role='Tutor'
+        )
+        _, first, _ = accept_request(self.request.id, self.tutor.id)
+        RequestSession.objects.filter(id=self.request.id).update(status='rejected')
+        request, invoice, created = accept_request(self.request.id, other_tutor.id)
+
+        self.assertFalse(created)
+        self.assertEqual(invoice, first)
+        self.request.refresh_from_db()
+        self.assertEqual((self.request.status, self.request.tutor), ('accepted', other_tutor))
+
+class ConcurrentAcceptTestCase(TransactionTestCase):
+    """Admins accepting the same request at once create one invoice between them."""
+
+    THREADS = 6
+
+    @classmethod
+    def setUpClass(cls):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            # Writers to a shared-cache in-memory database fail at once instead of waiting for the lock
+            raise SkipTest('Needs a file-backed or server test database, e.g. DB_TEST_NAME=test_db.sqlite3')
+        super().setUpClass()
+
+    def setUp(self):
+        course = Course.objects.create(name='Python', desc='Basics', price=Decimal('20.00'))
+        student = User.objects.create_user(
+            username='@student', password='student123', email='student@test.com', role='Student'
+        )
+        self.tutor = User.objects.create_user(
+            username='@tutor', password='tutor123', email='tutor@test.com', role='Tutor'
+        )
+        self.request = RequestSession.objects.create(
+            student=student, course=course, availability={'monday': '09:00'},
+            start_date=date(2024, 1, 1), end_date=date(2024, 1, 28)
+        )
+
+    def test_concurrent_accepts(self):
+        barrier = Barrier(self.THREADS)
+        results = []
+        errors = []
+
+        def accept():
+            try:
+                barrier.wait()
+                results.append(accept_request(self.request.id, self.tutor.id))
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connection.close()
+
+        threads = [Thread(target=accept) for _ in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(Invoices.objects.count(), 1)
+        self.assertEqual([created for _, _, created in results].count(True), 1)
+        self.assertEqual({invoice.id for _, invoice, _ in results}, {Invoices.objects.get().id})
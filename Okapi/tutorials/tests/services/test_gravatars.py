@@ -0,0 +1,27 @@
+"""Unit tests for the memoized gravatar URLs."""
+from django.test import SimpleTestCase
+from libgravatar import Gravatar
+from tutorials.gravatars import clear_gravatar_caches, email_hash, gravatar_url
+
+class GravatarsTestCase(SimpleTestCase):
+    """Unit tests for the memoized gravatar URLs."""
+
+    def setUp(self):
+        clear_gravatar_caches()
+
+    def test_matches_libgravatar(self):
+        for size in [60, 80, 120]:
+            self.assertEqual(
+                gravatar_url(email_hash(' John.Doe@Example.org '), size),
+                Gravatar('john.doe@example.org').get_image(size=size, default='mp')
+            )
+
+    def test_urls_are_memoized(self):
+        gravatar_url(email_hash('john.doe@example.org'), 120)
+        gravatar_url(email_hash('john.doe@example.org'), 120)
+        self.assertEqual(email_hash.cache_info().hits, 1)
+        self.assertEqual(gravatar_url.cache_info().hits, 1)
+
+    def test_caches_are_bounded(self):
+        self.assertIsNotNone(email_hash.cache_info().maxsize)
+        self.assertIsNotNone(gravatar_url.cache_info().maxsize)
@@ -0,0 +1,92 @@
+"""Unit tests for the tutor match index."""
+from timeit import timeit
+from django.test import SimpleTestCase, TestCase
+from tutorials.matching import TutorMatchIndex, availability_mask, get_match_index, rank_tutors
+from tutorials.models import Course, Tutor, User
+from tutorials.tests.helpers import CacheResetMixin
+
+class AvailabilityMaskTestCase(SimpleTestCase):
+    """Unit tests for availability bitmasks."""
+
+    def test_single_time(self):
+        self.assertEqual(availability_mask({'monday': '09:00'}), 1 << 9)
+
+    def test_list_of_times(self):
+        self.assertEqual(availability_mask({'tuesday': ['1:00', '2:00']}), (1 << 25) | (1 << 26))
+
+    def test_slot_off_the_hour_marks_both_hours(self):
+        self.assertEqual(availability_mask({'tuesday': '1:30'}), (1 << 25) | (1 << 26))
+
+    def test_slot_clipped_at_midnight(self):
+        self.assertEqual(availability_mask({'monday': '23:30'}), 1 << 23)
+
+    def test_ignores_unknown_days_and_times(self):
+        self.assertEqual(availability_mask({'someday': '09:00', 'monday': 'noon', 'friday': '24:00'}), 0)
+        self.assertEqual(availability_mask(None), 0)
+
+class TutorMatchIndexTestCase(SimpleTestCase):
+    """Unit tests for ranking tutors in memory."""
+
+    def setUp(self):
+        self.index = TutorMatchIndex(
+            {1: [10, 11, 12, 13]},
+            {
+                10: availability_mask({'monday': '09:00'}),
+                11: availability_mask({'monday': ['09:00', '10:00'], 'friday': '09:00'}),
+                12: availability_mask({'sunday': '09:00'}),
+            }
+        )
+        self.wanted = {'monday': ['09:00', '10:00']}
+
+    def test_ranks_by_overlap(self):
+        self.assertEqual(self.index.rank(1, self.wanted), [(11, 2), (10, 1), (12, 0), (13, 0)])
+
+    def test_only_overlapping(self):
+        self.assertEqual(self.index.rank(1, self.wanted, only_overlapping=True), [(11, 2), (10, 1)])
+
+    def test_unknown_course(self):
+        self.assertEqual(self.index.rank(2, self.wanted), [])
+
+    def test_ranking_is_fast(self):
+        tutors = list(range(1000))
+        index = TutorMatchIndex({1: tutors}, {t: availability_mask({'monday': f'{t % 24}:00'}) for t in tutors})
+        seconds = timeit(lambda: index.rank(1, self.wanted, only_overlapping=True), number=100) / 100
+        self.assertLess(seconds, 0.01)
+
+class TutorMatchIndexDatabaseTestCase(CacheResetMixin, TestCase):
+    """Tests for building and invalidating the index from the database."""
+
+    fixtures = [
+        'tutorials/tests/fixtures/default_user.json',
+        'tutorials/tests/fixtures/other_users.json'
+    ]
+
+    def setUp(self):
+        super().setUp()
+        self.course = Course.objects.create(name='Python', desc='Basics', price=10)
+        self.tutor_user = User.objects.get(username='@janedoe')
+        self.tutor = Tutor.objects.create(
+            user=self.tutor_user, years_exp=3, rate=1.5, availability={'monday': ['9:00']}
+        )
+        self.course.users.add(self.tutor_user)
+
+    def test_rank_from_database(self):
+        self.assertEqual(rank_tutors(self.course.id, {'monday': '09:00'}), [(self.tutor_user.id, 1)])
+
+    def test_index_reused_without_queries(self):
+        get_match_index()
+        with self.assertNumQueries(0):
+            rank_tutors(self.course.id, {'monday': '09:00'})
+
+    def test_availability_change_rebuilds_index(self):
+        rank_tutors(self.course.id, {'monday': '09:00'})
+        self.tutor.availability = {'tuesday': ['9:00']}
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tutor.save()
+        self.assertEqual(rank_tutors(self.course.id, {'monday': '09:00'}), [(self.tutor_user.id, 0)])
+
+    def test_course_membership_change_rebuilds_index(self):
+        rank_tutors(self.course.id, {'monday': '09:00'})
+        with self.captureOnCommitCallbacks(execute=True):
+            self.course.users.remove(self.tutor_user)
+        self.assertEqual(rank_tutors(self.course.id, {'monday': '09:00'}), [])
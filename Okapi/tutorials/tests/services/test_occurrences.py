@@ -0,0 +1,146 @@
+"""Unit tests for the dated occurrences of accepted request sessions."""
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from django.test import SimpleTestCase, TestCase
+from tutorials.enrolment import build_invoice, process_requests
+from tutorials.models import Course, SessionOccurrence, Tutor, User
+from tutorials.occurrences import (
+    next_occurrence, occurrence_dates, occurrence_totals, sync_occurrences, upcoming_request_sessions,
+    user_occurrences
+)
+from tutorials.scheduling import count_weekday_occurrences
+from tutorials.tests.helpers import RequestFactoryMixin
+
+class OccurrenceDatesTestCase(SimpleTestCase):
+    """Tests for expanding a weekday into dates."""
+
+    def test_weekly(self):
+        # 1 January 2024 is a Monday
+        self.assertEqual(
+            list(occurrence_dates(date(2024, 1, 1), date(2024, 1, 20), 2)),
+            [date(2024, 1, 3), date(2024, 1, 10), date(2024, 1, 17)]
+        )
+
+    def test_fortnightly(self):
+        self.assertEqual(
+            list(occurrence_dates(date(2024, 1, 1), date(2024, 1, 31), 0, fortnightly=True)),
+            [date(2024, 1, 1), date(2024, 1, 15), date(2024, 1, 29)]
+        )
+
+    def test_agrees_with_count(self):
+        start = date(2024, 1, 3)
+        for days in range(0, 60, 3):
+            for weekday in range(7):
+                for fortnightly in (False, True):
+                    end = start + timedelta(days=days)
+                    self.assertEqual(
+                        len(list(occurrence_dates(start, end, weekday, fortnightly))),
+                        count_weekday_occurrences(start, end, weekday, fortnightly)
+                    )
+
+class SessionOccurrenceTestCase(RequestFactoryMixin, TestCase):
+    """Tests for keeping occurrences in step with request sessions."""
+
+    def setUp(self):
+        self.course = Course.objects.create(name='Python', desc='Basics', price=Decimal('20.00'))
+        self.student = User.objects.create_user(
+            username='@student', password='student123', email='student@test.com', role='Student'
+        )
+        self.tutor = User.objects.create_user(
+            username='@tutor', password='tutor123', email='tutor@test.com', role='Tutor'
+        )
+        self.request_defaults = {
+            'tutor': self.tutor,
+            'availability': {'monday': '09:00', 'thursday': ['14:30', '16:00']},
+            'end_date': date(2024, 1, 14),
+            'status': 'accepted',
+        }
+
+    def test_accepted_request_is_expanded(self):
+        request = self.create_request()
+        starts = list(request.occurrences.order_by('starts_at').values_list('starts_at', flat=True))
+
+        self.assertEqual(starts, [
+            datetime(2024, 1, 1, 9, 0, tzinfo=dt_timezone.utc),
+            datetime(2024, 1, 4, 14, 30, tzinfo=dt_timezone.utc),
+            datetime(2024, 1, 4, 16, 0, tzinfo=dt_timezone.utc),
+            datetime(2024, 1, 8, 9, 0, tzinfo=dt_timezone.utc),
+            datetime(2024, 1, 11, 14, 30, tzinfo=dt_timezone.utc),
+            datetime(2024, 1, 11, 16, 0, tzinfo=dt_timezone.utc),
+        ])
+        occurrence = request.occurrences.order_by('starts_at').first()
+        self.assertEqual(occurrence.ends_at - occurrence.starts_at, timedelta(hours=1))
+        self.assertEqual((occurrence.tutor, occurrence.student), (self.tutor, self.student))
+
+    def test_fortnightly_request(self):
+        request = self.create_request(availability={'monday': '09:00'}, end_date=date(2024, 1, 31), fortnightly=True)
+        self.assertEqual(request.occurrences.count(), 3)
+
+    def test_pending_request_has_no_occurrences(self):
+        request = self.create_request(status='pending')
+        self.assertFalse(request.occurrences.exists())
+
+    def test_status_and_schedule_changes_rebuild(self):
+        request = self.create_request()
+        request.end_date = date(2024, 1, 7)
+        request.save()
+        self.assertEqual(request.occurrences.count(), 3)
+
+        request.status = 'rejected'
+        request.save(update_fields=['status'])
+        self.assertFalse(request.occurrences.exists())
+
+    def test_unrelated_update_does_not_rebuild(self):
+        request = self.create_request()
+        SessionOccurrence.objects.filter(request_session=request).delete()
+        request.venue = 'room 1'
+        request.save(update_fields=['venue'])
+        self.assertFalse(request.occurrences.exists())
+
+    def test_batch_accept_builds_occurrences(self):
+        Tutor.objects.create(user=self.tutor, years_exp=3, rate=1.5, availability={'monday': ['9:00']})
+        self.course.users.add(self.tutor)
+        requests = [
+            self.create_request(status='pending', tutor=None, availability={'monday': '09:00', 'thursday': ['14:30', '16:00']}),
+            self.create_request(status='pending', tutor=None, availability={'monday': '11:00', 'thursday': ['10:00', '12:00']}),
+        ]
+        process_requests([r.id for r in requests], 'accept')
+        self.assertEqual(SessionOccurrence.objects.filter(tutor=self.tutor).count(), 12)
+
+    def test_user_occurrences_range(self):
+        self.create_request()
+        start = datetime(2024, 1, 4, tzinfo=dt_timezone.utc)
+        week = list(user_occurrences(self.tutor, start, start + timedelta(days=7)))
+
+        self.assertEqual(len(week), 3)
+        self.assertEqual(week[0].starts_at, datetime(2024, 1, 4, 14, 30, tzinfo=dt_timezone.utc))
+        self.assertEqual(list(user_occurrences(self.student, start)), list(user_occurrences(self.tutor, start)))
+        with self.assertNumQueries(1):
+            occurrence = next_occurrence(self.student, start)
+            occurrence.request_session.course.name
+        self.assertIsNone(next_occurrence(self.student, datetime(2025, 1, 1, tzinfo=dt_timezone.utc)))
+
+    def test_upcoming_request_sessions(self):
+        later = self.create_request(start_date=date(2024, 3, 4), end_date=date(2024, 3, 31))
+        sooner = self.create_request()
+        self.create_request(status='pending')
+        start = datetime(2024, 1, 4, tzinfo=dt_timezone.utc)
+        with self.assertNumQueries(1):
+            sessions = list(upcoming_request_sessions(self.student, start))
+            [request_session.course.name for request_session in sessions]
+        self.assertEqual(sessions, [sooner, later])
+        self.assertEqual(list(upcoming_request_sessions(self.tutor, datetime(2024, 2, 1, tzinfo=dt_timezone.utc))), [later])
+
+    def test_occurrence_totals_match_invoices(self):
+        weekly = self.create_request()
+        fortnightly = self.create_request(end_date=date(2024, 2, 29), fortnightly=True)
+        totals = occurrence_totals([weekly, fortnightly])
+
+        self.assertEqual(totals[weekly.id], build_invoice(weekly, self.tutor.id).total)
+        self.assertEqual(totals[fortnightly.id], build_invoice(fortnightly, self.tutor.id).total)
+
+    def test_sync_is_idempotent(self):
+        request = self.create_request()
+        sync_occurrences([request])
+        sync_occurrences([request])
+        self.assertEqual(request.occurrences.count(), 6)
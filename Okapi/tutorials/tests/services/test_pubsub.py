@@ -0,0 +1,41 @@
+"""Unit tests for the in-process publish and subscribe broker."""
+import asyncio
+from threading import Thread
+from django.test import SimpleTestCase
+from tutorials.pubsub import InProcessBroker, ticket_channel
+
+class InProcessBrokerTestCase(SimpleTestCase):
+    """Unit tests for the in-process publish and subscribe broker."""
+
+    def setUp(self):
+        self.broker = InProcessBroker()
+
+    async def test_subscriber_receives_published_events(self):
+        async with self.broker.subscribe('ticket:1') as queue:
+            self.broker.publish('ticket:1', {'id': 1})
+            self.broker.publish('ticket:2', {'id': 2})
+            self.assertEqual(await asyncio.wait_for(queue.get(), 1), {'id': 1})
+            self.assertTrue(queue.empty())
+
+    async def test_publish_from_another_thread(self):
+        async with self.broker.subscribe('ticket:1') as queue:
+            thread = Thread(target=self.broker.publish, args=('ticket:1', {'id': 1}))
+            thread.start()
+            self.assertEqual(await asyncio.wait_for(queue.get(), 1), {'id': 1})
+            thread.join()
+
+    async def test_every_subscriber_receives_events(self):
+        async with self.broker.subscribe('ticket:1') as first, self.broker.subscribe('ticket:1') as second:
+            self.assertEqual(self.broker.subscriber_count('ticket:1'), 2)
+            self.broker.publish('ticket:1', {'id': 1})
+            self.assertEqual(await asyncio.wait_for(first.get(), 1), {'id': 1})
+            self.assertEqual(await asyncio.wait_for(second.get(), 1), {'id': 1})
+
+    async def test_unsubscribed_when_block_exits(self):
+        async with self.broker.subscribe('ticket:1'):
+            pass
+        self.assertEqual(self.broker.subscriber_count('ticket:1'), 0)
+        self.broker.publish('ticket:1', {'id': 1})
+
+    def test_ticket_channel(self):
+        self.assertEqual(ticket_channel(5), 'ticket:5')
@@ -0,0 +1,81 @@
+"""Unit tests for the scheduling module."""
+from datetime import date, timedelta
+from random import Random
+from timeit import repeat
+from django.test import SimpleTestCase
+from tutorials.scheduling import WEEKDAYS, count_sessions, count_weekday_occurrences
+
+def count_sessions_by_walking(start_date, end_date, availability, fortnightly=False):
+    """Reference implementation counting one day at a time."""
+
+    count = 0
+    current_date = start_date
+    while current_date <= end_date:
+        week = (current_date - start_date).days // 7
+        if WEEKDAYS[current_date.weekday()] in availability and (not fortnightly or week % 2 == 0):
+            count += 1
+        current_date += timedelta(days=1)
+    return count
+
+class CountSessionsTestCase(SimpleTestCase):
+    """Unit tests for session counting."""
+
+    def test_january_mondays(self):
+        self.assertEqual(count_sessions(date(2024, 1, 1), date(2024, 1, 31), {'monday': '09:00'}), 5)
+
+    def test_multiple_days(self):
+        availability = {'monday': '09:00', 'wednesday': '14:00'}
+        self.assertEqual(count_sessions(date(2024, 1, 1), date(2024, 1, 31), availability), 10)
+
+    def test_list_of_times_counts_one_session_per_day(self):
+        availability = {'monday': ['09:00', '10:00']}
+        self.assertEqual(count_sessions(date(2024, 1, 1), date(2024, 1, 31), availability), 5)
+
+    def test_accepts_iso_strings(self):
+        self.assertEqual(count_sessions('2024-01-01', '2024-01-31', {'monday': '09:00'}), 5)
+
+    def test_single_day_span(self):
+        self.assertEqual(count_weekday_occurrences(date(2024, 1, 1), date(2024, 1, 1), 0), 1)
+        self.assertEqual(count_weekday_occurrences(date(2024, 1, 1), date(2024, 1, 1), 1), 0)
+
+    def test_end_before_start_counts_nothing(self):
+        self.assertEqual(count_sessions(date(2024, 1, 31), date(2024, 1, 1), {'monday': '09:00'}), 0)
+
+    def test_empty_and_unknown_days_count_nothing(self):
+        self.assertEqual(count_sessions(date(2024, 1, 1), date(2024, 1, 31), {}), 0)
+        self.assertEqual(count_sessions(date(2024, 1, 1), date(2024, 1, 31), {'someday': '09:00'}), 0)
+
+    def test_fortnightly_runs_every_other_week(self):
+        self.assertEqual(count_sessions(date(2024, 1, 1), date(2024, 1, 31), {'monday': '09:00'}, True), 3)
+        self.assertEqual(count_sessions(date(2024, 1, 1), date(2024, 1, 31), {'friday': '09:00'}, True), 2)
+
+    def test_matches_day_by_day_walk(self):
+        rng = Random(1)
+        for _ in range(500):
+            start_date = date(2024, 1, 1) + timedelta(days=rng.randint(0, 365))
+            end_date = start_date + timedelta(days=rng.randint(-3, 200))
+            availability = {day: '09:00' for day in rng.sample(WEEKDAYS, rng.randint(0, 7))}
+            fortnightly = rng.random() < 0.5
+            self.assertEqual(
+                count_sessions(start_date, end_date, availability, fortnightly),
+                count_sessions_by_walking(start_date, end_date, availability, fortnightly)
+            )
+
+class CountSessionsBenchmarkTestCase(SimpleTestCase):
+    """Benchmark showing that counting cost does not grow with the span of a request."""
+
+    availability = {'monday': '09:00', 'wednesday': '14:00', 'friday': '16:00'}
+
+    def _best_time(self, days):
+        start_date = date(2024, 1, 1)
+        end_date = start_date + timedelta(days=days)
+        return min(repeat(
+            lambda: count_sessions(start_date, end_date, self.availability),
+            number=2000,
+            repeat=5
+        ))
+
+    def test_cost_is_constant_in_span(self):
+        one_week = self._best_time(7)
+        a_century = self._best_time(36500)
+        self.assertLess(a_century, one_week * 3)
@@ -0,0 +1,106 @@
+"""Unit tests for posting and reading ticket messages."""
+from datetime import timedelta
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from tutorials.models import Messages, Ticket, User
+from tutorials.tickets import mark_read, messages_after, post_message, recount_tickets, serialize_message
+
+class TicketsTestCase(TestCase):
+    """Unit tests for posting and reading ticket messages."""
+
+    fixtures = ['tutorials/tests/fixtures/default_user.json']
+
+    def setUp(self):
+        self.student = User.objects.get(username='@johndoe')
+        self.ticket = Ticket.objects.create(student=self.student, title='Help')
+
+    def test_new_ticket_has_no_unread_messages(self):
+        self.assertEqual(self.ticket.unread_for_admin, 0)
+        self.assertEqual(self.ticket.unread_for_student, 0)
+        self.assertIsNotNone(self.ticket.last_message_at)
+
+    def test_post_message_counts_unread_for_other_side(self):
+        post_message(self.ticket, 'Hi', 'student')
+        post_message(self.ticket, 'Hi again', 'student')
+        post_message(self.ticket, 'Hello', 'admin')
+        self.ticket.refresh_from_db()
+        self.assertEqual(self.ticket.unread_for_admin, 2)
+        self.assertEqual(self.ticket.unread_for_student, 1)
+
+    def test_post_message_updates_last_activity(self):
+        Ticket.objects.filter(id=self.ticket.id).update(last_message_at=timezone.now() - timedelta(days=1))
+        before = timezone.now()
+        post_message(self.ticket, 'Hi', 'student')
+        self.ticket.refresh_from_db()
+        self.assertGreaterEqual(self.ticket.last_message_at, before)
+
+    def test_mark_read_clears_own_side_only(self):
+        post_message(self.ticket, 'Hi', 'student')
+        post_message(self.ticket, 'Hello', 'admin')
+        self.assertEqual(mark_read(self.ticket, 'Admin'), 1)
+        self.ticket.refresh_from_db()
+        self.assertEqual(self.ticket.unread_for_admin, 0)
+        self.assertEqual(self.ticket.unread_for_student, 1)
+        self.assertFalse(Messages.objects.get(msg_from='admin').is_read)
+
+    def test_mark_read_with_stale_counter(self):
+        # Another process posts after this ticket was loaded
+        post_message(Ticket.objects.get(id=self.ticket.id), 'Hi', 'student')
+        self.assertEqual(self.ticket.unread_for_admin, 0)
+        self.assertEqual(mark_read(self.ticket, 'Admin'), 1)
+        self.ticket.refresh_from_db()
+        self.assertEqual(self.ticket.unread_for_admin, 0)
+        self.assertTrue(Messages.objects.get().is_read)
+
+    def test_mark_read_nothing_unread(self):
+        post_message(self.ticket, 'Hi', 'student')
+        mark_read(self.ticket, 'Admin')
+        self.ticket.refresh_from_db()
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(mark_read(self.ticket, 'Admin'), 0)
+        # The messages are still checked, but the counter is left alone
+        self.assertTrue(any('tutorials_messages' in query['sql'] for query in queries))
+        self.assertFalse(any('tutorials_ticket"' in query['sql'] for query in queries))
+
+    def test_mark_read_only_touches_unread_rows(self):
+        post_message(self.ticket, 'Hi', 'student')
+        read = Messages.objects.create(ticket=self.ticket, content='Seen', msg_from='student', is_read=True)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(mark_read(self.ticket, 'Admin'), 1)
+        message_update, = [query['sql'] for query in queries if 'tutorials_messages' in query['sql']]
+        self.assertIn('NOT "tutorials_messages"."is_read"', message_update)
+        self.assertEqual(Messages.objects.filter(is_read=True).exclude(id=read.id).count(), 1)
+
+    def test_mark_read_up_to_message(self):
+        first = post_message(self.ticket, 'Hi', 'student')
+        post_message(self.ticket, 'Hi again', 'student')
+        self.ticket.refresh_from_db()
+        self.assertEqual(mark_read(self.ticket, 'Admin', up_to=first.id), 1)
+        self.ticket.refresh_from_db()
+        self.assertEqual(self.ticket.unread_for_admin, 1)
+
+    def test_messages_after(self):
+        first, second, third = [post_message(self.ticket, str(number), 'student') for number in range(3)]
+        self.assertEqual(messages_after(self.ticket, first.id, 1), ([second], True))
+        self.assertEqual(messages_after(self.ticket, second.id, 1), ([third], False))
+        self.assertEqual(messages_after(self.ticket, third.id, 1), ([], False))
+
+    def test_serialize_message(self):
+        message = Messages.objects.get(id=post_message(self.ticket, 'Hi', 'student').id)
+        data = serialize_message(message)
+        self.assertEqual(set(data), {'id', 'from', 'content', 'sent'})
+        self.assertEqual(data['from'], 'student')
+        self.assertRegex(data['sent'], r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}$')
+
+    def test_recount_tickets(self):
+        Messages.objects.bulk_create([
+            Messages(ticket=self.ticket, content='Hi', msg_from='student'),
+            Messages(ticket=self.ticket, content='Read', msg_from='student', is_read=True),
+            Messages(ticket=self.ticket, content='Hello', msg_from='admin'),
+        ])
+        recount_tickets()
+        self.ticket.refresh_from_db()
+        self.assertEqual(self.ticket.unread_for_admin, 1)
+        self.assertEqual(self.ticket.unread_for_student, 1)
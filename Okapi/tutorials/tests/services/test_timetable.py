@@ -0,0 +1,28 @@
+"""Unit tests for splitting sessions into previous, current and upcoming ones."""
+from datetime import date
+from django.test import SimpleTestCase
+from tutorials.models import RequestSession
+from tutorials.timetable import bucket_sessions
+
+class BucketSessionsTestCase(SimpleTestCase):
+    """Tests for bucketing sessions around a date."""
+
+    def session(self, start, end):
+        return RequestSession(start_date=start, end_date=end)
+
+    def test_buckets(self):
+        today = date(2024, 6, 15)
+        ended = self.session(date(2024, 5, 1), date(2024, 6, 14))
+        ends_today = self.session(date(2024, 6, 1), today)
+        starts_today = self.session(today, date(2024, 7, 1))
+        later = self.session(date(2024, 6, 16), date(2024, 7, 1))
+
+        previous, current, upcoming = bucket_sessions([ended, ends_today, starts_today, later], today)
+        self.assertEqual(previous, [ended])
+        self.assertEqual(current, [ends_today, starts_today])
+        self.assertEqual(upcoming, [later])
+
+    def test_keeps_order(self):
+        today = date(2024, 6, 15)
+        sessions = [self.session(date(2024, 1, day), date(2024, 1, day + 1)) for day in range(1, 6)]
+        self.assertEqual(bucket_sessions(sessions, today), (sessions, [], []))
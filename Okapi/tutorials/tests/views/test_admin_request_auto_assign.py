@@ -0,0 +1,139 @@
+from datetime import date
+from django.contrib.messages import get_messages
+from django.test import TestCase
+from django.urls import reverse
+from tutorials.models import User, Course, Invoices, RequestSession, Tutor
+from tutorials.tests.helpers import CacheResetMixin
+
+class AdminRequestAutoAssignTests(CacheResetMixin, TestCase):
+    def setUp(self):
+        """Set up test data before each test method"""
+        super().setUp()
+        self.course = Course.objects.create(
+            name='Python Programming',
+            desc='Learn Python basics',
+            price=100.00
+        )
+
+        self.admin = User.objects.create_user(
+            username='@admin',
+            password='admin123',
+            first_name='Admin',
+            last_name='User',
+            email='admin@test.com',
+            role='Admin'
+        )
+
+        self.student = User.objects.create_user(
+            username='@student',
+            password='student123',
+            first_name='Student',
+            last_name='User',
+            email='student@test.com',
+            role='Student'
+        )
+
+        self.tutor = User.objects.create_user(
+            username='@tutor',
+            password='tutor123',
+            first_name='Tutor',
+            last_name='User',
+            email='tutor@test.com',
+            role='Tutor'
+        )
+        Tutor.objects.create(user=self.tutor, years_exp=2, rate=1.0, availability={'monday': ['9:00', '11:00']})
+        self.course.users.add(self.tutor)
+
+        self.requests = [
+            RequestSession.objects.create(
+                student=self.student,
+                course=self.course,
+                start_date=date(2024, 1, 1),
+                end_date=date(2024, 1, 31),
+                availability={'monday': f'{hour}:00'},
+            )
+            for hour in (9, 11)
+        ]
+        self.url = reverse('admin.request.auto_assign')
+
+    def test_auto_assign_all_pending(self):
+        """Once confirmed, every pending request gets a tutor"""
+        self.client.login(username='@admin', password='admin123')
+        response = self.client.post(self.url, {'all_pending': '1'})
+
+        self.assertRedirects(response, reverse('admin.request.list'))
+        self.assertEqual(set(RequestSession.objects.values_list('status', 'tutor')), {('accepted', self.tutor.id)})
+        self.assertEqual(Invoices.objects.count(), 2)
+        message = str(list(get_messages(response.wsgi_request))[0])
+        self.assertIn('Assigned tutors to 2 requests and created 2 invoices', message)
+
+    def test_nothing_selected_changes_nothing(self):
+        """Posting without a selection or confirmation assigns nothing"""
+        self.client.login(username='@admin', password='admin123')
+        response = self.client.post(self.url)
+
+        self.assertRedirects(response, reverse('admin.request.list'))
+        self.assertFalse(RequestSession.objects.exclude(status='pending').exists())
+        messages = [str(message) for message in get_messages(response.wsgi_request)]
+        self.assertIn('Select the pending requests to assign, or confirm assigning all of them.', messages)
+
+    def test_unavailable_tutor_not_assigned(self):
+        """Tutors are only assigned to requests at times they are available"""
+        request_session = RequestSession.objects.create(
+            student=self.student,
+            course=self.course,
+            start_date=date(2024, 1, 1),
+            end_date=date(2024, 1, 31),
+            availability={'tuesday': '9:00'},
+        )
+        self.client.login(username='@admin', password='admin123')
+        self.client.post(self.url, {'request_ids': [request_session.id]})
+
+        request_session.refresh_from_db()
+        self.assertEqual(request_session.status, 'pending')
+
+    def test_auto_assign_selected(self):
+        """Only the selected requests are assigned"""
+        self.client.login(username='@admin', password='admin123')
+        self.client.post(self.url, {'request_ids': [self.requests[0].id]})
+
+        statuses = dict(RequestSession.objects.values_list('id', 'status'))
+        self.assertEqual(statuses, {self.requests[0].id: 'accepted', self.requests[1].id: 'pending'})
+
+    def test_unassigned_requests_are_reported(self):
+        """Requests no tutor is free for are listed"""
+        clash = RequestSession.objects.create(
+            student=self.student,
+            course=self.course,
+            start_date=date(2024, 1, 1),
+            end_date=date(2024, 1, 31),
+            availability={'monday': '9:00'},
+        )
+        self.client.login(username='@admin', password='admin123')
+        response = self.client.post(self.url, {'all_pending': '1'})
+
+        messages = [str(message) for message in get_messages(response.wsgi_request)]
+        self.assertIn(f'No tutor could be assigned to requests #{clash.id}.', messages)
+
+    def test_get_changes_nothing(self):
+        """Only posts assign tutors"""
+        self.client.login(username='@admin', password='admin123')
+        response = self.client.get(self.url)
+
+        self.assertRedirects(response, reverse('admin.request.list'))
+        self.assertFalse(RequestSession.objects.exclude(status='pending').exists())
+
+    def test_non_admin_cannot_auto_assign(self):
+        """Students cannot assign tutors"""
+        self.client.login(username='@student', password='student123')
+        response = self.client.post(self.url)
+
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(RequestSession.objects.exclude(status='pending').exists())
+
+    def test_request_list_has_auto_assign_button(self):
+        """The request list offers auto-assignment"""
+        self.client.login(username='@admin', password='admin123')
+        response = self.client.get(reverse('admin.request.list'))
+
+        self.assertContains(response, f'formaction="{self.url}"')
@@ -0,0 +1,136 @@
+from datetime import date
+from django.contrib.messages import get_messages
+from django.test import TestCase
+from django.urls import reverse
+from tutorials.models import User, Course, Invoices, RequestSession, Tutor
+from tutorials.tests.helpers import CacheResetMixin
+
+class AdminRequestBulkTests(CacheResetMixin, TestCase):
+    def setUp(self):
+        """Set up test data before each test method"""
+        super().setUp()
+        self.course = Course.objects.create(
+            name='Python Programming',
+            desc='Learn Python basics',
+            price=100.00
+        )
+
+        self.admin = User.objects.create_user(
+            username='@admin',
+            password='admin123',
+            first_name='Admin',
+            last_name='User',
+            email='admin@test.com',
+            role='Admin'
+        )
+
+        self.student = User.objects.create_user(
+            username='@student',
+            password='student123',
+            first_name='Student',
+            last_name='User',
+            email='student@test.com',
+            role='Student'
+        )
+
+        self.tutor = User.objects.create_user(
+            username='@tutor',
+            password='tutor123',
+            first_name='Tutor',
+            last_name='User',
+            email='tutor@test.com',
+            role='Tutor'
+        )
+        Tutor.objects.create(user=self.tutor, years_exp=2, rate=1.0, availability={'monday': ['9:00']})
+        self.course.users.add(self.tutor)
+
+        self.requests = [
+            RequestSession.objects.create(
+                student=self.student,
+                course=self.course,
+                start_date=date(2024, 1, 1),
+                end_date=date(2024, 1, 31),
+                availability={'monday': f'{hour}:00'},
+            )
+            for hour in (9, 11, 13)
+        ]
+        self.url = reverse('admin.request.bulk')
+
+    def test_bulk_accept(self):
+        """Selected requests are accepted, invoiced and the throughput is reported"""
+        self.client.login(username='@admin', password='admin123')
+        response = self.client.post(self.url, {
+            'action': 'accept',
+            'request_ids': [request.id for request in self.requests[:2]],
+        })
+
+        self.assertRedirects(response, reverse('admin.request.list'))
+        statuses = dict(RequestSession.objects.values_list('id', 'status'))
+        self.assertEqual(statuses[self.requests[0].id], 'accepted')
+        self.assertEqual(statuses[self.requests[1].id], 'accepted')
+        self.assertEqual(statuses[self.requests[2].id], 'pending')
+        self.assertEqual(Invoices.objects.filter(tutor=self.tutor).count(), 2)
+        message = str(list(get_messages(response.wsgi_request))[0])
+        self.assertIn('Accepted 2 requests and created 2 invoices', message)
+        self.assertIn('requests/s', message)
+
+    def test_bulk_reject(self):
+        """Selected requests are rejected without invoices"""
+        self.client.login(username='@admin', password='admin123')
+        self.client.post(self.url, {
+            'action': 'reject',
+            'request_ids': [request.id for request in self.requests],
+        })
+
+        self.assertEqual(set(RequestSession.objects.values_list('status', flat=True)), {'rejected'})
+        self.assertFalse(Invoices.objects.exists())
+
+    def test_skipped_requests_are_reported(self):
+        """Requests no tutor can be assigned to stay pending and are listed"""
+        other_course = Course.objects.create(name='Go', desc='Learn Go', price=50.00)
+        orphan = RequestSession.objects.create(
+            student=self.student,
+            course=other_course,
+            start_date=date(2024, 1, 1),
+            end_date=date(2024, 1, 31),
+            availability={'monday': '09:00'},
+        )
+        self.client.login(username='@admin', password='admin123')
+        response = self.client.post(self.url, {'action': 'accept', 'request_ids': [orphan.id]})
+
+        orphan.refresh_from_db()
+        self.assertEqual(orphan.status, 'pending')
+        messages = [str(message) for message in get_messages(response.wsgi_request)]
+        self.assertIn(f'No tutor could be assigned to requests #{orphan.id}.', messages)
+
+    def test_nothing_selected(self):
+        """Posting without a selection changes nothing"""
+        self.client.login(username='@admin', password='admin123')
+        response = self.client.post(self.url, {'action': 'accept'})
+
+        self.assertRedirects(response, reverse('admin.request.list'))
+        self.assertFalse(RequestSession.objects.exclude(status='pending').exists())
+
+    def test_unknown_action(self):
+        """Unknown actions are ignored"""
+        self.client.login(username='@admin', password='admin123')
+        response = self.client.post(self.url, {'action': 'archive', 'request_ids': [self.requests[0].id]})
+
+        self.assertRedirects(response, reverse('admin.request.list'))
+        self.assertFalse(RequestSession.objects.exclude(status='pending').exists())
+
+    def test_non_admin_cannot_bulk_process(self):
+        """Students cannot accept requests"""
+        self.client.login(username='@student', password='student123')
+        response = self.client.post(self.url, {'action': 'accept', 'request_ids': [self.requests[0].id]})
+
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(RequestSession.objects.exclude(status='pending').exists())
+
+    def test_request_list_has_bulk_form(self):
+        """Pending requests can be selected on the request list"""
+        self.client.login(username='@admin', password='admin123')
+        response = self.client.get(reverse('admin.request.list'))
+
+        self.assertContains(response, self.url)
+        self.assertContains(response, 'name="request_ids"', count=3)
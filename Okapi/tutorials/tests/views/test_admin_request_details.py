@@ -1,13 +1,16 @@
+from django.contrib.messages import get_messages
 from django.test import TestCase
 from django.urls import reverse
 from django.core.exceptions import PermissionDenied
 from tutorials.models import User, RequestSession, Course, Invoices
+from tutorials.tests.helpers import CacheResetMixin
 from datetime import date, timedelta
 import ast
 
-class AdminRequestDetailsTests(TestCase):
+class AdminRequestDetailsTests(CacheResetMixin, TestCase):
     def setUp(self):
         """Set up test data before each test method"""
+        super().setUp()
         # Create a course
         self.course = Course.objects.create(
             name='Python Programming',
@@ -113,6 +116,82 @@ class AdminRequestDetailsTests(TestCase):
         expected_due_date = date(2024, 1, 4)  # Jan 1 + 3 days
         self.assertEqual(invoice.due_date, expected_due_date)
 
+    def test_resubmitted_accept_creates_one_invoice(self):
+        """Test that submitting the accept form twice only invoices the request once"""
+        self.client.login(username='@adminuser', password='adminpass123')
+        url = reverse('admin.request.details', args=[self.request_session.id])
+        post_data = {
+            'status': 'accepted',
+            'tutor': self.tutor.id
+        }
+
+        self.client.post(url, data=post_data)
+        self.client.post(url, data=post_data)
+
+        self.assertEqual(Invoices.objects.filter(request_session=self.request_session).count(), 1)
+        self.assertEqual(Invoices.objects.count(), 1)
+
+    def test_reaccept_after_reject_with_another_tutor(self):
+        """Test that a rejected request can be accepted again with another tutor, keeping its invoice"""
+        other_tutor = User.objects.create_user(
+            username='@othertutor',
+            password='tutorpass123',
+            first_name='Other',
+            last_name='Tutor',
+            email='other@test.com',
+            role='Tutor'
+        )
+        self.client.login(username='@adminuser', password='adminpass123')
+        url = reverse('admin.request.details', args=[self.request_session.id])
+        self.client.post(url, data={'status': 'accepted', 'tutor': self.tutor.id})
+        self.client.post(url, data={'status': 'rejected'})
+        response = self.client.post(url, data={'status': 'accepted', 'tutor': other_tutor.id})
+
+        self.assertRedirects(response, reverse('admin.request.list'))
+        self.request_session.refresh_from_db()
+        self.assertEqual(self.request_session.status, 'accepted')
+        self.assertEqual(self.request_session.tutor, other_tutor)
+        self.assertEqual(Invoices.objects.filter(request_session=self.request_session).count(), 1)
+
+    def book_tutor(self):
+        """Return an accepted session of the tutor at the same times as the request"""
+        # The booking index is invalidated once the booking is committed
+        with self.captureOnCommitCallbacks(execute=True):
+            return RequestSession.objects.create(
+                student=self.student,
+                tutor=self.tutor,
+                course=self.course,
+                availability={'monday': '10:00'},
+                start_date=date(2024, 1, 15),
+                end_date=date(2024, 2, 15),
+                status='accepted'
+            )
+
+    def test_busy_tutors_not_offered(self):
+        """Test that tutors already teaching at the requested times are left out of the dropdown"""
+        self.client.login(username='@adminuser', password='adminpass123')
+        url = reverse('admin.request.details', args=[self.request_session.id])
+        self.assertEqual(self.client.get(url).context['tutors'], [self.tutor])
+
+        self.book_tutor()
+        response = self.client.get(url)
+        self.assertEqual(response.context['tutors'], [])
+        self.assertContains(response, 'No tutor of this course is free at these times.')
+
+    def test_conflicting_accept_rejected(self):
+        """Test that accepting with a tutor who already teaches at those times changes nothing"""
+        booked = self.book_tutor()
+        self.client.login(username='@adminuser', password='adminpass123')
+        url = reverse('admin.request.details', args=[self.request_session.id])
+        response = self.client.post(url, data={'status': 'accepted', 'tutor': self.tutor.id})
+
+        self.assertRedirects(response, url)
+        self.request_session.refresh_from_db()
+        self.assertEqual(self.request_session.status, 'pending')
+        self.assertFalse(Invoices.objects.filter(request_session=self.request_session).exists())
+        messages = [str(message) for message in get_messages(response.wsgi_request)]
+        self.assertIn(f'@tutoruser already teaches at these times (requests #{booked.id}).', messages)
+
     def test_admin_can_reject_request(self):
         """Test that admin can reject a request session"""
         self.client.login(username='@adminuser', password='adminpass123')
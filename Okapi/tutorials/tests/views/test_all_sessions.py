@@ -1,7 +1,10 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 from tutorials.models import User, Course, RequestSession
+from tutorials.views import PREVIOUS_SESSIONS_PAGE_SIZE
 from datetime import timedelta
 
 class AllSessionsTests(TestCase):
@@ -186,4 +189,80 @@ class AllSessionsTests(TestCase):
     def test_unauthenticated_access(self):
         """Test access attempt without login"""
         response = self.client.get(reverse('all_sessions'))
-        self.assertEqual(response.status_code, 302)  # Should redirect to login
\ No newline at end of file
+        self.assertEqual(response.status_code, 302)  # Should redirect to login
+
+    def test_current_sessions(self):
+        """Test that running sessions are only listed as current"""
+        running = RequestSession.objects.create(
+            student=self.student,
+            tutor=self.tutor,
+            course=self.course,
+            status='accepted',
+            start_date=self.today,
+            end_date=self.today + timedelta(days=7),
+            availability={'monday': '09:00'}
+        )
+        self.client.login(username='@student', password='student123')
+        response = self.client.get(reverse('all_sessions'))
+
+        self.assertEqual(response.context['current_sessions'], [running])
+        self.assertNotIn(running, response.context['upcoming_sessions'])
+        self.assertEqual(response.context['next_session'], self.future_session1)
+
+    def test_sessions_read_with_one_query(self):
+        """Test that sessions and their courses are read with one query however many there are"""
+        for days in range(5, 35):
+            RequestSession.objects.create(
+                student=self.student,
+                tutor=self.tutor,
+                course=self.course,
+                status='accepted',
+                start_date=self.today - timedelta(days=days + 1),
+                end_date=self.today - timedelta(days=days),
+                availability={'monday': '09:00'}
+            )
+        self.client.login(username='@student', password='student123')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('all_sessions'))
+
+        self.assertEqual(response.status_code, 200)
+        session_queries = [query for query in queries if 'tutorials_requestsession' in query['sql']]
+        self.assertEqual(len(session_queries), 1)
+        self.assertIn('tutorials_course', session_queries[0]['sql'])
+
+    def test_previous_sessions_are_paginated(self):
+        """Test that previous sessions are shown a page at a time"""
+        for days in range(5, 5 + PREVIOUS_SESSIONS_PAGE_SIZE):
+            RequestSession.objects.create(
+                student=self.student,
+                tutor=self.tutor,
+                course=self.course,
+                status='accepted',
+                start_date=self.today - timedelta(days=days + 1),
+                end_date=self.today - timedelta(days=days),
+                availability={'monday': '09:00'}
+            )
+        self.client.login(username='@student', password='student123')
+        response = self.client.get(reverse('all_sessions'))
+
+        previous_sessions = response.context['previous_sessions']
+        self.assertEqual(len(previous_sessions), PREVIOUS_SESSIONS_PAGE_SIZE)
+        self.assertEqual(previous_sessions.paginator.count, PREVIOUS_SESSIONS_PAGE_SIZE + 2)
+        self.assertContains(response, '?previous_page=2')
+
+        response = self.client.get(reverse('all_sessions'), {'previous_page': 2})
+        self.assertEqual(list(response.context['previous_sessions']), [self.past_session2, self.past_session1])
+
+    def test_admin_cannot_view_sessions(self):
+        """Test that admins, who have no sessions of their own, are refused"""
+        User.objects.create_user(
+            username='@admin',
+            password='admin123',
+            first_name='Admin',
+            last_name='User',
+            email='admin@test.com',
+            role='Admin'
+        )
+        self.client.login(username='@admin', password='admin123')
+        response = self.client.get(reverse('all_sessions'))
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,112 @@
+from datetime import timedelta
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from tutorials.models import Messages, Ticket, User
+from tutorials.tickets import post_message
+from tutorials.views import TICKETS_PAGE_SIZE
+
+class AllTicketTests(TestCase):
+    def setUp(self):
+        """Set up test data before each test method"""
+        self.admin = User.objects.create_user(
+            username='@admin',
+            password='admin123',
+            first_name='Admin',
+            last_name='User',
+            email='admin@test.com',
+            role='Admin'
+        )
+
+        self.student = User.objects.create_user(
+            username='@student',
+            password='student123',
+            first_name='Student',
+            last_name='User',
+            email='student@test.com',
+            role='Student'
+        )
+
+        self.other_student = User.objects.create_user(
+            username='@other',
+            password='other123',
+            first_name='Other',
+            last_name='Student',
+            email='other@test.com',
+            role='Student'
+        )
+        self.url = reverse('all_ticket')
+
+    def create_tickets(self, count, student=None):
+        """Create tickets with one unread student message, the last one most recently active"""
+        now = timezone.now()
+        tickets = []
+        for number in range(count):
+            ticket = Ticket.objects.create(student=student or self.student, title=f'Ticket {number}')
+            post_message(ticket, 'Help', 'student')
+            Ticket.objects.filter(id=ticket.id).update(last_message_at=now - timedelta(minutes=count - number))
+            tickets.append(ticket)
+        return tickets
+
+    def test_tutor_access_denied(self):
+        """Test that tutors have no ticket inbox"""
+        tutor = User.objects.create_user(
+            username='@tutor', password='tutor123', first_name='Tutor', last_name='User',
+            email='tutor@test.com', role='Tutor'
+        )
+        self.client.force_login(tutor)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 403)
+
+    def test_student_sees_own_tickets_by_last_activity(self):
+        """Test that students only see their own tickets, most recently active first"""
+        first, second = self.create_tickets(2)
+        self.create_tickets(1, student=self.other_student)
+        post_message(first, 'Still stuck', 'student')
+        self.client.login(username='@student', password='student123')
+        response = self.client.get(self.url)
+        self.assertEqual(list(response.context['tickets']), [first, second])
+
+    def test_unread_counts_per_role(self):
+        """Test that each side sees the messages it has not read"""
+        ticket, = self.create_tickets(1)
+        post_message(ticket, 'Reply', 'admin')
+        self.client.login(username='@admin', password='admin123')
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['tickets'][0].unread_msg_count, 1)
+        self.client.login(username='@student', password='student123')
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['tickets'][0].unread_msg_count, 1)
+
+    def test_opening_ticket_marks_messages_read(self):
+        """Test that viewing a ticket clears the viewer's unread count"""
+        ticket, = self.create_tickets(1)
+        self.client.login(username='@admin', password='admin123')
+        self.client.get(reverse('ticket_details', args=[ticket.id]))
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['tickets'][0].unread_msg_count, 0)
+        self.assertFalse(Messages.objects.filter(is_read=False).exists())
+
+    def test_admin_tickets_are_paginated(self):
+        """Test that admins page through every ticket"""
+        tickets = self.create_tickets(TICKETS_PAGE_SIZE + 1)
+        self.client.login(username='@admin', password='admin123')
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.context['tickets']), TICKETS_PAGE_SIZE)
+        self.assertTrue(response.context['tickets'].has_next())
+        response = self.client.get(self.url, {'page': 2})
+        self.assertEqual(list(response.context['tickets']), [tickets[0]])
+
+    def test_query_count_independent_of_ticket_count(self):
+        """Test that the inbox does not issue a query per ticket or aggregate messages"""
+        self.create_tickets(1)
+        self.client.login(username='@admin', password='admin123')
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(self.url)
+        self.create_tickets(5)
+        with CaptureQueriesContext(connection) as many:
+            self.client.get(self.url)
+        self.assertEqual(len(few), len(many))
+        self.assertFalse(any('tutorials_messages' in query['sql'] for query in many.captured_queries))
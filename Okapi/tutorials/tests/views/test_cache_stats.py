@@ -0,0 +1,41 @@
+from django.test import TestCase
+from django.urls import reverse
+from tutorials.cache import get_or_compute, reset_cache_stats
+from tutorials.models import User
+
+class CacheStatsViewTests(TestCase):
+    def setUp(self):
+        """Set up test data before each test method"""
+        self.admin = User.objects.create_user(
+            username='@admin',
+            password='admin123',
+            first_name='Admin',
+            last_name='User',
+            email='admin@test.com',
+            role='Admin'
+        )
+
+        self.student = User.objects.create_user(
+            username='@student',
+            password='student123',
+            first_name='Student',
+            last_name='User',
+            email='student@test.com',
+            role='Student'
+        )
+        self.url = reverse('cache_stats')
+        reset_cache_stats()
+
+    def test_non_admin_access_denied(self):
+        """Test that non-admin users cannot see cache statistics"""
+        self.client.login(username='@student', password='student123')
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 403)
+
+    def test_admin_sees_counters(self):
+        """Test that admins get the hit and miss counters as JSON"""
+        get_or_compute('things', [1], lambda: 1)
+        self.client.login(username='@admin', password='admin123')
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['namespaces']['things'], {'hits': 0, 'misses': 1})
@@ -0,0 +1,141 @@
+from datetime import date
+from time import time
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.http import http_date
+from tutorials.calendars import feed_token
+from tutorials.models import User, Course, RequestSession
+from tutorials.tests.helpers import CacheResetMixin
+
+class CalendarFeedTests(CacheResetMixin, TestCase):
+    def setUp(self):
+        """Set up test data before each test method"""
+        super().setUp()
+        self.course = Course.objects.create(
+            name='Python Programming',
+            desc='Learn Python basics',
+            price=100.00
+        )
+
+        self.student = User.objects.create_user(
+            username='@student',
+            password='student123',
+            first_name='Student',
+            last_name='User',
+            email='student@test.com',
+            role='Student'
+        )
+
+        self.tutor = User.objects.create_user(
+            username='@tutor',
+            password='tutor123',
+            first_name='Tutor',
+            last_name='User',
+            email='tutor@test.com',
+            role='Tutor'
+        )
+
+        self.request_session = RequestSession.objects.create(
+            student=self.student,
+            tutor=self.tutor,
+            course=self.course,
+            availability={'monday': '09:00'},
+            start_date=date(2024, 1, 1),
+            end_date=date(2024, 1, 31),
+            status='accepted'
+        )
+        self.url = reverse('calendar_feed', args=[feed_token(self.student)])
+
+    def test_feed_without_logging_in(self):
+        """Calendar apps fetch the feed with its signed URL alone"""
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/calendar; charset=utf-8')
+        self.assertEqual(response.content.decode().count('BEGIN:VEVENT'), 5)
+        self.assertIn('ETag', response)
+        self.assertNotIn('Last-Modified', response)
+        self.assertIn('private', response['Cache-Control'])
+
+    def test_unchanged_feed_not_modified(self):
+        """Polls with the current ETag get 304 without the feed being read"""
+        etag = self.client.get(self.url)['ETag']
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+
+    def test_deleted_request_is_sent_again(self):
+        """Deleting the latest updated request changes the ETag, though the feed's latest update goes back"""
+        later = RequestSession.objects.create(
+            student=self.student,
+            tutor=self.tutor,
+            course=self.course,
+            availability={'friday': '09:00'},
+            start_date=date(2024, 1, 1),
+            end_date=date(2024, 1, 31),
+            status='accepted'
+        )
+        etag = self.client.get(self.url)['ETag']
+        later.delete()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.content.decode().count('BEGIN:VEVENT'), 5)
+
+    def test_modified_since_is_ignored(self):
+        """Feeds are only compared by ETag, as their latest update can go back in time"""
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=http_date(time()))
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_changed_feed_is_sent_again(self):
+        """A change to a session gives the feed a new ETag and content"""
+        etag = self.client.get(self.url)['ETag']
+        self.request_session.end_date = date(2024, 1, 14)
+        self.request_session.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.content.decode().count('BEGIN:VEVENT'), 2)
+
+    def test_renamed_course_is_sent_again(self):
+        """Renaming a course shown in the feed gives it a new ETag and content"""
+        etag = self.client.get(self.url)['ETag']
+        self.course.name = 'Python Fundamentals'
+        self.course.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('SUMMARY:Python Fundamentals', response.content.decode())
+
+    def test_repeated_polls_are_served_from_cache(self):
+        """The rendered feed is cached, so later polls only read its version"""
+        self.client.get(self.url)
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_invalid_token(self):
+        """Unsigned tokens are not found"""
+        response = self.client.get(reverse('calendar_feed', args=[f'{self.student.pk}:forged']))
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_only_reads_are_allowed(self):
+        """Posting to the feed is refused"""
+        response = self.client.post(self.url)
+
+        self.assertEqual(response.status_code, 405)
+
+    def test_sessions_page_links_feed(self):
+        """Students find their feed URL on the sessions page"""
+        self.client.login(username='@student', password='student123')
+        response = self.client.get(reverse('all_sessions'))
+
+        self.assertContains(response, f'http://testserver{self.url}')
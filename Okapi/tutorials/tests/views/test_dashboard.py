@@ -2,11 +2,13 @@ from django.test import TestCase
 from django.urls import reverse
 from django.utils import timezone
 from tutorials.models import User, Course, RequestSession
+from tutorials.tests.helpers import CacheResetMixin
 from datetime import timedelta
 
-class DashboardTests(TestCase):
+class DashboardTests(CacheResetMixin, TestCase):
     def setUp(self):
         """Set up test data before each test method"""
+        super().setUp()
         # Create users
         self.admin = User.objects.create_user(
             username='@admin',
@@ -187,4 +189,38 @@ class DashboardTests(TestCase):
     def test_unauthenticated_access(self):
         """Test access to dashboard when not logged in"""
         response = self.client.get(reverse('dashboard'))
-        self.assertEqual(response.status_code, 302)  # Should redirect to login
\ No newline at end of file
+        self.assertEqual(response.status_code, 302)  # Should redirect to login
+    def test_week_calendar(self):
+        """Test that the coming week's dated sessions are shown"""
+        self.client.login(username='@student', password='student123')
+        response = self.client.get(reverse('dashboard'))
+
+        week = response.context['week_occurrences']
+        # Both accepted sessions meet once a week, starting within the next two days
+        self.assertTrue(1 <= len(week) <= 2)
+        self.assertTrue(all(occurrence.request_session.status == 'accepted' for occurrence in week))
+        self.assertEqual(response.context['next_occurrence'], week[0])
+        self.assertContains(response, 'Next session:')
+
+    def test_sessions_beyond_the_week_shown(self):
+        """Test that sessions starting after the coming week are still listed"""
+        RequestSession.objects.filter(id__in=[self.future_session1.id, self.future_session2.id]).delete()
+        today = timezone.now().date()
+        later, latest = [
+            RequestSession.objects.create(
+                student=self.student,
+                tutor=self.tutor,
+                course=self.course,
+                status='accepted',
+                start_date=today + timedelta(days=days),
+                end_date=today + timedelta(days=days + 30),
+                availability={'monday': '09:00'}
+            )
+            for days in (10, 20)
+        ]
+        self.client.login(username='@student', password='student123')
+        response = self.client.get(reverse('dashboard'))
+
+        self.assertEqual(response.context['week_occurrences'], [])
+        self.assertEqual(response.context['next_session'], later)
+        self.assertEqual(list(response.context['upcoming_sessions']), [latest])
@@ -0,0 +1,153 @@
+import csv
+import json
+from datetime import date
+from decimal import Decimal
+from unittest.mock import patch
+from django.test import TestCase
+from django.urls import reverse
+from tutorials.models import User, Course, Invoices, RequestSession
+
+class ExportViewsTests(TestCase):
+    def setUp(self):
+        """Set up test data before each test method"""
+        self.admin = User.objects.create_user(
+            username='@admin',
+            password='admin123',
+            first_name='Admin',
+            last_name='User',
+            email='admin@test.com',
+            role='Admin'
+        )
+        self.student = User.objects.create_user(
+            username='@student',
+            password='student123',
+            first_name='Student',
+            last_name='User',
+            email='student@test.com',
+            role='Student'
+        )
+        self.tutor = User.objects.create_user(
+            username='@tutor',
+            password='tutor123',
+            first_name='Tutor',
+            last_name='User',
+            email='tutor@test.com',
+            role='Tutor'
+        )
+        self.course = Course.objects.create(name='Python Programming', desc='Learn Python basics', price=100.00)
+
+        self.paid_invoice = Invoices.objects.create(
+            student=self.student, tutor=self.tutor, course=self.course,
+            due_date=date(2025, 1, 10), payment_date=date(2025, 1, 5), status=True, total=Decimal('100.00')
+        )
+        self.unpaid_invoice = Invoices.objects.create(
+            student=self.student, tutor=self.tutor, course=self.course,
+            due_date=date(2025, 2, 10), status=False, total=Decimal('150.50')
+        )
+
+        self.accepted_session = RequestSession.objects.create(
+            student=self.student, tutor=self.tutor, course=self.course, availability={'monday': '09:00'},
+            start_date=date(2025, 3, 1), end_date=date(2025, 6, 1), status='accepted'
+        )
+        self.pending_session = RequestSession.objects.create(
+            student=self.student, course=self.course, availability={'tuesday': '10:00'},
+            start_date=date(2025, 4, 1), end_date=date(2025, 7, 1)
+        )
+
+    def read_csv(self, response):
+        return list(csv.reader(b''.join(response.streaming_content).decode().splitlines()))
+
+    def read_ndjson(self, response):
+        return [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+
+    def test_export_invoices_csv(self):
+        """Invoices stream as CSV with a header row, ordered by due date"""
+        self.client.login(username='@admin', password='admin123')
+        response = self.client.get(reverse('export_invoices'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertIn('invoices.csv', response['Content-Disposition'])
+        rows = self.read_csv(response)
+        self.assertEqual(rows[0], ['id', 'student', 'tutor', 'course', 'due_date', 'payment_date', 'paid', 'total'])
+        self.assertEqual(rows[1][0], str(self.paid_invoice.id))
+        self.assertEqual(rows[1][1:3], ['@student', '@tutor'])
+        self.assertEqual(rows[2][0], str(self.unpaid_invoice.id))
+
+    @patch('tutorials.exports.EXPORT_CHUNK_SIZE', 1)
+    async def test_export_streams_over_asgi(self):
+        """Over ASGI the export is an asynchronous stream sent a chunk of lines at a time"""
+        await self.async_client.aforce_login(self.admin)
+        response = await self.async_client.get(reverse('export_invoices'))
+
+        self.assertTrue(response.is_async)
+        chunks = [chunk async for chunk in response.streaming_content]
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(chunks[0], b'id,student,tutor,course,due_date,payment_date,paid,total\r\n')
+        self.assertTrue(chunks[2].startswith(f'{self.unpaid_invoice.id},@student,@tutor,'.encode()))
+
+    def test_export_invoices_ndjson(self):
+        """Each invoice is a JSON object on its own line"""
+        self.client.login(username='@admin', password='admin123')
+        response = self.client.get(reverse('export_invoices'), {'format': 'ndjson'})
+
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertIn('invoices.ndjson', response['Content-Disposition'])
+        rows = self.read_ndjson(response)
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1]['total'], '150.50')
+        self.assertEqual(rows[1]['due_date'], '2025-02-10')
+        self.assertIsNone(rows[1]['payment_date'])
+        self.assertFalse(rows[1]['paid'])
+
+    def test_export_invoices_filters(self):
+        """Invoices can be limited by due date range and paid status"""
+        self.client.login(username='@admin', password='admin123')
+
+        response = self.client.get(reverse('export_invoices'), {'format': 'ndjson', 'start': '2025-02-01'})
+        self.assertEqual([row['id'] for row in self.read_ndjson(response)], [self.unpaid_invoice.id])
+
+        response = self.client.get(reverse('export_invoices'), {'format': 'ndjson', 'end': '2025-01-31'})
+        self.assertEqual([row['id'] for row in self.read_ndjson(response)], [self.paid_invoice.id])
+
+        response = self.client.get(reverse('export_invoices'), {'format': 'ndjson', 'status': 'unpaid'})
+        self.assertEqual([row['id'] for row in self.read_ndjson(response)], [self.unpaid_invoice.id])
+
+    def test_export_sessions_filters(self):
+        """Sessions can be limited by start date range and status"""
+        self.client.login(username='@admin', password='admin123')
+
+        response = self.client.get(reverse('export_sessions'), {'format': 'ndjson'})
+        rows = self.read_ndjson(response)
+        self.assertEqual([row['id'] for row in rows], [self.accepted_session.id, self.pending_session.id])
+        self.assertIsNone(rows[1]['tutor'])
+
+        response = self.client.get(reverse('export_sessions'), {'status': 'pending'})
+        rows = self.read_csv(response)
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1][0], str(self.pending_session.id))
+
+        response = self.client.get(reverse('export_sessions'), {'start': '2025-03-01', 'end': '2025-03-31'})
+        self.assertEqual([row[0] for row in self.read_csv(response)[1:]], [str(self.accepted_session.id)])
+
+    def test_invalid_filters(self):
+        """Unknown formats and statuses and reversed date ranges are rejected"""
+        self.client.login(username='@admin', password='admin123')
+        for params in ({'format': 'xml'}, {'status': 'cancelled'}, {'start': 'soon'},
+                       {'start': '2025-02-01', 'end': '2025-01-01'}):
+            response = self.client.get(reverse('export_sessions'), params)
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('errors', response.json())
+
+    def test_non_admin_cannot_export(self):
+        """Only admins can export invoices and sessions"""
+        self.client.login(username='@student', password='student123')
+        for name in ('export_invoices', 'export_sessions'):
+            response = self.client.get(reverse(name))
+            self.assertEqual(response.status_code, 403)
+
+    def test_export_requires_login(self):
+        """Anonymous users are redirected to log in"""
+        response = self.client.get(reverse('export_invoices'))
+        self.assertEqual(response.status_code, 302)
@@ -1,7 +1,10 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 from tutorials.models import User, Course, Invoices
+from tutorials.views import INVOICES_PAGE_SIZE
 from decimal import Decimal
 from datetime import timedelta
 
@@ -185,5 +188,42 @@ class InvoicesViewTests(TestCase):
         self.assertEqual(len(response.context['paid_invoices']), 0)
         self.assertEqual(len(response.context['unpaid_invoices']), 0)
 
-    
-    
\ No newline at end of file
+    def _create_unpaid_invoices(self, count):
+        Invoices.objects.bulk_create([
+            Invoices(
+                student=self.student,
+                tutor=self.tutor,
+                course=self.course,
+                due_date=timezone.now().date() + timedelta(days=10),
+                status=False,
+                total=Decimal('100.00')
+            )
+            for _ in range(count)
+        ])
+
+    def _count_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('invoices'))
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_query_count_independent_of_invoice_count(self):
+        """Test that each invoice row does not trigger extra queries"""
+        for username, password in [('@admin', 'admin123'), ('@student', 'student123'), ('@tutor', 'tutor123')]:
+            self.client.login(username=username, password=password)
+            few = self._count_queries()
+            self._create_unpaid_invoices(20)
+            many = self._count_queries()
+            self.assertEqual(few, many)
+
+    def test_admin_invoices_are_paginated(self):
+        """Test that admins get bounded pages with the full unpaid count"""
+        self._create_unpaid_invoices(INVOICES_PAGE_SIZE)
+        self.client.login(username='@admin', password='admin123')
+        response = self.client.get(reverse('invoices'))
+        self.assertEqual(len(response.context['unpaid_invoices']), INVOICES_PAGE_SIZE)
+        self.assertEqual(response.context['unpaid_invoices_count'], INVOICES_PAGE_SIZE + 2)
+
+        response = self.client.get(reverse('invoices'), {'unpaid_page': 2})
+        self.assertEqual(len(response.context['unpaid_invoices']), 2)
+        self.assertEqual(response.context['unpaid_invoices_count'], INVOICES_PAGE_SIZE + 2)
@@ -0,0 +1,56 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from tutorials.instrumentation import record_request, reset_request_stats
+from tutorials.models import User
+
+class RequestMetricsViewTests(TestCase):
+    def setUp(self):
+        """Set up test data before each test method"""
+        self.admin = User.objects.create_user(
+            username='@admin',
+            password='admin123',
+            first_name='Admin',
+            last_name='User',
+            email='admin@test.com',
+            role='Admin'
+        )
+
+        self.student = User.objects.create_user(
+            username='@student',
+            password='student123',
+            first_name='Student',
+            last_name='User',
+            email='student@test.com',
+            role='Student'
+        )
+        self.url = reverse('request_metrics')
+        reset_request_stats()
+
+    def test_non_admin_access_denied(self):
+        """Test that non-admin users cannot see request metrics"""
+        self.client.login(username='@student', password='student123')
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 403)
+
+    def test_admin_sees_recorded_urls(self):
+        """Test that admins see a row per recorded URL name"""
+        record_request('dashboard', {
+            'queries': 4, 'duplicate_queries': 1, 'sql_ms': 1.5,
+            'template_ms': 3.0, 'view_ms': 6.0, 'total_ms': 7.0,
+        })
+        self.client.login(username='@admin', password='admin123')
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'admin/request_metrics.html')
+        self.assertEqual(response.context['stats'][0]['url_name'], 'dashboard')
+        self.assertContains(response, 'Request timing is off')
+
+    @override_settings(REQUEST_TIMING=True)
+    def test_page_records_itself_when_enabled(self):
+        """Test that the page is listed once timing is enabled"""
+        self.client.login(username='@admin', password='admin123')
+        with self.assertLogs('tutorials.requests', 'INFO'):
+            self.client.get(self.url)
+            response = self.client.get(self.url)
+        self.assertEqual([row['url_name'] for row in response.context['stats']], ['request_metrics'])
+        self.assertNotContains(response, 'Request timing is off')
@@ -0,0 +1,141 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from tutorials.cached_queries import course_catalogue
+from tutorials.models import User, Course, RequestSession
+from tutorials.views import STUDENT_REQUESTS_PAGE_SIZE
+from tutorials.tests.helpers import CacheResetMixin
+
+class StudentRequestsListTests(CacheResetMixin, TestCase):
+    def setUp(self):
+        """Set up test data before each test method"""
+        super().setUp()
+        self.course = Course.objects.create(
+            name='Python Programming',
+            desc='Learn Python basics',
+            price=100.00
+        )
+
+        self.student = User.objects.create_user(
+            username='@student',
+            password='student123',
+            first_name='Student',
+            last_name='User',
+            email='student@test.com',
+            role='Student'
+        )
+
+        self.other_student = User.objects.create_user(
+            username='@otherstudent',
+            password='student123',
+            first_name='Other',
+            last_name='Student',
+            email='other@test.com',
+            role='Student'
+        )
+
+        self.tutor = User.objects.create_user(
+            username='@tutor',
+            password='tutor123',
+            first_name='Tutor',
+            last_name='User',
+            email='tutor@test.com',
+            role='Tutor'
+        )
+
+        self.url = reverse('student.requests_list')
+
+    def create_requests(self, count, student=None):
+        RequestSession.objects.bulk_create([
+            RequestSession(
+                student=student or self.student,
+                tutor=self.tutor,
+                course=self.course,
+                start_date='2024-01-01',
+                end_date='2024-01-31',
+                availability={'monday': '09:00'}
+            )
+            for _ in range(count)
+        ])
+
+    def test_non_student_access_denied(self):
+        """Test that non-students cannot see the list"""
+        self.client.login(username='@tutor', password='tutor123')
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 403)
+
+    def test_only_own_requests_listed(self):
+        """Test that a student only sees their own requests"""
+        self.create_requests(2)
+        self.create_requests(3, student=self.other_student)
+        self.client.login(username='@student', password='student123')
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'students/requests.html')
+        self.assertEqual(len(response.context['requests']), 2)
+        for request_session in response.context['requests']:
+            self.assertEqual(request_session.student, self.student)
+        self.assertIsNone(response.context['next_cursor'])
+
+    def test_pages_follow_cursor(self):
+        """Test that following the cursor walks every request exactly once, newest first"""
+        self.create_requests(STUDENT_REQUESTS_PAGE_SIZE + 5)
+        self.client.login(username='@student', password='student123')
+
+        first_page = self.client.get(self.url)
+        first_ids = [r.id for r in first_page.context['requests']]
+        self.assertEqual(len(first_ids), STUDENT_REQUESTS_PAGE_SIZE)
+        self.assertEqual(first_ids, sorted(first_ids, reverse=True))
+        self.assertEqual(first_page.context['next_cursor'], first_ids[-1])
+
+        second_page = self.client.get(self.url, {'after': first_page.context['next_cursor']})
+        second_ids = [r.id for r in second_page.context['requests']]
+        self.assertEqual(len(second_ids), 5)
+        self.assertIsNone(second_page.context['next_cursor'])
+
+        all_ids = set(RequestSession.objects.filter(student=self.student).values_list('id', flat=True))
+        self.assertEqual(set(first_ids + second_ids), all_ids)
+
+    def test_page_links(self):
+        """Test that later pages link back to the newest requests and every page but the last to older ones"""
+        self.create_requests(STUDENT_REQUESTS_PAGE_SIZE + 5)
+        self.client.login(username='@student', password='student123')
+
+        first_page = self.client.get(self.url)
+        self.assertContains(first_page, f'{self.url}?after={first_page.context["next_cursor"]}')
+        self.assertNotContains(first_page, 'Newest requests')
+
+        second_page = self.client.get(self.url, {'after': first_page.context['next_cursor']})
+        self.assertContains(second_page, f'href="{self.url}"')
+        self.assertContains(second_page, 'Newest requests')
+        self.assertNotContains(second_page, 'Older requests')
+
+    def test_list_is_read_with_the_student_index(self):
+        """Test that each page is read from the student and id index rather than sorted"""
+        queryset = RequestSession.objects.filter(student=self.student).order_by('-id').filter(id__lt=100)
+        plan = queryset[:STUDENT_REQUESTS_PAGE_SIZE + 1].explain()
+        self.assertIn('request_student_id', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_invalid_cursor_shows_first_page(self):
+        """Test that a malformed cursor falls back to the first page"""
+        self.create_requests(3)
+        self.client.login(username='@student', password='student123')
+        response = self.client.get(self.url, {'after': 'abc'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['requests']), 3)
+
+    def test_query_count_independent_of_request_count(self):
+        """Test that rendering the list does not issue a query per request"""
+        self.client.login(username='@student', password='student123')
+        self.create_requests(1)
+        # Both renders read the courses from the cache
+        course_catalogue()
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(self.url)
+        self.create_requests(STUDENT_REQUESTS_PAGE_SIZE)
+        with CaptureQueriesContext(connection) as many:
+            self.client.get(self.url)
+        self.assertEqual(len(few), len(many))
@@ -0,0 +1,116 @@
+import asyncio
+from contextlib import aclosing, asynccontextmanager
+from unittest.mock import patch
+from asgiref.sync import sync_to_async
+from django.test import TestCase
+from django.urls import reverse
+from tutorials.models import Messages, Ticket, User
+from tutorials.pubsub import get_broker, ticket_channel
+from tutorials.tickets import post_message, ticket_event_stream
+
+class TicketEventsTests(TestCase):
+    def setUp(self):
+        """Set up test data before each test method"""
+        self.admin = User.objects.create_user(
+            username='@admin',
+            password='admin123',
+            first_name='Admin',
+            last_name='User',
+            email='admin@test.com',
+            role='Admin'
+        )
+
+        self.student = User.objects.create_user(
+            username='@student',
+            password='student123',
+            first_name='Student',
+            last_name='User',
+            email='student@test.com',
+            role='Student'
+        )
+        self.ticket = Ticket.objects.create(student=self.student, title='Help')
+        self.url = reverse('ticket_events', args=[self.ticket.id])
+
+    @asynccontextmanager
+    async def open_stream(self):
+        """Stream the ticket's events over ASGI, closing the stream and its subscription afterwards"""
+        streams = []
+
+        def record_stream(*args, **kwargs):
+            streams.append(ticket_event_stream(*args, **kwargs))
+            return streams[-1]
+
+        with patch('tutorials.views.ticket_event_stream', side_effect=record_stream):
+            response = await self.async_client.get(self.url)
+        self.assertTrue(response.streaming)
+        # The response's own wrapper does not close the stream it wraps, so close both
+        async with aclosing(streams[0]), aclosing(aiter(response.streaming_content)) as events:
+            yield events
+
+    def test_tutor_access_denied(self):
+        """Test that tutors cannot stream ticket messages"""
+        tutor = User.objects.create_user(
+            username='@tutor', password='tutor123', first_name='Tutor', last_name='User',
+            email='tutor@test.com', role='Tutor'
+        )
+        self.client.force_login(tutor)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 403)
+
+    def test_long_poll_returns_waiting_messages(self):
+        """Test that without ASGI the messages after the cursor are returned at once"""
+        first = post_message(self.ticket, 'Hi', 'student')
+        second = post_message(self.ticket, 'Still there?', 'student')
+        self.client.force_login(self.admin)
+        response = self.client.get(self.url, {'after': first.id})
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+        content = response.content.decode()
+        self.assertNotIn(f'id: {first.id}\n', content)
+        self.assertIn(f'id: {second.id}\nevent: message\ndata: {{"id":{second.id},', content)
+        # The client already had the messages before its cursor, so they are read too
+        self.assertFalse(Messages.objects.filter(is_read=False).exists())
+
+    def test_last_event_id_overrides_query_cursor(self):
+        """Test that a reconnecting EventSource resumes after its last event"""
+        first = post_message(self.ticket, 'Hi', 'student')
+        second = post_message(self.ticket, 'Still there?', 'student')
+        self.client.force_login(self.admin)
+        response = self.client.get(self.url, {'after': 0}, HTTP_LAST_EVENT_ID=str(first.id))
+        self.assertNotIn(f'id: {first.id}\n', response.content.decode())
+        self.assertIn(f'id: {second.id}\n', response.content.decode())
+
+    @patch('tutorials.views.TICKET_EVENTS_LONG_POLL_TIMEOUT', 0.05)
+    def test_long_poll_times_out_without_messages(self):
+        """Test that a long poll with nothing new ends empty after its timeout"""
+        message = post_message(self.ticket, 'Hi', 'student')
+        self.client.force_login(self.admin)
+        response = self.client.get(self.url, {'after': message.id})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('event: message', response.content.decode())
+
+    async def test_stream_pushes_new_messages(self):
+        """Test that over ASGI the stream sends waiting messages, then published ones"""
+        first = await sync_to_async(post_message)(self.ticket, 'Hi', 'student')
+        await self.async_client.aforce_login(self.admin)
+
+        def post_reply():
+            with self.captureOnCommitCallbacks(execute=True):
+                return post_message(self.ticket, 'Anyone?', 'student')
+
+        async with self.open_stream() as events:
+            self.assertIn(f'id: {first.id}\n'.encode(), await asyncio.wait_for(anext(events), 5))
+            reply = await sync_to_async(post_reply)()
+            self.assertIn(f'id: {reply.id}\n'.encode(), await asyncio.wait_for(anext(events), 5))
+            self.assertEqual(get_broker().subscriber_count(ticket_channel(self.ticket.id)), 1)
+        self.assertEqual(get_broker().subscriber_count(ticket_channel(self.ticket.id)), 0)
+        # Messages are marked read once the stream resumes after sending them
+        first = await Messages.objects.aget(id=first.id)
+        self.assertTrue(first.is_read)
+
+    @patch('tutorials.views.TICKET_EVENTS_KEEPALIVE', 0.05)
+    async def test_stream_sends_keepalives(self):
+        """Test that an idle stream sends comments to keep the connection open"""
+        await self.async_client.aforce_login(self.admin)
+        async with self.open_stream() as events:
+            self.assertEqual(await asyncio.wait_for(anext(events), 5), b': keepalive\n\n')
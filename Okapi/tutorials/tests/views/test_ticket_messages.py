@@ -0,0 +1,153 @@
+from django.test import TestCase
+from django.urls import reverse
+from tutorials.models import Messages, Ticket, User
+from tutorials.tickets import post_message
+from tutorials.views import TICKET_MESSAGES_PAGE_SIZE
+
+class TicketMessagesTests(TestCase):
+    def setUp(self):
+        """Set up test data before each test method"""
+        self.admin = User.objects.create_user(
+            username='@admin',
+            password='admin123',
+            first_name='Admin',
+            last_name='User',
+            email='admin@test.com',
+            role='Admin'
+        )
+
+        self.student = User.objects.create_user(
+            username='@student',
+            password='student123',
+            first_name='Student',
+            last_name='User',
+            email='student@test.com',
+            role='Student'
+        )
+
+        self.other_student = User.objects.create_user(
+            username='@other',
+            password='other123',
+            first_name='Other',
+            last_name='Student',
+            email='other@test.com',
+            role='Student'
+        )
+        self.ticket = Ticket.objects.create(student=self.student, title='Help')
+        self.url = reverse('ticket_messages', args=[self.ticket.id])
+        self.details_url = reverse('ticket_details', args=[self.ticket.id])
+
+    def post_messages(self, count, msg_from='student'):
+        return [post_message(self.ticket, f'Message {number}', msg_from) for number in range(count)]
+
+    def test_other_students_access_denied(self):
+        """Test that students cannot read other students' tickets"""
+        self.client.login(username='@other', password='other123')
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 403)
+
+    def test_messages_after_cursor(self):
+        """Test that only messages newer than the cursor are returned"""
+        first, second, third = self.post_messages(3)
+        self.client.login(username='@admin', password='admin123')
+        response = self.client.get(self.url, {'after': first.id})
+        data = response.json()
+        self.assertEqual([message['id'] for message in data['messages']], [second.id, third.id])
+        self.assertEqual(data['cursor'], third.id)
+        self.assertFalse(data['has_more'])
+        self.assertEqual(data['messages'][0]['content'], 'Message 1')
+
+    def test_no_new_messages_keeps_cursor(self):
+        """Test that an empty poll returns the same cursor and touches no messages"""
+        message, = self.post_messages(1)
+        self.client.login(username='@admin', password='admin123')
+        response = self.client.get(self.url, {'after': message.id})
+        self.assertEqual(response.json(), {'messages': [], 'cursor': message.id, 'has_more': False})
+        self.assertFalse(Messages.objects.get().is_read)
+
+    def test_response_is_compact(self):
+        """Test that the JSON has no whitespace between tokens"""
+        self.post_messages(1)
+        self.client.login(username='@admin', password='admin123')
+        response = self.client.get(self.url)
+        self.assertNotIn(b', ', response.content)
+        self.assertNotIn(b': ', response.content)
+
+    def test_fetched_messages_marked_read(self):
+        """Test that only the messages sent to the client are marked read"""
+        self.post_messages(TICKET_MESSAGES_PAGE_SIZE + 1)
+        self.client.login(username='@admin', password='admin123')
+        data = self.client.get(self.url).json()
+        self.assertTrue(data['has_more'])
+        self.assertEqual(len(data['messages']), TICKET_MESSAGES_PAGE_SIZE)
+        self.ticket.refresh_from_db()
+        self.assertEqual(self.ticket.unread_for_admin, 1)
+        data = self.client.get(self.url, {'after': data['cursor']}).json()
+        self.assertEqual(len(data['messages']), 1)
+        self.ticket.refresh_from_db()
+        self.assertEqual(self.ticket.unread_for_admin, 0)
+
+    def test_history_before_cursor(self):
+        """Test that history pages run backwards from the cursor, oldest first within a page"""
+        messages = self.post_messages(TICKET_MESSAGES_PAGE_SIZE + 2)
+        self.client.login(username='@admin', password='admin123')
+        data = self.client.get(self.url, {'before': messages[-1].id}).json()
+        ids = [message['id'] for message in data['messages']]
+        self.assertEqual(ids, [message.id for message in messages[1:-1]])
+        self.assertEqual(data['before'], messages[1].id)
+        data = self.client.get(self.url, {'before': data['before']}).json()
+        self.assertEqual([message['id'] for message in data['messages']], [messages[0].id])
+        self.assertIsNone(data['before'])
+
+    def test_details_page_shows_latest_messages(self):
+        """Test that the ticket page shows the latest page and links to older messages"""
+        messages = self.post_messages(TICKET_MESSAGES_PAGE_SIZE + 1)
+        self.client.login(username='@admin', password='admin123')
+        response = self.client.get(self.details_url)
+        self.assertEqual(response.context['msgs'], messages[1:])
+        self.assertEqual(response.context['latest_message_id'], messages[-1].id)
+        self.assertContains(response, f'?before={messages[1].id}')
+        response = self.client.get(self.details_url, {'before': messages[1].id})
+        self.assertEqual(response.context['msgs'], messages[:1])
+        self.assertIsNone(response.context['latest_message_id'])
+
+    def test_details_page_polls_under_wsgi(self):
+        """Test that pages served over WSGI poll for messages rather than hold a stream open"""
+        self.client.login(username='@student', password='student123')
+        response = self.client.get(self.details_url)
+        self.assertFalse(response.context['stream_events'])
+        self.assertContains(response, 'const streamEvents = false;')
+
+    async def test_details_page_streams_under_asgi(self):
+        """Test that pages served over ASGI stream messages as server-sent events"""
+        await self.async_client.aforce_login(self.student)
+        response = await self.async_client.get(self.details_url)
+        self.assertTrue(response.context['stream_events'])
+        self.assertContains(response, 'const streamEvents = true;')
+
+    def test_details_page_marks_unread_as_read(self):
+        """Test that opening the ticket marks the other side's messages read"""
+        self.post_messages(2)
+        self.post_messages(1, msg_from='admin')
+        self.client.login(username='@admin', password='admin123')
+        self.client.get(self.details_url)
+        self.assertEqual(Messages.objects.filter(is_read=False).get().msg_from, 'admin')
+
+    def test_details_page_query_count_independent_of_thread_length(self):
+        """Test that showing a ticket does not issue a query per message"""
+        self.client.login(username='@admin', password='admin123')
+        for count in (1, TICKET_MESSAGES_PAGE_SIZE):
+            self.post_messages(count)
+            with self.assertNumQueries(8):
+                self.client.get(self.details_url)
+
+    def test_messages_query_count_independent_of_thread_length(self):
+        """Test that polling and paging through messages do not issue a query per message"""
+        self.client.login(username='@admin', password='admin123')
+        after = 0
+        for count in (1, TICKET_MESSAGES_PAGE_SIZE):
+            self.post_messages(count)
+            with self.assertNumQueries(8):
+                after = self.client.get(self.url, {'after': after}).json()['cursor']
+            with self.assertNumQueries(4):
+                self.client.get(self.url, {'before': after})
@@ -0,0 +1,173 @@
+"""Posting and reading ticket messages.
+
+Each Ticket keeps how many messages its admin and student sides have not read and
+when its last message was posted, so inboxes are a plain indexed scan of Ticket
+instead of an aggregate over Messages. The functions here change messages and
+those counters in one transaction, so every message should be posted and read
+through them. Posted messages are also published on the ticket's tutorials.pubsub
+channel for open ticket_events streams.
+"""
+
+import asyncio
+import json
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from tutorials.models import Messages, Ticket
+from tutorials.pubsub import get_broker, ticket_channel
+
+# The counter each side's unread messages are kept in, by the side that sent them
+UNREAD_FIELDS = {
+    'student': 'unread_for_admin',
+    'admin': 'unread_for_student',
+}
+
+
+def unread_field(role):
+    """Return the Ticket field counting the messages a user of the role has not read."""
+
+    return 'unread_for_admin' if role == 'Admin' else 'unread_for_student'
+
+
+def post_message(ticket, content, msg_from):
+    """Add a message from 'student' or 'admin' to a ticket, counting it as unread for the other side."""
+
+    now = timezone.now()
+    counter = UNREAD_FIELDS[msg_from]
+    with transaction.atomic():
+        message = Messages.objects.create(ticket=ticket, content=content, msg_from=msg_from)
+        Ticket.objects.filter(id=ticket.id).update(**{counter: F(counter) + 1, 'last_message_at': now})
+        # Tell open ticket_events streams once the message can be read from the database
+        transaction.on_commit(
+            lambda: get_broker().publish(ticket_channel(ticket.id), serialize_message(message))
+        )
+    ticket.last_message_at = now
+    setattr(ticket, counter, getattr(ticket, counter) + 1)
+    return message
+
+
+def mark_read(ticket, role, up_to=None):
+    """Mark the messages a user of the role has not read on a ticket as read, returning how many there were.
+
+    With up_to, only messages with an id up to it are marked, e.g. those a client has been sent.
+    The messages are always updated, as the ticket's counter may be stale, and the counter
+    drops by the number of rows the update changed.
+    """
+
+    sender = 'admin' if role == 'Student' else 'student'
+    counter = UNREAD_FIELDS[sender]
+    unread = ticket.ticket_messages.filter(msg_from=sender, is_read=False)
+    if up_to is not None:
+        unread = unread.filter(id__lte=up_to)
+    with transaction.atomic():
+        # Only the unread rows are touched, and the counter drops by exactly that many,
+        # so a message posted at the same time is still counted once it commits
+        read = unread.update(is_read=True)
+        if read:
+            Ticket.objects.filter(id=ticket.id).update(**{counter: F(counter) - read})
+    setattr(ticket, counter, max(getattr(ticket, counter) - read, 0))
+    return read
+
+
+def thread(ticket):
+    """Return the messages of a ticket with the columns shown to users, in the order they were posted."""
+
+    # The ticket id is kept so each message is given the ticket without loading it again
+    return ticket.ticket_messages.only('id', 'ticket', 'msg_from', 'content', 'date', 'time').order_by('id')
+
+
+def messages_after(ticket, after, limit):
+    """Return up to limit messages of a ticket posted after the message with id after, oldest first.
+
+    Also returns whether more messages follow them.
+    """
+
+    messages = list(thread(ticket).filter(id__gt=after)[:limit + 1])
+    return messages[:limit], len(messages) > limit
+
+
+def serialize_message(message):
+    """Return the compact JSON representation of a message."""
+
+    return {
+        'id': message.id,
+        'from': message.msg_from,
+        'content': message.content,
+        'sent': f'{message.date.isoformat()}T{message.time.isoformat(timespec="seconds")}',
+    }
+
+
+def sse_event(message):
+    """Return a serialized message as a server-sent event whose id is the message id."""
+
+    return f'id: {message["id"]}\nevent: message\ndata: {json.dumps(message, separators=(",", ":"))}\n\n'
+
+
+async def ticket_event_stream(ticket, role, after, timeout, keepalive, page_size=50, stop_after_events=False):
+    """Yield the messages of a ticket posted after the message with id after as server-sent events.
+
+    Messages already in the database are sent first, then new ones as they are published,
+    until timeout seconds have passed. A comment is sent after keepalive idle seconds so
+    proxies keep the connection open. With stop_after_events the stream ends as soon as
+    it has sent something, for clients that long poll. Messages from the other side are
+    marked read once they have been sent.
+    """
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    # Subscribe before catching up so nothing posted in between is missed
+    async with get_broker().subscribe(ticket_channel(ticket.id)) as queue:
+        sent = []
+        has_more = True
+        while has_more:
+            page, has_more = await sync_to_async(messages_after)(ticket, after, page_size)
+            for message in page:
+                sent.append(serialize_message(message))
+                after = message.id
+                yield sse_event(sent[-1])
+        await _mark_sent_read(ticket, role, sent)
+
+        while not (stop_after_events and sent):
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+            try:
+                message = await asyncio.wait_for(queue.get(), min(keepalive, remaining))
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+            if message['id'] <= after:
+                continue
+            after = message['id']
+            sent = [message]
+            yield sse_event(message)
+            await _mark_sent_read(ticket, role, sent)
+
+
+async def _mark_sent_read(ticket, role, sent):
+    sender = 'admin' if role == 'Student' else 'student'
+    if any(message['from'] == sender for message in sent):
+        # The stream outlives many posts, so read the counters again before using them
+        await ticket.arefresh_from_db(fields=['unread_for_admin', 'unread_for_student'])
+        await sync_to_async(mark_read)(ticket, role, up_to=sent[-1]['id'])
+
+
+def recount_tickets(tickets=None):
+    """Recompute the unread counters of tickets (all by default) from their messages.
+
+    For messages created without post_message, e.g. with bulk_create.
+    """
+
+    tickets = Ticket.objects.all() if tickets is None else tickets
+
+    def unread_from(sender):
+        unread = Messages.objects.filter(ticket=OuterRef('pk'), msg_from=sender, is_read=False)
+        count = unread.order_by().values('ticket').annotate(count=Count('id')).values('count')
+        return Coalesce(Subquery(count), Value(0))
+
+    return tickets.update(
+        unread_for_admin=unread_from('student'),
+        unread_for_student=unread_from('admin'),
+    )
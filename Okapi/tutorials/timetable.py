@@ -0,0 +1,44 @@
+"""A student's or tutor's accepted sessions, split into previous, current and upcoming.
+
+The sessions are read with one query, joined to their course, and each one is put
+in its bucket in a single pass by comparing its dates with one value of today, so
+the buckets never overlap or disagree about the date.
+"""
+
+from tutorials.models import RequestSession
+
+# The RequestSession field naming the user, by role
+SESSION_USER_FIELDS = {
+    'Student': 'student',
+    'Tutor': 'tutor',
+}
+
+
+def accepted_sessions(user):
+    """Return the accepted sessions of a student or tutor with their course, by start date."""
+
+    field = SESSION_USER_FIELDS.get(user.role)
+    if field is None:
+        return RequestSession.objects.none()
+    return (
+        RequestSession.objects.filter(**{field: user}, status='accepted')
+        .select_related('course')
+        .order_by('start_date', 'id')
+    )
+
+
+def bucket_sessions(sessions, today):
+    """Return lists of the sessions that ended before today, are running today and start after today.
+
+    Each list keeps the order of sessions.
+    """
+
+    previous, current, upcoming = [], [], []
+    for session in sessions:
+        if session.end_date < today:
+            previous.append(session)
+        elif session.start_date <= today:
+            current.append(session)
+        else:
+            upcoming.append(session)
+    return previous, current, upcoming
@@ -10,11 +10,18 @@ urlpatterns = [
 
     path('sessions/',views.all_sessions,name="all_sessions"),
     path('invoices/', views.invoices, name='invoices'),
+    path('invoices/export', views.export_invoices, name='export_invoices'),
+    path('sessions/export', views.export_sessions, name='export_sessions'),
+    path('calendar/<str:token>.ics', views.calendar_feed, name='calendar_feed'),
 
     path('invoices/mark_paid/<int:invoice_id>/', views.mark_invoice_paid, name='mark_invoice_paid'),
 
     path('dashboard/request/list',views.admin_request_list,name="admin.request.list"),
+    path('dashboard/request/bulk',views.admin_request_bulk,name="admin.request.bulk"),
+    path('dashboard/request/auto-assign',views.admin_request_auto_assign,name="admin.request.auto_assign"),
     path('dashboard/request/<int:request_id>',views.admin_request_details,name="admin.request.details"),
+    path('dashboard/cache/stats',views.cache_stats,name="cache_stats"),
+    path('dashboard/metrics/requests',views.request_metrics,name="request_metrics"),
     # path('admin-dashboard/request/accept/<int:request_id>',views.admin_accept_request_session,name="admin.request.accept"),
 
     path('course/edit/<int:course_id>/', views.edit_course, name='course.edit'),
@@ -25,6 +32,8 @@ urlpatterns = [
     path('open_ticket/',views.open_ticket,name="open_ticket"),
     path('tickets/',views.all_ticket,name="all_ticket"),
     path('ticket/<int:ticket_id>',views.ticket_details,name="ticket_details"),
+    path('ticket/<int:ticket_id>/messages',views.ticket_messages,name="ticket_messages"),
+    path('ticket/<int:ticket_id>/events',views.ticket_events,name="ticket_events"),
 
 ]
 urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
@@ -1,3 +1,4 @@
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth import login, logout
@@ -6,63 +7,169 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.views import LoginView
 from django.utils import timezone
 from django.core.exceptions import ImproperlyConfigured
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import redirect, render,get_object_or_404
 from django.views import View
 from django.views.generic.edit import FormView, UpdateView
 from django.urls import reverse, reverse_lazy
-from tutorials.forms import LogInForm, PasswordForm, UserForm, SignUpForm,CourseForm
-from tutorials.helpers import login_prohibited
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import urlencode
+from django.views.decorators.http import require_safe
+from tutorials.forms import LogInForm, PasswordForm, UserForm, SignUpForm,CourseForm, InvoiceExportForm, SessionExportForm
+from tutorials.helpers import login_prohibited, keyset_paginate, parse_cursor
+from tutorials.assignment import auto_assign
+from tutorials.calendars import cached_feed, feed_token, feed_user, feed_version
+from tutorials.conflicts import TutorUnavailable, free_tutors
+from tutorials.matching import rank_tutors
 from tutorials.models import Course, RequestSession,User, Invoices,Ticket,Messages
-import ast
+from tutorials.cache import cache_stats as get_cache_stats
+from tutorials.cached_queries import course_catalogue
+from tutorials.dashboard_stats import get_dashboard_stats
+from tutorials.enrolment import BATCH_ACTIONS, accept_request, process_requests
+from tutorials.directory import DIRECTORY_FIELDS, ROLES as DIRECTORY_ROLES, directory_users
+from tutorials.exports import INVOICE_EXPORT_COLUMNS, SESSION_EXPORT_COLUMNS, csv_response, export_response
+from tutorials.instrumentation import request_stats
+from tutorials.occurrences import next_occurrence, upcoming_request_sessions, user_occurrences
+from tutorials.timetable import SESSION_USER_FIELDS, accepted_sessions, bucket_sessions
+from tutorials.tickets import (
+    mark_read, messages_after, post_message, serialize_message, thread, ticket_event_stream, unread_field
+)
 from django.core.exceptions import PermissionDenied
-from django.db.models import Count, Q
 from datetime import datetime, timedelta
 
+STUDENT_REQUESTS_PAGE_SIZE = 20
+INVOICES_PAGE_SIZE = 50
+TICKETS_PAGE_SIZE = 25
+TICKET_MESSAGES_PAGE_SIZE = 50
+TICKET_EVENTS_TIMEOUT = 300
+TICKET_EVENTS_LONG_POLL_TIMEOUT = 25
+TICKET_EVENTS_KEEPALIVE = 15
+USER_DIRECTORY_PAGE_SIZE = 50
+PREVIOUS_SESSIONS_PAGE_SIZE = 20
+
 @login_required
 def admin_accept_request_session(request,request_id):
     if request.user.role != "Admin":
         raise PermissionDenied
     request_session = get_object_or_404(RequestSession, id=request_id)
 
-@login_required
-def ticket_details(request,ticket_id):
-    current_user=request.user
-    if current_user.role == "Tutor":
+def get_visible_ticket(user, ticket_id):
+    """Return the ticket if the user may see it: admins see every ticket, students their own."""
+
+    if user.role == "Tutor":
         raise PermissionDenied
     ticket = get_object_or_404(Ticket, id=ticket_id)
-    if current_user.role == "Student" and ticket.student_id != current_user.id:
+    if user.role == "Student" and ticket.student_id != user.id:
         raise PermissionDenied
+    return ticket
+
+@login_required
+def ticket_details(request,ticket_id):
+    current_user=request.user
+    ticket = get_visible_ticket(current_user, ticket_id)
     if request.method == "POST" and not ticket.is_close:
         if request.POST.get("content").strip() != "":
-            msg = Messages(
-                ticket=ticket,
-                content=request.POST.get("content"),
-                msg_from=current_user.role.lower()
-            )
-            msg.save()
+            post_message(ticket, request.POST.get("content"), current_user.role.lower())
         if current_user.role == "Admin" and request.POST.get("close_ticket"):
             ticket.is_close=True
-            ticket.save()
-    msgs = ticket.ticket_messages.all().order_by("date","time")
-    mark_as_read_for="student"
-    if current_user.role=="Student":
-        mark_as_read_for="admin"
-    ticket.ticket_messages.filter(msg_from=mark_as_read_for).update(is_read=True)
-    return render(request, 'ticket/ticket_details.html', {"ticket": ticket,"msgs" : msgs,"current_user":current_user})
+            ticket.save(update_fields=['is_close'])
+    # Only the latest messages are shown, older ones a page at a time with ?before=
+    before = parse_cursor(request.GET.get('before'))
+    msgs, older_cursor = keyset_paginate(thread(ticket), before, TICKET_MESSAGES_PAGE_SIZE)
+    msgs.reverse()
+    mark_read(ticket, current_user.role)
+    # The page polls for messages after the latest one shown, unless it shows older history
+    latest_message_id = None
+    if before is None:
+        latest_message_id = msgs[-1].id if msgs else 0
+    context = {
+        "ticket": ticket,
+        "msgs" : msgs,
+        "current_user":current_user,
+        "older_cursor": older_cursor,
+        "latest_message_id": latest_message_id,
+        # Only ASGI servers hold an open stream cheaply; under WSGI the page polls for JSON
+        "stream_events": isinstance(request, ASGIRequest),
+    }
+    return render(request, 'ticket/ticket_details.html', context)
+
+@login_required
+def ticket_messages(request, ticket_id):
+    """Return messages of a ticket as compact JSON.
+
+    ?after=<id> returns the messages posted after that one, oldest first, and marks them
+    read; the returned cursor is passed as ?after= on the next poll. ?before=<id> returns
+    the page of history before that message instead.
+    """
+
+    ticket = get_visible_ticket(request.user, ticket_id)
+    if 'before' in request.GET:
+        page, older_cursor = keyset_paginate(
+            thread(ticket), parse_cursor(request.GET.get('before')), TICKET_MESSAGES_PAGE_SIZE
+        )
+        page.reverse()
+        data = {'messages': [serialize_message(message) for message in page], 'before': older_cursor}
+    else:
+        after = parse_cursor(request.GET.get('after')) or 0
+        page, has_more = messages_after(ticket, after, TICKET_MESSAGES_PAGE_SIZE)
+        cursor = page[-1].id if page else after
+        if page:
+            mark_read(ticket, request.user.role, up_to=cursor)
+        data = {
+            'messages': [serialize_message(message) for message in page],
+            'cursor': cursor,
+            'has_more': has_more,
+        }
+    return JsonResponse(data, json_dumps_params={'separators': (',', ':')})
+
+@login_required
+async def ticket_events(request, ticket_id):
+    """Stream the new messages of a ticket as server-sent events.
+
+    Streams start after the Last-Event-ID an EventSource sends when it reconnects, or
+    ?after=<id>, and end after TICKET_EVENTS_TIMEOUT seconds so the client reconnects.
+    Served over ASGI an open stream is one idle coroutine. WSGI servers would hold the
+    whole stream in memory, so there the view answers as a long poll instead.
+    """
+
+    user = await request.auser()
+    ticket = await sync_to_async(get_visible_ticket)(user, ticket_id)
+    after = parse_cursor(request.headers.get('Last-Event-ID')) or parse_cursor(request.GET.get('after')) or 0
+    if isinstance(request, ASGIRequest):
+        events = ticket_event_stream(
+            ticket, user.role, after, TICKET_EVENTS_TIMEOUT, TICKET_EVENTS_KEEPALIVE,
+            TICKET_MESSAGES_PAGE_SIZE
+        )
+        response = StreamingHttpResponse(events, content_type='text/event-stream')
+    else:
+        events = ticket_event_stream(
+            ticket, user.role, after, TICKET_EVENTS_LONG_POLL_TIMEOUT, TICKET_EVENTS_KEEPALIVE,
+            TICKET_MESSAGES_PAGE_SIZE, stop_after_events=True
+        )
+        response = HttpResponse(''.join([event async for event in events]), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
 @login_required
 def all_ticket(request):
 
     if request.user.role == "Tutor":
         raise PermissionDenied
-    tickets=[]
     if request.user.role == "Admin":
-        tickets=Ticket.objects.annotate(
-            unread_msg_count=Count('ticket_messages', filter=Q(ticket_messages__is_read=False, ticket_messages__msg_from="student"))
-        ).order_by('-date','-time')
+        tickets = Ticket.objects.select_related('student')
     else:
-        tickets=Ticket.objects.filter(student=request.user).annotate(
-            unread_msg_count=Count('ticket_messages', filter=Q(ticket_messages__is_read=False, ticket_messages__msg_from="admin"))
-        ).order_by("-date",'-time')
+        tickets = Ticket.objects.filter(student=request.user)
+    # Most recent activity first, read straight off the ticket_activity indexes
+    tickets = Paginator(
+        tickets.order_by('-last_message_at', '-id'), TICKETS_PAGE_SIZE
+    ).get_page(request.GET.get('page'))
+    for ticket in tickets:
+        ticket.unread_msg_count = getattr(ticket, unread_field(request.user.role))
     return render(request, 'ticket/all_ticket.html',{"tickets":tickets,"current_user":request.user})
 
 
@@ -71,17 +178,13 @@ def open_ticket(request):
     if request.user.role != "Student":
         raise  PermissionDenied
     if request.method == "POST":
-        ticket = Ticket(
-            title= request.POST.get("title"),
-            student=request.user
-        )
-        ticket.save()
-        msg= Messages(
-            ticket=ticket,
-            content=request.POST.get("content"),
-            msg_from="student"
-        )
-        msg.save()
+        with transaction.atomic():
+            ticket = Ticket(
+                title= request.POST.get("title"),
+                student=request.user
+            )
+            ticket.save()
+            post_message(ticket, request.POST.get("content"), "student")
         return redirect('all_ticket')
     else:
         return render(request, 'ticket/open_ticket.html')
@@ -91,8 +194,12 @@ def admin_request_details(request, request_id):
     if request.user.role != "Admin":
         raise PermissionDenied
     request_session = get_object_or_404(RequestSession, id=request_id)
-    tutors = request_session.course.users.all()
-    availability = ast.literal_eval(str(request_session.availability))
+    # Tutors of the course not already teaching at the requested times, those free at them first
+    ranked_tutors = [user_id for user_id, overlap in rank_tutors(request_session.course_id, request_session.availability)]
+    free_tutor_ids = free_tutors(ranked_tutors, request_session)
+    tutors_by_id = User.objects.in_bulk(free_tutor_ids)
+    tutors = [tutors_by_id[user_id] for user_id in free_tutor_ids if user_id in tutors_by_id]
+    availability = request_session.availability
     
     if request.method == "POST":
         status = request.POST.get("status")
@@ -101,38 +208,13 @@ def admin_request_details(request, request_id):
             
             # If status is accepted and a tutor is selected
             if status == 'accepted' and request.POST.get("tutor"):
-                tutor = User.objects.get(id=request.POST.get("tutor"))
-                request_session.tutor = tutor  # Use direct assignment for ForeignKey
-                availability = ast.literal_eval(str(request_session.availability))
-                start_date = datetime.strptime(str(request_session.start_date), "%Y-%m-%d")
-                end_date = datetime.strptime(str(request_session.end_date), "%Y-%m-%d")
-
-                # Map day names to their respective integers
-                day_map = ["monday","tuesday","wednesday","thursday","friday","saturday","sunday"]
-
-
-                # Initialize session count
-                session_count = 0
-
-                # Loop through all dates from start_date to end_date
-                current_date = start_date
-
-                while current_date <= end_date:
-                    day_name = current_date.strftime("%A")  # Get the day name (e.g., "Tuesday")
-                    if day_name.lower() in availability:  # Check if the day is in availability
-                        session_count += 1  # Add the number of sessions for that day
-                    current_date += timedelta(days=1)
-                total = request_session.course.price * session_count
-                due_date=start_date+timedelta(days=3)
-                invoice = Invoices(
-                    due_date=due_date,
-                    course_id=request_session.course.id,
-                    student_id=request_session.student.id,
-                    tutor_id=tutor.id,
-                    total=total
-                )
-                invoice.save()
-                request_session.save()
+                tutor = get_object_or_404(User, id=request.POST.get("tutor"), role="Tutor")
+                try:
+                    accept_request(request_session.id, tutor.id)
+                except TutorUnavailable as error:
+                    clashes = ", ".join(f"#{request_id}" for request_id in error.conflicting_ids)
+                    messages.error(request, f"{tutor.username} already teaches at these times (requests {clashes}).")
+                    return redirect('admin.request.details', request_id=request_session.id)
             else:
                 request_session.save()
 
@@ -149,9 +231,61 @@ def admin_request_details(request, request_id):
 def admin_request_list(request):
     if not request.user.role == "Admin":
         raise PermissionDenied
-    requests = RequestSession.objects.all().order_by('-id')
+    requests = RequestSession.objects.select_related('course', 'student').order_by('-id')
     return render(request, 'admin/sessions/requests.html', {'requests': requests})
 
+@login_required
+def admin_request_bulk(request):
+    """Accept or reject the pending requests selected on the request list in one batch."""
+
+    if request.user.role != "Admin":
+        raise PermissionDenied
+    action = request.POST.get("action")
+    if request.method != "POST" or action not in BATCH_ACTIONS:
+        return redirect('admin.request.list')
+    request_ids = [int(value) for value in request.POST.getlist("request_ids") if value.isdigit()]
+    if not request_ids:
+        messages.error(request, "Select at least one pending request.")
+        return redirect('admin.request.list')
+    result = process_requests(request_ids, action)
+    messages.success(
+        request,
+        f"{BATCH_ACTIONS[action].capitalize()} {len(result.processed)} requests and created "
+        f"{len(result.invoices)} invoices in {result.seconds * 1000:.0f} ms "
+        f"({result.per_second:.0f} requests/s)."
+    )
+    if result.skipped:
+        skipped = ", ".join(f"#{request_session.id}" for request_session in result.skipped)
+        messages.warning(request, f"No tutor could be assigned to requests {skipped}.")
+    return redirect('admin.request.list')
+
+@login_required
+def admin_request_auto_assign(request):
+    """Assign the best free tutors to the selected pending requests, or to all of them once confirmed, and accept them."""
+
+    if request.user.role != "Admin":
+        raise PermissionDenied
+    if request.method != "POST":
+        return redirect('admin.request.list')
+    request_ids = [int(value) for value in request.POST.getlist("request_ids") if value.isdigit()]
+    if not request_ids and request.POST.get("all_pending") != "1":
+        messages.error(request, "Select the pending requests to assign, or confirm assigning all of them.")
+        return redirect('admin.request.list')
+    result = auto_assign(request_ids or None)
+    batch = result.batch
+    if batch is not None:
+        messages.success(
+            request,
+            f"Assigned tutors to {len(batch.processed)} requests and created {len(batch.invoices)} invoices "
+            f"in {result.seconds * 1000:.0f} ms."
+        )
+    if result.unassigned:
+        unassigned = ", ".join(f"#{request_session.id}" for request_session in result.unassigned)
+        messages.warning(request, f"No tutor could be assigned to requests {unassigned}.")
+    elif batch is None:
+        messages.info(request, "There are no pending requests to assign.")
+    return redirect('admin.request.list')
+
 @login_required
 def request_session(request,course_id):
     if not request.user.role == "Student":
@@ -198,14 +332,13 @@ def request_session(request,course_id):
 def student_requests_list(request):
     if not request.user.role == "Student":
         raise PermissionDenied
-    current_user = request.user
-    requests = []
-    all_requests = RequestSession.objects.all()
-    for req in all_requests:
-        if req.student == current_user:
-            requests.append(req)
-    courses = Course.objects.all()
-    return render(request, 'students/requests.html', {'requests': requests, 'courses': courses})
+    requests = RequestSession.objects.filter(student=request.user).select_related('course', 'tutor')
+    after = parse_cursor(request.GET.get('after'))
+    requests, next_cursor = keyset_paginate(requests, after=after, page_size=STUDENT_REQUESTS_PAGE_SIZE)
+    courses = course_catalogue()
+    return render(request, 'students/requests.html', {
+        'requests': requests, 'courses': courses, 'next_cursor': next_cursor, 'first_page': after is None
+    })
 
 @login_required
 def create_course(request):
@@ -251,7 +384,7 @@ def edit_course(request, course_id):
 
 
 def request_session_course_list(request):
-    courses = Course.objects.all()
+    courses = course_catalogue()
     return render(request, 'sessions/course_list.html', {'courses': courses})
 
 @login_required
@@ -259,7 +392,7 @@ def course_list(request):
     if not request.user.role == "Admin":
         raise PermissionDenied
     # Retrieve all courses
-    courses = Course.objects.all()
+    courses = course_catalogue()
     # Render them in a template
     return render(request, 'courses/course_list.html', {'courses': courses})
 
@@ -277,14 +410,66 @@ def delete_course(request,course_id):
 
 @login_required
 def show_usernames(request):
+    """Display the user directory, searchable by username or last name prefix and filterable by role."""
+
     if not request.user.role == "Admin":
         raise PermissionDenied
-    users = User.objects.all()  # Fetch all users
+    search = request.GET.get('q', '')
+    role = request.GET.get('role', '')
+    users, next_cursor = keyset_paginate(
+        directory_users(search, role), parse_cursor(request.GET.get('after')), USER_DIRECTORY_PAGE_SIZE
+    )
+    filters = {'q': search, 'role': role}
     context = {
-        'usernames': [user.username for user in users]  # Extract usernames
+        'users': users,
+        'usernames': [user.username for user in users],
+        'search': search,
+        'role': role,
+        'roles': DIRECTORY_ROLES,
+        'next_query': urlencode({**filters, 'after': next_cursor}) if next_cursor else None,
+        'export_query': urlencode(filters),
     }
     return render(request, 'usernames_list.html', context)
 
+@login_required
+def export_invoices(request):
+    """Stream invoices as CSV or NDJSON (?format=), filtered by due date (?start=, ?end=) and ?status=paid|unpaid."""
+
+    if request.user.role != "Admin":
+        raise PermissionDenied
+    form = InvoiceExportForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+    invoices = form.filter(Invoices.objects.order_by('due_date', 'id'))
+    return export_response(
+        form.cleaned_data['format'], 'invoices', INVOICE_EXPORT_COLUMNS, invoices,
+        asynchronous=isinstance(request, ASGIRequest)
+    )
+
+@login_required
+def export_sessions(request):
+    """Stream request sessions as CSV or NDJSON (?format=), filtered by start date (?start=, ?end=) and ?status=."""
+
+    if request.user.role != "Admin":
+        raise PermissionDenied
+    form = SessionExportForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+    sessions = form.filter(RequestSession.objects.order_by('start_date', 'id'))
+    return export_response(
+        form.cleaned_data['format'], 'sessions', SESSION_EXPORT_COLUMNS, sessions,
+        asynchronous=isinstance(request, ASGIRequest)
+    )
+
+@login_required
+def export_users(request):
+    """Stream the users matching the directory's search and role filter as CSV."""
+
+    if request.user.role != "Admin":
+        raise PermissionDenied
+    users = directory_users(request.GET.get('q', ''), request.GET.get('role', '')).order_by('id')
+    return csv_response('users.csv', DIRECTORY_FIELDS, users, asynchronous=isinstance(request, ASGIRequest))
+
 @login_required
 def mark_invoice_paid(request, invoice_id):
     # Only allow admins to mark invoices as paid
@@ -302,6 +487,26 @@ def mark_invoice_paid(request, invoice_id):
     messages.success(request, f"Invoice for {invoice.course.name} has been marked as paid.")
     return redirect('invoices')
 
+@login_required
+def cache_stats(request):
+    """Return the cache hit and miss counters of this worker as JSON, for monitoring."""
+
+    if request.user.role != 'Admin':
+        raise PermissionDenied
+    return JsonResponse({'namespaces': get_cache_stats()})
+
+@login_required
+def request_metrics(request):
+    """Display the latency histogram and query statistics of each URL recorded by this worker."""
+
+    if request.user.role != 'Admin':
+        raise PermissionDenied
+    context = {
+        'enabled': settings.REQUEST_TIMING,
+        'stats': request_stats(),
+    }
+    return render(request, 'admin/request_metrics.html', context)
+
 @login_required
 def dashboard(request):
     """Display the current user's dashboard."""
@@ -310,59 +515,35 @@ def dashboard(request):
 
     if request.user.role == 'Admin':
 
-        students_count = User.objects.filter(role="Student").count()
-        tutors_count = User.objects.filter(role="Tutor").count()
-        admin_count = User.objects.filter(role="Admin").count()
-        request_count= RequestSession.objects.filter(status='pending').count()
-        courses_count= Course.objects.filter().count()
-        unpaid_invoices_count = Invoices.objects.filter(status=False).count()
         context = {
             'user': current_user,
-            'students_count': students_count,
-            'tutors_count': tutors_count,
-            'admin_count': admin_count,
-            'request_count': request_count,
-            'courses_count': courses_count,
-            'unpaid_invoices_count': unpaid_invoices_count,
+            **get_dashboard_stats(),
         }
         return render(request, 'admin_dashboard.html', context)
         #return render(request, 'admin_dashboard.html', {'user': current_user})
 
-    elif current_user.role == 'Student':
-        upcoming_sessions = RequestSession.objects.filter(
-            student=current_user,
-            status='accepted',
-            start_date__gte=timezone.now().date()
-        ).order_by('start_date')
-
-
-        all_courses = Course.objects.all()
-        context = {
-            'user': current_user,
-            'upcoming_sessions': upcoming_sessions,
-            'courses': all_courses
-        }
-        
-        return render(request, 'dashboard.html', context)
-    
-    elif current_user.role == 'Tutor':
-        upcoming_sessions = RequestSession.objects.filter(
-            tutor=current_user,
-            status='accepted',
-            start_date__gte=timezone.now().date()
-        ).order_by('start_date')
-
-        next_session = None
-        if upcoming_sessions:
-            next_session = upcoming_sessions[0]
-            upcoming_sessions = upcoming_sessions[1:]
-
+    elif current_user.role in ('Student', 'Tutor'):
+        # The dated calendar of the coming week, a range scan of the user's occurrences
+        now = timezone.now()
+        week_occurrences = list(user_occurrences(current_user, now, now + timedelta(days=7)))
+        upcoming = week_occurrences[0] if week_occurrences else next_occurrence(current_user, now)
+        next_session = upcoming.request_session if upcoming else None
+        # Every other session still to meet, however far ahead, in the order they next meet
+        upcoming_sessions = []
+        if next_session is not None:
+            upcoming_sessions = list(
+                upcoming_request_sessions(current_user, now).exclude(id=next_session.id)
+            )
         context = {
             'user': current_user,
             'upcoming_sessions': upcoming_sessions,
             'next_session': next_session,
+            'next_occurrence': upcoming,
+            'week_occurrences': week_occurrences,
         }
-        
+        if current_user.role == 'Student':
+            context['courses'] = course_catalogue()
+
         return render(request, 'dashboard.html', context)
     else:
         return render(request, 'dashboard.html', {'user': current_user})
@@ -543,92 +724,76 @@ class SignUpView(LoginProhibitedMixin, FormView):
 
 @login_required
 def all_sessions(request):
+    """Show a student's or tutor's accepted sessions: previous ones a page at a time, current ones, the next and the rest."""
+
     current_user = request.user
-    if current_user.role == 'Student':
-        previous_sessions = RequestSession.objects.filter(
-                student=current_user,
-                status='accepted',
-                end_date__lt=timezone.now().date()
-            ).order_by('start_date')
-        current_sessions = RequestSession.objects.filter(
-            student=current_user,
-            status='accepted',
-            start_date__lte=timezone.now().date(),
-            end_date__gte=timezone.now().date()
-        ).order_by('start_date')
-        upcoming_sessions = RequestSession.objects.filter(
-                student=current_user,
-                status='accepted',
-                start_date__gte=timezone.now().date()
-            ).order_by('start_date')
-    elif current_user.role == 'Tutor':
-        previous_sessions = RequestSession.objects.filter(
-                tutor=current_user,
-                status='accepted',
-                end_date__lt=timezone.now().date()
-            ).order_by('start_date')
-        current_sessions = RequestSession.objects.filter(
-            tutor=current_user,
-            status='accepted',
-            start_date__lte=timezone.now().date(),
-            end_date__gte=timezone.now().date()
-        ).order_by('start_date')
-        upcoming_sessions = RequestSession.objects.filter(
-                tutor=current_user,
-                status='accepted',
-                start_date__gte=timezone.now().date()
-            ).order_by('start_date')
-    
+    if current_user.role not in SESSION_USER_FIELDS:
+        raise PermissionDenied
+    previous_sessions, current_sessions, upcoming_sessions = bucket_sessions(
+        accepted_sessions(current_user), timezone.now().date()
+    )
+    next_session = upcoming_sessions.pop(0) if upcoming_sessions else None
+    previous_sessions = Paginator(previous_sessions, PREVIOUS_SESSIONS_PAGE_SIZE).get_page(
+        request.GET.get('previous_page')
+    )
+
     context = {
         'user': current_user,
+        'next_session': next_session,
         'upcoming_sessions': upcoming_sessions,
         'previous_sessions': previous_sessions,
-        "current_sessions": current_sessions
+        "current_sessions": current_sessions,
+        'calendar_url': request.build_absolute_uri(reverse('calendar_feed', args=[feed_token(current_user)])),
     }
     
     return render(request, 'sessions.html', context)
 
 
+@require_safe
+def calendar_feed(request, token):
+    """Serve a student's or tutor's sessions as an iCalendar feed, answering polls of an unchanged feed with 304."""
+
+    user = feed_user(token)
+    if user is None:
+        raise Http404
+    updated, etag = feed_version(user)
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(cached_feed(user, updated, etag), content_type='text/calendar; charset=utf-8')
+        response['Content-Disposition'] = 'inline; filename="sessions.ics"'
+    response['ETag'] = etag
+    # Calendar apps may keep the feed but must check it is still current
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
 
 def invoices(request):
     current_user = request.user
-    unpaid_invoices_count=0
+    # Only load the columns invoices.html shows, joining the related rows in the same query
+    all_invoices = Invoices.objects.select_related('course', 'tutor', 'student').only(
+        'due_date', 'payment_date', 'status', 'total',
+        'course__name', 'tutor__username', 'student__username'
+    )
     if current_user.role == 'Student':
-        paid_invoices = Invoices.objects.filter(
-            student=current_user,
-            status=True,
-        ).order_by('due_date')
-        
-        unpaid_invoices = Invoices.objects.filter(
-            student=current_user,
-            status=False,
-        ).order_by('due_date')
-        unpaid_invoices_count=len(unpaid_invoices)
+        all_invoices = all_invoices.filter(student=current_user)
     elif current_user.role == 'Tutor':
-        paid_invoices = Invoices.objects.filter(
-            tutor=current_user,
-            status=True,
-        ).order_by('due_date')
-        
-        unpaid_invoices = Invoices.objects.filter(
-            tutor=current_user,
-            status=False,
-        ).order_by('due_date')
-        unpaid_invoices_count = len(unpaid_invoices)
-    elif current_user.role == 'Admin':
-        # For admin, show all invoices
-        paid_invoices = Invoices.objects.filter(status=True).order_by('due_date')
-        unpaid_invoices = Invoices.objects.filter(status=False).order_by('due_date')
-        unpaid_invoices_count = unpaid_invoices.count()
-    
-    else:
+        all_invoices = all_invoices.filter(tutor=current_user)
+    elif current_user.role != 'Admin':
         # If no matching role, return empty querysets
-        paid_invoices = Invoices.objects.none()
-        unpaid_invoices = Invoices.objects.none()
+        all_invoices = Invoices.objects.none()
+
+    # Admins see every invoice, so page both lists and let the paginator count in the database
+    paid_invoices = Paginator(
+        all_invoices.filter(status=True).order_by('due_date', 'id'), INVOICES_PAGE_SIZE
+    ).get_page(request.GET.get('paid_page'))
+    unpaid_invoices = Paginator(
+        all_invoices.filter(status=False).order_by('due_date', 'id'), INVOICES_PAGE_SIZE
+    ).get_page(request.GET.get('unpaid_page'))
     context = {
         'paid_invoices': paid_invoices,
         'unpaid_invoices': unpaid_invoices,
-        'unpaid_invoices_count': unpaid_invoices_count
+        'unpaid_invoices_count': unpaid_invoices.paginator.count
     }
     return render(request, 'invoices.html', context)
 